@@ -0,0 +1,40 @@
+from pathlib import Path
+
+import cv2
+import numpy as np
+import yaml
+
+from yoloModelManager.src.filesystem import DatasetDirManager
+from yoloModelManager.src.filesystem.compression import is_compliant
+
+
+def make_dataset(path: Path, metadata: dict) -> DatasetDirManager:
+    dataset_dir: DatasetDirManager = DatasetDirManager(path)
+    image: np.ndarray = np.random.default_rng(0).integers(0, 256, (32, 32, 3), dtype= np.uint8)
+    cv2.imwrite(str(dataset_dir.images_path / 'a.jpg'), image, [cv2.IMWRITE_JPEG_QUALITY, 95])
+    cv2.imwrite(str(dataset_dir.images_path / 'b.png'), image)
+    with open(dataset_dir.metadata_path, 'w') as f:
+        yaml.dump(metadata, f)
+    return dataset_dir
+
+
+def test_is_compliant_needs_recorded_encoding() -> None:
+    assert not is_compliant(Path('a.jpg'), 'jpg', 60)
+    assert not is_compliant(Path('a.jpg'), 'jpg', 60, ('jpg', 95))
+    assert not is_compliant(Path('a.png'), 'jpg', 60, ('jpg', 60))
+    assert is_compliant(Path('a.jpeg'), 'jpg', 60, ('jpeg', 60))
+
+def test_compress_reencodes_other_quality(tmp_path: Path) -> None:
+    dataset_dir: DatasetDirManager = make_dataset(tmp_path, {'image_format': 'jpg', 'image_quality': 95})
+    summary = dataset_dir.compress_images('jpg', 60, workers= 1)
+    assert (summary['compressed'], summary['skipped']) == (2, 0)
+    with open(dataset_dir.metadata_path, 'r') as f:
+        assert yaml.safe_load(f) == {'image_format': 'jpg', 'image_quality': 60}
+    summary = dataset_dir.compress_images('jpg', 60, workers= 1)
+    assert (summary['compressed'], summary['skipped']) == (0, 2)
+
+def test_compress_without_recorded_encoding(tmp_path: Path) -> None:
+    dataset_dir: DatasetDirManager = make_dataset(tmp_path, {'camera_width': 32})
+    summary = dataset_dir.compress_images('jpg', 60, workers= 1)
+    assert (summary['compressed'], summary['skipped']) == (2, 0)
+    assert sorted(image.name for image in dataset_dir.get_images_list()) == ['a.jpg', 'b.jpg']
@@ -0,0 +1,134 @@
+from pathlib import Path
+
+import pytest
+
+from yoloModelManager.src.cameras import discovery
+from yoloModelManager.src.cameras.camera_manager import LinuxCamerasManager
+from yoloModelManager.src.cameras.discovery import (CamerasDiscoveryCache,
+                                                    get_dev_nodes_fingerprint)
+
+
+class StubCapture:
+    OPENED: set[int] = {0, 2}
+    calls: list[int] = []
+
+    def __init__(self, index: int) -> None:
+        StubCapture.calls.append(index)
+        self.index: int = index
+
+    def isOpened(self) -> bool:
+        return self.index in self.OPENED
+
+    def release(self) -> None:
+        pass
+
+
+def make_sysfs_tree(root: Path, names: dict[int, str]) -> tuple[Path, Path]:
+    sysfs_path: Path = root / 'sys' / 'class' / 'video4linux'
+    dev_path: Path = root / 'dev'
+    driver_path: Path = root / 'sys' / 'bus' / 'usb' / 'drivers' / 'uvcvideo'
+    usb_path: Path = root / 'sys' / 'devices' / 'usb1' / '1-1'
+    sysfs_path.mkdir(parents= True)
+    dev_path.mkdir()
+    driver_path.mkdir(parents= True)
+    for attr, value in {'idVendor': '046d', 'idProduct': '0825', 'manufacturer': 'Acme', 'serial': 'A1'}.items():
+        usb_path.mkdir(parents= True, exist_ok= True)
+        (usb_path / attr).write_text(f'{value}\n')
+    for index, name in names.items():
+        interface_path: Path = usb_path / f'1-1:1.{index}'
+        interface_path.mkdir()
+        (interface_path / 'driver').symlink_to(driver_path)
+        node: Path = sysfs_path / f'video{index}'
+        node.mkdir()
+        (node / 'name').write_text(f'{name}\n')
+        (node / 'index').write_text('0\n')
+        (node / 'dev').write_text(f'81:{index}\n')
+        (node / 'device').symlink_to(interface_path)
+        (dev_path / f'video{index}').touch()
+    return sysfs_path, dev_path
+
+@pytest.fixture
+def fake_linux(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    sysfs_path, dev_path = make_sysfs_tree(tmp_path, {0: 'HD Webcam', 1: 'HD Webcam', 2: 'Other Webcam'})
+    monkeypatch.setattr(LinuxCamerasManager, 'SYSFS_V4L_PATH', sysfs_path)
+    monkeypatch.setattr(LinuxCamerasManager, 'DEV_PATH', dev_path)
+    monkeypatch.setattr(LinuxCamerasManager, 'VIDEO_CAPTURE_BACKEND', StubCapture)
+    monkeypatch.setattr(discovery, 'CACHE_PATH', tmp_path / 'cache')
+    StubCapture.calls = []
+    return tmp_path
+
+
+def test_cache_roundtrip(tmp_path: Path) -> None:
+    cache: CamerasDiscoveryCache = CamerasDiscoveryCache('test', 60, tmp_path)
+    cache.save([['video0', 1, 2]], [0], [{'Name': 'Webcam'}])
+    data = cache.load([['video0', 1, 2]])
+    assert data is not None
+    assert data['working_indices'] == [0]
+    assert data['cameras_info'] == [{'Name': 'Webcam'}]
+
+def test_cache_expires_after_ttl(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    cache: CamerasDiscoveryCache = CamerasDiscoveryCache('test', 60, tmp_path)
+    monkeypatch.setattr(discovery, 'time', lambda: 1000.0)
+    cache.save([], [0], [])
+    monkeypatch.setattr(discovery, 'time', lambda: 1059.0)
+    assert cache.load([]) is not None
+    monkeypatch.setattr(discovery, 'time', lambda: 1061.0)
+    assert cache.load([]) is None
+
+def test_cache_disabled_with_zero_ttl(tmp_path: Path) -> None:
+    cache: CamerasDiscoveryCache = CamerasDiscoveryCache('test', 0, tmp_path)
+    cache.save([], [0], [])
+    assert cache.load([]) is None
+
+def test_cache_invalidated_by_fingerprint(tmp_path: Path) -> None:
+    cache: CamerasDiscoveryCache = CamerasDiscoveryCache('test', 60, tmp_path)
+    cache.save([['video0', 1, 2]], [0], [])
+    assert cache.load([['video0', 1, 2], ['video1', 3, 4]]) is None
+
+def test_cache_ignores_corrupted_file(tmp_path: Path) -> None:
+    cache: CamerasDiscoveryCache = CamerasDiscoveryCache('test', 60, tmp_path)
+    cache.path.write_text('{not json')
+    assert cache.load([]) is None
+
+def test_dev_nodes_fingerprint_changes_with_nodes(tmp_path: Path) -> None:
+    (tmp_path / 'video0').touch()
+    (tmp_path / 'null').touch()
+    fingerprint: list = get_dev_nodes_fingerprint(tmp_path)
+    assert [node[0] for node in fingerprint] == ['video0']
+    assert get_dev_nodes_fingerprint(tmp_path) == fingerprint
+    (tmp_path / 'video1').touch()
+    assert get_dev_nodes_fingerprint(tmp_path) != fingerprint
+
+def test_sysfs_devices_list(fake_linux: Path) -> None:
+    cameras: list[dict] = LinuxCamerasManager.get_sysfs_devices_list()
+    assert [camera['Index'] for camera in cameras] == [0, 1, 2]
+    assert cameras[2]['Name'] == 'Other Webcam'
+    assert cameras[0]['Device'] == str(fake_linux / 'dev' / 'video0')
+    assert cameras[0]['Details']['Driver'] == 'uvcvideo'
+    assert cameras[0]['Details']['Vendor id'] == '046d'
+    assert cameras[0]['Details']['Serial'] == 'A1'
+
+def test_detect_working_cameras(fake_linux: Path) -> None:
+    assert LinuxCamerasManager.detect_working_cameras(max_to_check= 5, workers= 5) == [0, 2]
+    assert sorted(StubCapture.calls) == [0, 1, 2, 3, 4]
+
+def test_discover_cameras_uses_cache(fake_linux: Path) -> None:
+    cameras_info, working_indices = LinuxCamerasManager.discover_cameras()
+    assert working_indices == [0, 2]
+    assert len(cameras_info) == 3
+    StubCapture.calls = []
+    assert LinuxCamerasManager.discover_cameras() == (cameras_info, working_indices)
+    assert StubCapture.calls == []
+
+def test_discover_cameras_invalidated_by_new_device(fake_linux: Path) -> None:
+    LinuxCamerasManager.discover_cameras()
+    (fake_linux / 'dev' / 'video3').touch()
+    StubCapture.calls = []
+    LinuxCamerasManager.discover_cameras()
+    assert len(StubCapture.calls) > 0
+
+def test_discover_cameras_without_cache(fake_linux: Path) -> None:
+    LinuxCamerasManager.discover_cameras()
+    StubCapture.calls = []
+    LinuxCamerasManager.discover_cameras(use_cache= False)
+    assert len(StubCapture.calls) > 0
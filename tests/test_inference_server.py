@@ -0,0 +1,146 @@
+from pathlib import Path
+from threading import Thread
+from time import monotonic, sleep
+from typing import Any, Optional
+
+import numpy as np
+import pytest
+
+from yoloModelManager.src.model.inference_server import (InferenceClient,
+                                                         InferenceServer,
+                                                         MicroBatcher)
+
+BOXES: np.ndarray = np.array([[1, 2, 30, 40, 0.9, 0]], dtype= np.float32)
+
+
+class StubBoxes:
+    def __init__(self, data: np.ndarray) -> None:
+        self.data: np.ndarray = data
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+
+class StubResult:
+    names: dict[int, str] = {0: 'part'}
+
+    def __init__(self, image: np.ndarray) -> None:
+        self.valid_boxes: Optional[StubBoxes] = StubBoxes(BOXES + image[0, 0, 0])
+        self.completed_boxes: Optional[StubBoxes] = None
+
+
+class StubModel:
+    def __init__(self, name: str = 'stub', delay: float = 0.0) -> None:
+        self.name: str = name
+        self.delay: float = delay
+        self.batches: list[int] = []
+
+    def predict_batch(self, frames: list[np.ndarray]) -> list[StubResult]:
+        self.batches.append(len(frames))
+        sleep(self.delay)
+        return [StubResult(frame) for frame in frames]
+
+
+def make_image(value: int = 0) -> np.ndarray:
+    return np.full((32, 32, 3), value, dtype= np.uint8)
+
+def run_concurrently(target: Any, n: int) -> list[Any]:
+    results: list[Any] = [None] * n
+
+    def run(i: int) -> None:
+        results[i] = target(i)
+
+    threads: list[Thread] = [Thread(target= run, args= (i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+@pytest.fixture
+def batcher_factory():
+    batchers: list[MicroBatcher] = []
+
+    def factory(model: StubModel, **kwargs) -> MicroBatcher:
+        batcher: MicroBatcher = MicroBatcher(model, **kwargs) # type: ignore
+        batchers.append(batcher)
+        return batcher
+
+    yield factory
+    for batcher in batchers:
+        batcher.stop()
+
+
+def test_batches_are_bounded_by_max_batch(batcher_factory) -> None:
+    model: StubModel = StubModel()
+    batcher: MicroBatcher = batcher_factory(model, max_batch= 4, max_wait= 0.2)
+    futures = [batcher.submit(make_image(i)) for i in range(10)]
+    predictions = [future.result(5) for future in futures]
+    assert model.batches == [4, 4, 2]
+    assert [prediction['batch_size'] for prediction in predictions] == [4] * 8 + [2] * 2
+    assert predictions[3]['valid_boxes'][0, 0] == 1 + 3
+    stats = batcher.stats()
+    assert stats['requests'] == 10
+    assert stats['batches'] == 3
+    assert stats['batch_sizes'] == {2: 1, 4: 2}
+
+def test_lone_request_waits_at_most_max_wait(batcher_factory) -> None:
+    batcher: MicroBatcher = batcher_factory(StubModel(), max_batch= 8, max_wait= 0.1)
+    start: float = monotonic()
+    prediction = batcher.predict(make_image(), timeout= 5)
+    elapsed: float = monotonic() - start
+    assert prediction['batch_size'] == 1
+    assert 0.09 <= elapsed < 1.0
+    assert 90 <= prediction['queue_ms'] < 1000
+
+def test_zero_max_wait_does_not_wait(batcher_factory) -> None:
+    batcher: MicroBatcher = batcher_factory(StubModel(), max_batch= 8, max_wait= 0.0)
+    start: float = monotonic()
+    batcher.predict(make_image(), timeout= 5)
+    assert monotonic() - start < 0.05
+
+def test_full_queue_rejects_requests(batcher_factory) -> None:
+    model: StubModel = StubModel(delay= 0.2)
+    batcher: MicroBatcher = batcher_factory(model, max_batch= 1, max_wait= 0.0, queue_size= 1)
+    first = batcher.submit(make_image())
+    sleep(0.05)
+    batcher.submit(make_image())
+    rejected = batcher.submit(make_image())
+    with pytest.raises(RuntimeError):
+        rejected.result(5)
+    first.result(5)
+    assert batcher.stats()['rejected'] == 1
+
+def test_client_against_http_server() -> None:
+    model: StubModel = StubModel(delay= 0.05)
+    server: InferenceServer = InferenceServer([model], port= 0, max_batch= 4, max_wait= 0.1) # type: ignore
+    server.start()
+    try:
+        client: InferenceClient = InferenceClient(port= server.port, image_format= 'png')
+        predictions = run_concurrently(lambda i: client.predict(make_image(i)), 8)
+        for i, prediction in enumerate(predictions):
+            assert prediction['model'] == 'stub'
+            assert prediction['names'] == {'0': 'part'}
+            np.testing.assert_allclose(prediction['valid_boxes'], BOXES + i, atol= 1e-3)
+            assert prediction['completed_boxes'].shape == (0, 6)
+        binary = client.predict(make_image(5), model_name= 'stub', binary= True)
+        np.testing.assert_array_equal(binary['valid_boxes'], BOXES + 5)
+        stats = client.stats()[0]
+        assert stats['requests'] == 9
+        assert stats['mean_batch_size'] > 1
+        assert max(model.batches) <= 4
+    finally:
+        server.stop()
+
+def test_client_against_unix_socket_server(tmp_path: Path) -> None:
+    socket_path: Path = tmp_path / 'server.sock'
+    server: InferenceServer = InferenceServer([StubModel()], socket_path= socket_path, max_wait= 0.0) # type: ignore
+    server.start()
+    try:
+        client: InferenceClient = InferenceClient(socket_path= socket_path, image_format= 'png')
+        np.testing.assert_allclose(client.predict(make_image(2))['valid_boxes'], BOXES + 2, atol= 1e-3)
+        with pytest.raises(RuntimeError):
+            client.predict(make_image(), model_name= 'missing')
+    finally:
+        server.stop()
+    assert not socket_path.exists()
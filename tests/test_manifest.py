@@ -0,0 +1,80 @@
+import os
+from pathlib import Path
+
+from yoloModelManager.src.filesystem import DatasetDirManager, DatasetManifest
+
+
+def make_dataset(path: Path) -> Path:
+    (path / 'images').mkdir(parents= True)
+    (path / 'labels').mkdir()
+    (path / 'images' / 'a.jpg').write_bytes(b'image a')
+    (path / 'images' / 'b.jpg').write_bytes(b'image b')
+    (path / 'labels' / 'a.txt').write_text('0 0.5 0.5 0.1 0.1\n')
+    return path
+
+def rewrite(path: Path, content: str) -> None:
+    dir_mtime_ns: int = path.parent.stat().st_mtime_ns
+    path.write_text(content)
+    st = path.stat()
+    os.utime(path, ns= (st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert path.parent.stat().st_mtime_ns == dir_mtime_ns
+
+
+def test_update_indexes_and_pairs(tmp_path: Path) -> None:
+    manifest: DatasetManifest = DatasetManifest(make_dataset(tmp_path))
+    assert manifest.update() == 3
+    assert manifest.update() == 0
+    assert manifest.pairs() == [
+        (tmp_path / 'images' / 'a.jpg', tmp_path / 'labels' / 'a.txt'),
+        (tmp_path / 'images' / 'b.jpg', None)
+    ]
+
+def test_full_update_detects_in_place_rewrites(tmp_path: Path) -> None:
+    manifest: DatasetManifest = DatasetManifest(make_dataset(tmp_path))
+    manifest.update()
+    signature: str = manifest.signature()
+    rewrite(tmp_path / 'labels' / 'a.txt', '1 0.5 0.5 0.2 0.2\n')
+    assert manifest.update() == 0
+    assert manifest.signature() == signature
+    assert manifest.update(full= True) == 1
+    assert manifest.signature() != signature
+
+def test_update_detects_new_and_removed_files(tmp_path: Path) -> None:
+    manifest: DatasetManifest = DatasetManifest(make_dataset(tmp_path))
+    manifest.update()
+    (tmp_path / 'images' / 'b.jpg').unlink()
+    (tmp_path / 'labels' / 'b.txt').write_text('')
+    assert manifest.update() == 2
+    assert manifest.images() == [tmp_path / 'images' / 'a.jpg']
+    assert manifest.orphan_labels() == [tmp_path / 'labels' / 'b.txt']
+
+def test_add_skips_missing_paths(tmp_path: Path) -> None:
+    manifest: DatasetManifest = DatasetManifest(make_dataset(tmp_path))
+    manifest.update()
+    (tmp_path / 'images' / 'c.jpg').write_bytes(b'image c')
+    manifest.add([tmp_path / 'images' / 'c.jpg', tmp_path / 'images' / 'missing.jpg'])
+    assert manifest.count('images') == 3
+    assert tmp_path / 'images' / 'missing.jpg' not in manifest.images()
+
+def test_labels_cache_is_invalidated_by_in_place_edits(tmp_path: Path) -> None:
+    dataset_dir: DatasetDirManager = DatasetDirManager(make_dataset(tmp_path))
+    labels, _, _ = dataset_dir.get_labels_array(workers= 1)
+    assert labels[:, 1].tolist() == [0]
+    rewrite(tmp_path / 'labels' / 'a.txt', '2 0.5 0.5 0.2 0.2\n')
+    labels, _, _ = dataset_dir.get_labels_array(workers= 1)
+    assert labels[:, 1].tolist() == [2]
+
+def test_update_lists_changed_subdirs_only(tmp_path: Path) -> None:
+    make_dataset(tmp_path)
+    (tmp_path / 'images' / 'day').mkdir()
+    (tmp_path / 'images' / 'day' / 'c.jpg').write_bytes(b'image c')
+    manifest: DatasetManifest = DatasetManifest(tmp_path)
+    assert manifest.update() == 4
+    (tmp_path / 'images' / 'day' / 'd.jpg').write_bytes(b'image d')
+    (tmp_path / 'images' / 'day' / 'c.jpg').unlink()
+    assert manifest.update() == 2
+    assert manifest.images() == [
+        tmp_path / 'images' / 'a.jpg',
+        tmp_path / 'images' / 'b.jpg',
+        tmp_path / 'images' / 'day' / 'd.jpg'
+    ]
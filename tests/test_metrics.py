@@ -0,0 +1,26 @@
+from yoloModelManager.src.utils.metrics import MetricsRegistry, collect_profiler_metrics
+from yoloModelManager.src.utils.profiling import FrameProfiler
+
+
+def test_summary_renders_sum_and_count(monkeypatch):
+    profiler: FrameProfiler = FrameProfiler(enabled= True, log_interval= 0, slow_frame_ms= 0)
+    for value_ms in (10, 20, 30):
+        profiler.record('predict', value_ms * 1_000_000)
+    monkeypatch.setattr('yoloModelManager.src.utils.metrics.PROFILER', profiler)
+    registry: MetricsRegistry = MetricsRegistry(enabled= True)
+    registry.add_collector(collect_profiler_metrics)
+    lines: list[str] = registry.render().splitlines()
+    assert 'yolo_stage_latency_seconds_sum{stage="predict"} 0.06' in lines
+    assert 'yolo_stage_latency_seconds_count{stage="predict"} 3' in lines
+    assert sum(line.startswith('# TYPE yolo_stage_latency_seconds') for line in lines) == 1
+    family: list[str] = [line for line in lines if line.startswith('yolo_stage_latency_seconds')]
+    assert family[-2:] == [
+        'yolo_stage_latency_seconds_sum{stage="predict"} 0.06',
+        'yolo_stage_latency_seconds_count{stage="predict"} 3'
+    ]
+
+
+def test_large_counters_keep_every_digit():
+    registry: MetricsRegistry = MetricsRegistry(enabled= True)
+    registry.inc('frames_total', 1234567)
+    assert 'yolo_frames_total 1234567' in registry.render().splitlines()
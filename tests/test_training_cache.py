@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from yoloModelManager.src.filesystem.training_cache import conform_image
+from yoloModelManager.src.utils.config import YOLO_IMAGE_HEIGHT, YOLO_IMAGE_WIDTH
+
+
+def test_conform_image_applies_filters() -> None:
+    image: np.ndarray = np.zeros((100, 200, 3), dtype= np.uint8)
+    conformed: np.ndarray = conform_image(image, ['GREY', 'RESIZE'], 4096)
+    assert conformed.shape == (YOLO_IMAGE_HEIGHT, YOLO_IMAGE_WIDTH)
+
+def test_conform_image_skips_conforming_images() -> None:
+    image: np.ndarray = np.zeros((YOLO_IMAGE_HEIGHT, YOLO_IMAGE_WIDTH), dtype= np.uint8)
+    assert conform_image(image, ['GREY', 'RESIZE'], 4096) is image
+
+def test_conform_image_downscales_to_imgsz() -> None:
+    image: np.ndarray = np.zeros((100, 200, 3), dtype= np.uint8)
+    assert conform_image(image, [], 50).shape == (25, 50, 3)
+
+@pytest.mark.parametrize('filter', ['BORDER', 'PADDING', 'CUT', 'UNKNOWN'])
+def test_conform_image_rejects_geometry_filters(filter: str) -> None:
+    with pytest.raises(ValueError):
+        conform_image(np.zeros((10, 10, 3), dtype= np.uint8), ['GREY', filter], 640)
@@ -1 +1,9 @@
-from .camera_manager import CameraInfo, CameraManager, camera_manager_factory
\ No newline at end of file
+from .camera_manager import (CameraInfo, CameraManager,
+                             FrameSourceCameraManager, camera_manager_factory)
+from .capture_thread import CaptureThread, FrameData
+from .event_recorder import EventRecorder, FrameRingBuffer, TriggerRule
+from .frame_sources import (CameraFrameSource, FrameSource,
+                            ImageDirFrameSource, SyntheticFrameSource,
+                            VideoFileFrameSource, frame_source_factory)
+from .multi_camera_manager import CameraSink, MultiCameraManager
+from .recorder import BurstRecorder, RecordModes
\ No newline at end of file
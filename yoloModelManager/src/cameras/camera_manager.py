@@ -2,23 +2,33 @@ import atexit
 import platform
 import subprocess
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
 from pprint import pprint
 from sys import exit
-from time import sleep
 from typing import Any, Callable, Generator, Optional, TypedDict
 
 import cv2
 import numpy as np
 from pyUtils import time_me
 
-from ..filesystem.files import create_dataset_medatada_yaml, save_image
+from ..filesystem.files import create_dataset_medatada_yaml
+from ..filesystem.image_writer import ImageWriter
 from ..image.image_processing import ImageProcessing
 from ..model.model_manager import ModelManager
 from ..utils.config import IMAGES_PATH, MY_CFG, my_logger
 from ..utils.data_types import DatasetMetadataDict
+from ..utils.metrics import METRICS, MetricsRegistry
+from ..utils.profiling import PROFILER
+from .camera_properties import CameraPropertiesController
+from .capture_thread import CaptureThread, FrameData
+from .discovery import (CamerasDiscoveryCache, get_dev_nodes_fingerprint,
+                        read_sysfs_attr)
+from .event_recorder import EventRecorder, TriggerRule
+from .frame_sources import CameraFrameSource, FrameSource
+from .recorder import BurstRecorder
 
 
 class CameraInfo(TypedDict):
@@ -34,11 +44,22 @@ class CameraInfo(TypedDict):
 
 
 class CameraManager(ABC):
+    VIDEO_CAPTURE_BACKEND: Callable[[int], cv2.VideoCapture] = cv2.VideoCapture
+    DEV_PATH: Path = Path('/dev')
+
     def __init__(
         self,
         camera_id: Optional[int] = None
     ) -> None:
         atexit.register(self.cleanup)
+        self._cap: Optional[FrameSource] = None
+        self._capture_thread: Optional[CaptureThread] = None
+        self.last_frame_data: Optional[FrameData] = None
+        self.image_writer: ImageWriter = ImageWriter()
+        self.recorder: Optional[BurstRecorder] = None
+        self.event_recorder: Optional[EventRecorder] = None
+        self.model: Optional[ModelManager] = None
+        self.properties = CameraPropertiesController(self.on_properties_applied)
         self.camera_info: CameraInfo = self.select_camera(camera_id)
         with self.get_video_capture() as cap:
             self.get_camera_resolution(cap)
@@ -160,10 +181,10 @@ class CameraManager(ABC):
     def get_cameras_info() -> list[dict]:
         raise NotImplementedError()
 
-    @staticmethod
+    @classmethod
     @time_me(debug= False)
-    def camera_exists(camera_id: int) -> bool:
-        cap = cv2.VideoCapture(camera_id)
+    def camera_exists(cls, camera_id: int) -> bool:
+        cap = cls.VIDEO_CAPTURE_BACKEND(camera_id)
         if cap.isOpened():
             cap.release()
             return True
@@ -171,28 +192,76 @@ class CameraManager(ABC):
 
     @classmethod
     @time_me
-    def detect_working_cameras(cls, max_to_check= 5) -> list[int]:
-        working_cameras: list = []
-        for i in range(max_to_check):
-            if cls.camera_exists(i):
-                working_cameras.append(i)
-        return working_cameras
+    def detect_working_cameras(
+        cls,
+        max_to_check: int = MY_CFG.camera.discovery.max_to_check,
+        workers: int = MY_CFG.camera.discovery.workers
+    ) -> list[int]:
+        indices: list[int] = list(range(max_to_check))
+        with ThreadPoolExecutor(max_workers= max(1, workers)) as executor:
+            exists: list[bool] = list(executor.map(cls.camera_exists, indices))
+        return [
+            i
+            for i, camera_exists in zip(indices, exists)
+            if camera_exists
+        ]
+
+    @classmethod
+    def get_devices_fingerprint(cls) -> list:
+        return get_dev_nodes_fingerprint(cls.DEV_PATH)
+
+    @classmethod
+    @time_me
+    def discover_cameras(
+        cls,
+        use_cache: bool = True
+    ) -> tuple[list[dict], list[int]]:
+        cache = CamerasDiscoveryCache(
+            cls.__name__,
+            MY_CFG.camera.discovery.cache_ttl
+        )
+        fingerprint: list = cls.get_devices_fingerprint()
+        if use_cache:
+            cached = cache.load(fingerprint)
+            if cached is not None and cached['working_indices']:
+                return cached['cameras_info'], cached['working_indices']
+        with ThreadPoolExecutor(max_workers= 1) as executor:
+            cameras_info_future = executor.submit(cls.get_cameras_info)
+            working_indices: list[int] = cls.detect_working_cameras()
+            cameras_info: list[dict] = cameras_info_future.result()
+        if working_indices:
+            cache.save(fingerprint, working_indices, cameras_info)
+        return cameras_info, working_indices
+
+    @staticmethod
+    def get_camera_name(
+        cameras_info: list[dict],
+        cv2_index: int
+    ) -> str:
+        for position, camera_info in enumerate(cameras_info):
+            if camera_info.get('Index', position) == cv2_index:
+                return camera_info.get('Name', f'Camera {cv2_index}')
+        return f'Camera {cv2_index}'
 
     @classmethod
     @time_me
-    def get_cameras(cls) -> dict[int, CameraInfo]:
-        cameras_info: list[dict] = cls.get_cameras_info()
-        working_indices: list[int] = cls.detect_working_cameras()
+    def get_cameras(
+        cls,
+        use_cache: bool = True
+    ) -> dict[int, CameraInfo]:
+        cameras_info: list[dict]
+        working_indices: list[int]
+        cameras_info, working_indices = cls.discover_cameras(use_cache)
         if not working_indices:
             msg: str = 'Cameras not found.'
             my_logger.error(f'RuntimeError: {msg}')
             raise RuntimeError(msg)
         cameras: dict[int, CameraInfo] = {}
-        #FIXME: the order of getCamerasInfo is not the same that detectWorkingCameras so the names may not be ok.
+        #FIXME: Windows cameras info has no index, the order may not be the same that detect_working_cameras so the names may not be ok.
         for cv2_index in working_indices:
             cameras[cv2_index] = CameraInfo(
                 index= cv2_index,
-                name= cameras_info[cv2_index]['Name'],
+                name= cls.get_camera_name(cameras_info, cv2_index),
                 width= 0, #TODO: change to cameras_info[cv2_index]['resolution']
                 height= 0,
                 brightness= MY_CFG.camera.brightness,
@@ -226,20 +295,117 @@ class CameraManager(ABC):
             my_logger.critical(msg)
             exit(1)
 
+    def create_frame_source(self) -> FrameSource:
+        return CameraFrameSource(self.camera, self.VIDEO_CAPTURE_BACKEND)
+
     @contextmanager
-    def get_video_capture(self) -> Generator[cv2.VideoCapture, Any, None]:
-        self._cap: cv2.VideoCapture = cv2.VideoCapture(self.camera)
-        if not self._cap.isOpened():
+    def get_video_capture(self) -> Generator[FrameSource, Any, None]:
+        self._cap = self.create_frame_source()
+        if not self._cap.open():
             msg: str = 'Can\'t connect to the camera.'
             my_logger.error(f'ConnectionRefusedError: {msg}')
             raise ConnectionRefusedError(msg)
         try:
-            self._cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
             yield self._cap
         finally:
             self._cap.release()
 
+    @contextmanager
+    def start_capture_thread(
+        self,
+        cap: FrameSource
+    ) -> Generator[CaptureThread, Any, None]:
+        self.last_frame_data = None
+        self._capture_thread = CaptureThread(cap, self.name)
+        self._capture_thread.listeners.append(self.on_frame_captured)
+        self._capture_thread.pre_read_callbacks.append(self.properties.apply)
+        self._capture_thread.start()
+        METRICS.add_collector(self.collect_metrics)
+        try:
+            yield self._capture_thread
+        finally:
+            METRICS.remove_collector(self.collect_metrics)
+            self._capture_thread.stop()
+            self._capture_thread = None
+
+    @property
+    def dropped_frames(self) -> int:
+        if self._capture_thread is None:
+            return 0
+        return self._capture_thread.dropped_frames
+
+    def collect_metrics(self, registry: MetricsRegistry) -> None:
+        capture_thread: Optional[CaptureThread] = self._capture_thread
+        if capture_thread is not None:
+            registry.set('frames_captured_total', capture_thread.captured_frames, camera= self.name)
+            registry.set('frames_dropped_total', capture_thread.dropped_frames, camera= self.name)
+        writers: dict[str, ImageWriter] = {'save': self.image_writer}
+        if self.recorder is not None:
+            writers['recorder'] = self.recorder.image_writer
+        if self.event_recorder is not None:
+            writers['events'] = self.event_recorder.image_writer
+            registry.set('queue_depth', len(self.event_recorder.buffer), camera= self.name, queue= 'events_buffer')
+            registry.set('queue_depth', self.event_recorder.pending, camera= self.name, queue= 'events_encoder')
+        for writer_name, writer in writers.items():
+            stats = writer.stats()
+            registry.set('writer_backlog', stats['pending'], camera= self.name, writer= writer_name)
+            for result in ('written', 'dropped', 'failed'):
+                registry.set('writer_images_total', stats[result], camera= self.name, writer= writer_name, result= result) # type: ignore
+
+    def on_frame_captured(self, frame_data: FrameData) -> None:
+        if self.recorder is not None:
+            self.recorder.on_frame(frame_data)
+        if self.event_recorder is not None:
+            self.event_recorder.on_frame(frame_data)
+
+    def get_settings(self) -> dict[str, Any]:
+        return dict(self.camera_info)
+
+    def enable_recording(
+        self,
+        start: bool = False,
+        key: int = ord('r'),
+        **kwargs
+    ) -> BurstRecorder:
+        self.recorder = BurstRecorder(
+            self.save_dir_path,
+            self.get_settings,
+            filters= self.save_filters,
+            **kwargs
+        )
+        self.keys_callbacks[key] = (self.recorder.toggle, {})
+        if start:
+            self.recorder.start()
+        return self.recorder
+
+    def enable_event_recording(
+        self,
+        rules: list[TriggerRule],
+        **kwargs
+    ) -> EventRecorder:
+        self.event_recorder = EventRecorder(
+            self.save_dir_path,
+            rules,
+            **kwargs
+        )
+        return self.event_recorder
+
+    def check_events(self) -> None:
+        if self.event_recorder is None or self.model is None:
+            return
+        self.event_recorder.check(self.model.result_tracker.last_result)
+
+    def on_properties_applied(self, applied: dict[str, float]) -> None:
+        for name, value in applied.items():
+            if name in ('auto_exposure', 'auto_wb'):
+                setattr(self, f'_{name}', int(value))
+            else:
+                self.camera_info[name] = int(value) # type: ignore
+
     def cleanup(self) -> None:
+        if self._capture_thread is not None:
+            self._capture_thread.stop()
+        self.image_writer.close()
         if self._cap is not None:
             self._cap.release()
             my_logger.debug(f'Camera {self.name} cleared.')
@@ -247,7 +413,7 @@ class CameraManager(ABC):
     @time_me
     def get_camera_resolution(
         self,
-        cap: cv2.VideoCapture
+        cap: FrameSource
     ) -> tuple[int, int]:
         self.width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         self.height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
@@ -257,7 +423,7 @@ class CameraManager(ABC):
     @time_me
     def set_camera_resolution(
         self,
-        cap: cv2.VideoCapture
+        cap: FrameSource
     ) -> None:
         cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
         cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
@@ -266,7 +432,7 @@ class CameraManager(ABC):
     @time_me
     def get_brightness(
         self,
-        cap: cv2.VideoCapture
+        cap: FrameSource
     ) -> float:
         self._brightness = int(cap.get(cv2.CAP_PROP_BRIGHTNESS))
         my_logger.info(f'Camera brightness: {self._brightness}.')
@@ -275,7 +441,7 @@ class CameraManager(ABC):
     @time_me
     def set_brightness(
         self,
-        cap: cv2.VideoCapture,
+        cap: FrameSource,
         b: Optional[float] = None
     ) -> None:
         if b is None:
@@ -286,7 +452,7 @@ class CameraManager(ABC):
     @time_me
     def get_contrast(
         self,
-        cap: cv2.VideoCapture
+        cap: FrameSource
     ) -> float:
         self._contrast = int(cap.get(cv2.CAP_PROP_CONTRAST))
         my_logger.info(f'Camera contrast: {self._contrast}.')
@@ -295,7 +461,7 @@ class CameraManager(ABC):
     @time_me
     def set_contrast(
         self,
-        cap: cv2.VideoCapture,
+        cap: FrameSource,
         c: Optional[float] = None
     ) -> None:
         if c is None:
@@ -306,7 +472,7 @@ class CameraManager(ABC):
     @time_me
     def get_saturation(
         self,
-        cap: cv2.VideoCapture
+        cap: FrameSource
     ) -> float:
         self._saturation = int(cap.get(cv2.CAP_PROP_SATURATION))
         my_logger.info(f'Camera saturation: {self._saturation}.')
@@ -315,7 +481,7 @@ class CameraManager(ABC):
     @time_me
     def set_saturation(
         self,
-        cap: cv2.VideoCapture,
+        cap: FrameSource,
         s: Optional[float] = None
     ) -> None:
         if s is None:
@@ -326,7 +492,7 @@ class CameraManager(ABC):
     @time_me
     def get_exposure(
         self,
-        cap: cv2.VideoCapture
+        cap: FrameSource
     ) -> float:
         self._exposure = int(cap.get(cv2.CAP_PROP_EXPOSURE))
         my_logger.info(f'Camera exposure: {self._exposure}.')
@@ -335,7 +501,7 @@ class CameraManager(ABC):
     @time_me
     def set_exposure(
         self,
-        cap: cv2.VideoCapture,
+        cap: FrameSource,
         e: Optional[float] = None
     ) -> None:
         if e is None:
@@ -346,7 +512,7 @@ class CameraManager(ABC):
     @time_me
     def get_auto_exposure(
         self,
-        cap: cv2.VideoCapture
+        cap: FrameSource
     ) -> float:
         self._auto_exposure = int(cap.get(cv2.CAP_PROP_AUTO_EXPOSURE))
         my_logger.info(f'Camera auto-exposure: {self._auto_exposure}.')
@@ -355,7 +521,7 @@ class CameraManager(ABC):
     @time_me
     def set_auto_exposure(
         self,
-        cap: cv2.VideoCapture,
+        cap: FrameSource,
         value: Optional[float] = None
     ) -> None:
         if value is None:
@@ -366,7 +532,7 @@ class CameraManager(ABC):
     @time_me
     def get_wb(
         self,
-        cap: cv2.VideoCapture
+        cap: FrameSource
     ) -> float:
         self._wb = int(cap.get(cv2.CAP_PROP_WB_TEMPERATURE))
         my_logger.info(f'Camera wb: {self._wb}.')
@@ -375,7 +541,7 @@ class CameraManager(ABC):
     @time_me
     def set_wb(
         self,
-        cap: cv2.VideoCapture,
+        cap: FrameSource,
         t: Optional[float] = None
     ) -> None:
         if t is None:
@@ -386,7 +552,7 @@ class CameraManager(ABC):
     @time_me
     def get_auto_wb(
         self,
-        cap: cv2.VideoCapture
+        cap: FrameSource
     ) -> float:
         self._auto_wb = int(cap.get(cv2.CAP_PROP_AUTO_WB))
         my_logger.info(f'Camera auto-wb: {self._auto_wb}.')
@@ -395,7 +561,7 @@ class CameraManager(ABC):
     @time_me
     def set_auto_wb(
         self,
-        cap: cv2.VideoCapture,
+        cap: FrameSource,
         value: Optional[float] = None
     ) -> None:
         if value is None:
@@ -410,20 +576,26 @@ class CameraManager(ABC):
 
     def capture_frame(
         self,
-        cap: cv2.VideoCapture
-    ) -> None:
-        ret: bool
-        self.last_frame: np.ndarray
-        for _ in range(2):
-            cap.grab()
-        ret, self.last_frame = cap.retrieve()
-        if not ret:
-            msg: str = 'Can\'t read frame.'
+        timeout: Optional[float] = 2.0
+    ) -> FrameData:
+        if self._capture_thread is None:
+            msg: str = 'Capture thread is not running.'
             my_logger.error(f'RuntimeError: {msg}')
             raise RuntimeError(msg)
+        last_seq: int = 0
+        if self.last_frame_data is not None:
+            last_seq = self.last_frame_data['seq']
+        self.last_frame_data = self._capture_thread.get_latest(last_seq, timeout)
+        self.last_frame: np.ndarray = self.last_frame_data['frame']
+        return self.last_frame_data
 
     def exit(self, *args, **kwargs) -> int:
         my_logger.info('Stopping stream...')
+        if self.recorder is not None:
+            self.recorder.stop()
+        if self.event_recorder is not None:
+            self.event_recorder.close()
+        self.image_writer.flush()
         data: DatasetMetadataDict = {
             'date': datetime.now(timezone.utc),
             'camera_width': self.width,
@@ -447,16 +619,15 @@ class CameraManager(ABC):
             subfolder = Path(kwargs['subfolder'])
         except:
             subfolder = Path("")
-        if len(self.save_filters) == 0:
-            save_image(self.last_frame, self.save_dir_path / subfolder)
-        else:
-            frame: np.ndarray = self.last_frame
-            for filter in self.save_filters:
-                frame: np.ndarray = filter(frame)
-            save_image(frame, self.save_dir_path / subfolder)
+        self.image_writer.submit(
+            self.last_frame,
+            self.save_dir_path / subfolder,
+            filters= self.save_filters
+        )
         return 0
 
     def load_params_from_model(self, model: ModelManager) -> None:
+        self.model = model
         self.show_filters = [model.process_frame]
         self.save_filters = model.filters
         self.width = model.camera_width
@@ -469,68 +640,95 @@ class CameraManager(ABC):
 
     def add_cam_prop_bars(
         self,
-        cap: cv2.VideoCapture
+        cap: FrameSource
     ) -> None:
         cv2.createTrackbar(
             'Brightness',
             self.name,
             int(self._brightness),
             255,
-            lambda x: self.set_brightness(cap, x)
+            lambda x: self.properties.request('brightness', x)
         )
         cv2.createTrackbar(
             'Contrast',
             self.name,
             int(self._contrast),
             255,
-            lambda x: self.set_contrast(cap, x)
+            lambda x: self.properties.request('contrast', x)
         )
         cv2.createTrackbar(
             'Saturation',
             self.name,
             int(self._saturation),
             255,
-            lambda x: self.set_saturation(cap, x)
+            lambda x: self.properties.request('saturation', x)
         )
         cv2.createTrackbar(
             'Exposure',
             self.name,
             int(self._exposure),
             255,
-            lambda x: self.set_exposure(cap, x)
+            lambda x: self.properties.request('exposure', x)
         )
         cv2.createTrackbar(
             'Temperature',
             self.name,
             int(self._wb),
             255,
-            lambda x: self.set_wb(cap, x)
+            lambda x: self.properties.request('wb', x)
         )
 
+    def apply_camera_settings(
+        self,
+        cap: FrameSource
+    ) -> None:
+        self.properties.request_many(
+            auto_exposure= MY_CFG.camera.auto_exposure,
+            auto_wb= MY_CFG.camera.auto_wb,
+            width= self.width,
+            height= self.height
+        )
+        self.properties.apply(cap, force= True)
+        my_logger.info(f'Camera resolution: {self.width}x{self.height} px.')
+
     def video_stream(self) -> None:
         self.keys_callbacks[27] = (self.exit, {})
         cv2.namedWindow(self.name, cv2.WINDOW_AUTOSIZE)
         with self.get_video_capture() as cap:
-            self.set_auto_exposure(cap, MY_CFG.camera.auto_exposure)
-            self.set_auto_wb(cap, MY_CFG.camera.auto_wb)
             self.add_cam_prop_bars(cap)
-            self.set_camera_resolution(cap)
+            self.apply_camera_settings(cap)
             self.reset_window_to_camera_resolution()
             my_logger.debug('Starting video stream.')
-            while True:
-                self.capture_frame(cap)
-                frames: list[np.ndarray] = [self.last_frame]
-                for filter in self.show_filters:
-                    frames.append(filter(self.last_frame))
-                images_grid: np.ndarray = ImageProcessing.get_images_grid(frames)
-                cv2.imshow(self.name, images_grid)
-                key: int = cv2.waitKey(1)
+            with self.start_capture_thread(cap) as capture_thread:
                 try:
-                    if self.keys_callbacks[key][0](**self.keys_callbacks[key][1]) < 0:
-                        break
-                except KeyError:
-                    if key != -1:
-                        #DELETE: prints
+                    self._stream_loop(capture_thread)
+                except EOFError:
+                    self.exit()
+        cv2.destroyAllWindows()
+
+    def _stream_loop(self, capture_thread: CaptureThread) -> None:
+        cap: FrameSource = capture_thread.cap
+        while True:
+            frame_data: FrameData = self.capture_frame()
+            METRICS.inc('frames_total', camera= self.name)
+            with PROFILER.frame(frame_data['seq'], frame_data['timestamp']):
+                frames: list[np.ndarray] = [self.last_frame]
+                with PROFILER.stage('show_filters'):
+                    for filter in self.show_filters:
+                        frames.append(filter(self.last_frame))
+                self.check_events()
+                with PROFILER.stage('grid'):
+                    images_grid: np.ndarray = ImageProcessing.get_images_grid(frames)
+                with PROFILER.stage('display'):
+                    cv2.imshow(self.name, images_grid)
+                    key: int = cv2.waitKey(1)
+            try:
+                if self.keys_callbacks[key][0](**self.keys_callbacks[key][1]) < 0:
+                    break
+            except KeyError:
+                if key != -1:
+                    #DELETE: prints
+                    with capture_thread.cap_lock:
                         print(f'CAP_PROP_BRIGHTNESS -> {cap.get(cv2.CAP_PROP_BRIGHTNESS)}')
                         print(f'CAP_PROP_CONTRAST -> {cap.get(cv2.CAP_PROP_CONTRAST)}')
                         print(f'CAP_PROP_SATURATION -> {cap.get(cv2.CAP_PROP_SATURATION)}')
@@ -538,9 +736,40 @@ class CameraManager(ABC):
                         print(f'CAP_PROP_EXPOSURE -> {cap.get(cv2.CAP_PROP_EXPOSURE)}')
                         print(f'CAP_PROP_WB_TEMPERATURE -> {cap.get(cv2.CAP_PROP_WB_TEMPERATURE)}')
                         print(f'CAP_PROP_AUTO_WB -> {cap.get(cv2.CAP_PROP_AUTO_WB)}')
-                        my_logger.debug(f'Key pressed: "{key}".')
-                sleep(0.2) #DELETE:
-        cv2.destroyAllWindows()
+                    my_logger.debug(f'Key pressed: "{key}".')
+
+
+class FrameSourceCameraManager(CameraManager):
+    def __init__(
+        self,
+        source: FrameSource,
+        index: int = 0
+    ) -> None:
+        self.source: FrameSource = source
+        super().__init__(index)
+
+    @staticmethod
+    def get_cameras_info() -> list[dict]:
+        return []
+
+    def select_camera(
+        self,
+        camera_id: Optional[int] = None
+    ) -> CameraInfo:
+        return CameraInfo(
+            index= 0 if camera_id is None else camera_id,
+            name= self.source.name,
+            width= 0,
+            height= 0,
+            brightness= MY_CFG.camera.brightness,
+            contrast= MY_CFG.camera.contrast,
+            saturation= MY_CFG.camera.saturation,
+            exposure= MY_CFG.camera.exposure,
+            wb= MY_CFG.camera.wb
+        )
+
+    def create_frame_source(self) -> FrameSource:
+        return self.source
 
 
 class WindowsCameraManager(CameraManager):
@@ -560,12 +789,28 @@ class WindowsCameraManager(CameraManager):
 
 
 class LinuxCamerasManager(CameraManager):
+    SYSFS_V4L_PATH: Path = Path('/sys/class/video4linux')
+
+    @classmethod
+    def get_devices_fingerprint(cls) -> list:
+        fingerprint: list = get_dev_nodes_fingerprint(cls.DEV_PATH)
+        if cls.SYSFS_V4L_PATH.is_dir():
+            fingerprint.append(sorted(
+                node.name
+                for node in cls.SYSFS_V4L_PATH.iterdir()
+            ))
+        return fingerprint
+
     @staticmethod
     @time_me
     def get_cameras_info() -> list[dict]:
-        cameras: list[dict] = LinuxCamerasManager.get_devices_list()
-        for camera in cameras:
-            camera['Details'] = LinuxCamerasManager.get_camera_details(camera['Device'])
+        cameras: list[dict]
+        if LinuxCamerasManager.SYSFS_V4L_PATH.is_dir():
+            cameras = LinuxCamerasManager.get_sysfs_devices_list()
+        else:
+            cameras = LinuxCamerasManager.get_devices_list()
+            for camera in cameras:
+                camera['Details'] = LinuxCamerasManager.get_camera_details(camera['Device'])
         cameras = [
             camera
             for camera in cameras
@@ -573,6 +818,35 @@ class LinuxCamerasManager(CameraManager):
         ]
         return cameras
 
+    @staticmethod
+    @time_me(debug= False)
+    def get_sysfs_devices_list() -> list[dict]:
+        cameras: list[dict] = []
+        nodes: list[Path] = [
+            node
+            for node in LinuxCamerasManager.SYSFS_V4L_PATH.glob('video*')
+            if node.name[len('video'):].isdigit()
+        ]
+        for node in sorted(nodes, key= lambda n: int(n.name[len('video'):])):
+            device: Path = node / 'device'
+            usb_device: Path = device / '..'
+            cameras.append({
+                'Name': read_sysfs_attr(node / 'name', node.name),
+                'Device': str(LinuxCamerasManager.DEV_PATH / node.name),
+                'Index': int(node.name[len('video'):]),
+                'Details': {
+                    'Node index': read_sysfs_attr(node / 'index'),
+                    'Dev': read_sysfs_attr(node / 'dev'),
+                    'Driver': (device / 'driver').resolve().name,
+                    'Vendor id': read_sysfs_attr(usb_device / 'idVendor'),
+                    'Product id': read_sysfs_attr(usb_device / 'idProduct'),
+                    'Manufacturer': read_sysfs_attr(usb_device / 'manufacturer'),
+                    'Product': read_sysfs_attr(usb_device / 'product'),
+                    'Serial': read_sysfs_attr(usb_device / 'serial'),
+                }
+            })
+        return cameras
+
     @staticmethod
     @time_me(debug= False)
     def get_devices_list() -> list[dict]:
@@ -652,7 +926,13 @@ class LinuxCamerasManager(CameraManager):
         return camera_details
 
 
-def camera_manager_factory(cameraID: Optional[int] = None) -> CameraManager:
+def camera_manager_factory(
+    cameraID: Optional[int] = None,
+    source: Optional[FrameSource] = None
+) -> CameraManager:
+    if source is not None:
+        my_logger.info(f'Frame source: {source}.')
+        return FrameSourceCameraManager(source, 0 if cameraID is None else cameraID)
     system: str = platform.system().lower()
     if system == 'windows':
         my_logger.info('Windows OS detected.')
@@ -0,0 +1,98 @@
+from threading import Lock
+from time import monotonic
+from typing import Callable, Optional
+
+import cv2
+
+from ..utils.config import MY_CFG, my_logger
+from .frame_sources import FrameSource
+
+CAMERA_PROPERTIES: dict[str, int] = {
+    'width': cv2.CAP_PROP_FRAME_WIDTH,
+    'height': cv2.CAP_PROP_FRAME_HEIGHT,
+    'auto_exposure': cv2.CAP_PROP_AUTO_EXPOSURE,
+    'auto_wb': cv2.CAP_PROP_AUTO_WB,
+    'brightness': cv2.CAP_PROP_BRIGHTNESS,
+    'contrast': cv2.CAP_PROP_CONTRAST,
+    'saturation': cv2.CAP_PROP_SATURATION,
+    'exposure': cv2.CAP_PROP_EXPOSURE,
+    'wb': cv2.CAP_PROP_WB_TEMPERATURE,
+}
+
+
+class CameraPropertiesController:
+    def __init__(
+        self,
+        on_applied: Optional[Callable[[dict[str, float]], None]] = None,
+        debounce: float = MY_CFG.camera.properties.debounce,
+        max_delay: float = MY_CFG.camera.properties.max_delay
+    ) -> None:
+        self.on_applied: Optional[Callable[[dict[str, float]], None]] = on_applied
+        self.debounce: float = debounce
+        self.max_delay: float = max_delay
+        self._pending: dict[str, float] = {}
+        self._lock = Lock()
+        self._first_request: float = 0.0
+        self._last_request: float = 0.0
+        self.n_requests: int = 0
+        self.n_batches: int = 0
+
+    @property
+    def has_pending(self) -> bool:
+        return len(self._pending) > 0
+
+    def request(self, name: str, value: float) -> None:
+        if name not in CAMERA_PROPERTIES:
+            msg: str = f'Camera property "{name}" not valid. Valid options: {list(CAMERA_PROPERTIES.keys())}.'
+            my_logger.error(f'ValueError: {msg}')
+            raise ValueError(msg)
+        now: float = monotonic()
+        with self._lock:
+            if len(self._pending) == 0:
+                self._first_request = now
+            self._pending[name] = float(value)
+            self._last_request = now
+            self.n_requests += 1
+
+    def request_many(self, **values: float) -> None:
+        for name, value in values.items():
+            self.request(name, value)
+
+    def _take_pending(self, force: bool) -> dict[str, float]:
+        if len(self._pending) == 0:
+            return {}
+        now: float = monotonic()
+        with self._lock:
+            if not force and all((
+                now - self._last_request < self.debounce,
+                now - self._first_request < self.max_delay
+            )):
+                return {}
+            pending: dict[str, float] = self._pending
+            self._pending = {}
+        return pending
+
+    def apply(
+        self,
+        cap: FrameSource,
+        force: bool = False
+    ) -> dict[str, float]:
+        pending: dict[str, float] = self._take_pending(force)
+        if len(pending) == 0:
+            return {}
+        names: list[str] = [
+            name
+            for name in CAMERA_PROPERTIES.keys()
+            if name in pending
+        ]
+        for name in names:
+            cap.set(CAMERA_PROPERTIES[name], pending[name])
+        applied: dict[str, float] = {
+            name: cap.get(CAMERA_PROPERTIES[name])
+            for name in names
+        }
+        self.n_batches += 1
+        my_logger.info(f'Camera properties applied: {applied}.')
+        if self.on_applied is not None:
+            self.on_applied(applied)
+        return applied
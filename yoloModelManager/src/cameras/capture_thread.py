@@ -0,0 +1,136 @@
+from threading import Condition, Event, Lock, Thread
+from time import monotonic
+from typing import Any, Callable, Optional, TypedDict
+
+import numpy as np
+
+from ..utils.config import my_logger
+from ..utils.profiling import PROFILER
+from .frame_sources import FrameSource
+
+
+class FrameData(TypedDict):
+    frame: np.ndarray
+    timestamp: float
+    seq: int
+
+
+class CaptureThread(Thread):
+    def __init__(
+        self,
+        cap: FrameSource,
+        name: str = 'capture'
+    ) -> None:
+        super().__init__(
+            name= f'CaptureThread-{name}',
+            daemon= True
+        )
+        self.cap: FrameSource = cap
+        self.cap_lock = Lock()
+        self._slot: Optional[FrameData] = None
+        self._slot_read: bool = True
+        self._new_frame = Condition()
+        self._stop_event = Event()
+        self._error: Optional[Exception] = None
+        self.captured_frames: int = 0
+        self.dropped_frames: int = 0
+        self.listeners: list[Callable[[FrameData], None]] = []
+        self.pre_read_callbacks: list[Callable[[FrameSource], Any]] = []
+
+    @property
+    def latest_seq(self) -> int:
+        slot: Optional[FrameData] = self._slot
+        if slot is None:
+            return 0
+        return slot['seq']
+
+    @property
+    def is_running(self) -> bool:
+        return self.is_alive() and not self._stop_event.is_set()
+
+    def run(self) -> None:
+        my_logger.debug(f'{self.name} started.')
+        try:
+            while not self._stop_event.is_set():
+                with self.cap_lock:
+                    for callback in self.pre_read_callbacks:
+                        callback(self.cap)
+                    with PROFILER.stage('capture_wait'):
+                        ret: bool = self.cap.grab()
+                    timestamp: float = monotonic()
+                    frame: Optional[np.ndarray] = None
+                    if ret:
+                        with PROFILER.stage('retrieve'):
+                            ret, frame = self.cap.retrieve()
+                if not ret and self.cap.is_finished():
+                    raise EOFError(f'End of "{self.cap.name}" stream.')
+                if not ret:
+                    msg: str = 'Can\'t read frame.'
+                    my_logger.error(f'RuntimeError: {msg}')
+                    raise RuntimeError(msg)
+                self._publish(frame, timestamp)
+        except EOFError as e:
+            my_logger.info(str(e))
+            self._error = e
+        except Exception as e:
+            self._error = e
+        finally:
+            with self._new_frame:
+                self._stop_event.set()
+                self._new_frame.notify_all()
+            my_logger.debug(f'{self.name} stopped.')
+
+    def _publish(
+        self,
+        frame: np.ndarray,
+        timestamp: float
+    ) -> None:
+        with self._new_frame:
+            if not self._slot_read:
+                self.dropped_frames += 1
+            self.captured_frames += 1
+            frame_data = FrameData(
+                frame= frame,
+                timestamp= timestamp,
+                seq= self.captured_frames
+            )
+            self._slot = frame_data
+            self._slot_read = False
+            self._new_frame.notify_all()
+        for listener in self.listeners:
+            try:
+                listener(frame_data)
+            except Exception as e:
+                my_logger.error(f'{self.name} listener failed: {e}')
+
+    def get_latest(
+        self,
+        after_seq: int = 0,
+        timeout: Optional[float] = None
+    ) -> FrameData:
+        with self._new_frame:
+            if timeout != 0:
+                self._new_frame.wait_for(
+                    lambda: (
+                        (self._slot is not None and self._slot['seq'] > after_seq)
+                        or self._stop_event.is_set()
+                    ),
+                    timeout
+                )
+            if self._error is not None:
+                raise self._error
+            if self._slot is None:
+                msg: str = 'No frame captured yet.'
+                my_logger.error(f'RuntimeError: {msg}')
+                raise RuntimeError(msg)
+            self._slot_read = True
+            return self._slot
+
+    def stop(self, timeout: Optional[float] = 2.0) -> None:
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+        my_logger.info(
+            f'{self.name}: {self.captured_frames} frames captured, '
+            f'{self.dropped_frames} dropped.'
+        )
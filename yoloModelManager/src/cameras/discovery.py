@@ -0,0 +1,91 @@
+import json
+from pathlib import Path
+from time import time
+from typing import Any, Optional, TypedDict
+
+from ..utils.config import CACHE_PATH, my_logger
+
+
+class CamerasDiscoveryDict(TypedDict):
+    created: float
+    fingerprint: list
+    working_indices: list[int]
+    cameras_info: list[dict]
+
+
+class CamerasDiscoveryCache:
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        cache_dir: Optional[Path] = None
+    ) -> None:
+        if cache_dir is None:
+            cache_dir = CACHE_PATH
+        self.path: Path = Path(cache_dir) / f'{name}.cameras.json'
+        self.ttl: float = ttl
+
+    def load(self, fingerprint: list) -> Optional[CamerasDiscoveryDict]:
+        if self.ttl <= 0 or not self.path.is_file():
+            return None
+        try:
+            with open(self.path, 'r') as f:
+                data: CamerasDiscoveryDict = json.load(f)
+        except (OSError, ValueError):
+            my_logger.warning(f'Cameras discovery cache "{self.path}" is not readable.')
+            return None
+        if time() - data.get('created', 0) > self.ttl:
+            my_logger.debug('Cameras discovery cache expired.')
+            return None
+        if data.get('fingerprint') != fingerprint:
+            my_logger.debug('Cameras discovery cache invalidated. Devices changed.')
+            return None
+        my_logger.debug(f'Cameras discovery loaded from "{self.path}".')
+        return data
+
+    def save(
+        self,
+        fingerprint: list,
+        working_indices: list[int],
+        cameras_info: list[dict]
+    ) -> None:
+        data: CamerasDiscoveryDict = {
+            'created': time(),
+            'fingerprint': fingerprint,
+            'working_indices': working_indices,
+            'cameras_info': cameras_info
+        }
+        try:
+            self.path.parent.mkdir(
+                parents= True,
+                exist_ok= True
+            )
+            tmp_path: Path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, default= str)
+            tmp_path.replace(self.path)
+        except OSError as e:
+            my_logger.warning(f'Can\'t save cameras discovery cache to "{self.path}": {e}')
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok= True)
+
+
+def get_dev_nodes_fingerprint(dev_path: Path = Path('/dev')) -> list:
+    fingerprint: list = []
+    if not dev_path.is_dir():
+        return fingerprint
+    for node in sorted(dev_path.glob('video*')):
+        try:
+            stat: Any = node.stat()
+        except OSError:
+            continue
+        fingerprint.append([node.name, stat.st_ino, stat.st_ctime_ns])
+    return fingerprint
+
+
+def read_sysfs_attr(path: Path, default: str = '') -> str:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return default
@@ -0,0 +1,306 @@
+import json
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from queue import Full, Queue
+from threading import Lock, Thread
+from time import monotonic
+from typing import Any, Optional, TypedDict
+
+import numpy as np
+from pyUtils import Styles
+
+from ..filesystem.files import encode_image
+from ..filesystem.image_writer import ImageWriter, WriterPolicies
+from ..model.results import MyResults
+from ..utils.config import MY_CFG, my_logger
+from .capture_thread import FrameData
+
+
+class BufferedFrame(TypedDict):
+    image: Optional[np.ndarray]
+    data: Optional[bytes]
+    timestamp: float
+    seq: int
+    nbytes: int
+
+
+class _EventTask(TypedDict):
+    path: Path
+    info: dict[str, Any]
+
+
+class FrameRingBuffer:
+    def __init__(
+        self,
+        max_bytes: int = int(MY_CFG.events.buffer_mb * 1e6),
+        max_seconds: float = MY_CFG.events.pre_seconds,
+        jpeg_quality: Optional[int] = None
+    ) -> None:
+        self.max_bytes: int = max_bytes
+        self.max_seconds: float = max_seconds
+        self.jpeg_quality: Optional[int] = jpeg_quality
+        self._frames: deque[BufferedFrame] = deque()
+        self._lock = Lock()
+        self.nbytes: int = 0
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    @property
+    def seconds(self) -> float:
+        with self._lock:
+            if len(self._frames) < 2:
+                return 0.0
+            return self._frames[-1]['timestamp'] - self._frames[0]['timestamp']
+
+    def make_frame(self, frame_data: FrameData) -> BufferedFrame:
+        if self.jpeg_quality is None:
+            return {
+                'image': frame_data['frame'],
+                'data': None,
+                'timestamp': frame_data['timestamp'],
+                'seq': frame_data['seq'],
+                'nbytes': frame_data['frame'].nbytes
+            }
+        data: bytes = encode_image(frame_data['frame'], 'jpg', self.jpeg_quality)
+        return {
+            'image': None,
+            'data': data,
+            'timestamp': frame_data['timestamp'],
+            'seq': frame_data['seq'],
+            'nbytes': len(data)
+        }
+
+    def push(self, frame_data: FrameData) -> None:
+        frame: BufferedFrame = self.make_frame(frame_data)
+        with self._lock:
+            self._frames.append(frame)
+            self.nbytes += frame['nbytes']
+            while len(self._frames) > 1 and (
+                self.nbytes > self.max_bytes
+                or frame['timestamp'] - self._frames[0]['timestamp'] > self.max_seconds
+            ):
+                self.nbytes -= self._frames.popleft()['nbytes']
+
+    def drain(self) -> list[BufferedFrame]:
+        with self._lock:
+            frames: list[BufferedFrame] = list(self._frames)
+            self._frames.clear()
+            self.nbytes = 0
+        return frames
+
+
+class TriggerRule:
+    def __init__(
+        self,
+        object_class: int | str,
+        min_conf: float = 0.5
+    ) -> None:
+        self.object_class: int | str = object_class
+        self.min_conf: float = min_conf
+
+    @classmethod
+    def parse(cls, rule: str) -> 'TriggerRule':
+        object_class, _, min_conf = rule.rpartition(':')
+        if not object_class:
+            object_class, min_conf = min_conf, '0.5'
+        try:
+            conf: float = float(min_conf)
+        except ValueError:
+            msg: str = f'Trigger rule "{rule}" not valid. Use "<class>:<min_conf>".'
+            my_logger.error(f'ValueError: {msg}')
+            raise ValueError(msg)
+        if object_class.isdigit():
+            return cls(int(object_class), conf)
+        return cls(object_class, conf)
+
+    def matches(self, result: Optional[MyResults]) -> bool:
+        if result is None or result.valid_boxes is None:
+            return False
+        for box in result.valid_boxes.boxes:
+            if box.conf < self.min_conf:
+                continue
+            if isinstance(self.object_class, int):
+                if box.object_n == self.object_class:
+                    return True
+            elif result.names.get(box.object_n) == self.object_class:
+                return True
+        return False
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.object_class!r}, {self.min_conf})'
+
+
+class EventRecorder:
+    WRITER_QUEUE_SIZE: int = 10000
+
+    def __init__(
+        self,
+        save_dir_path: Path,
+        rules: list[TriggerRule],
+        pre_seconds: float = MY_CFG.events.pre_seconds,
+        post_seconds: float = MY_CFG.events.post_seconds,
+        buffer_mb: float = MY_CFG.events.buffer_mb,
+        buffer_jpeg: bool = MY_CFG.events.buffer_jpeg,
+        jpeg_quality: int = MY_CFG.events.jpeg_quality,
+        image_writer: Optional[ImageWriter] = None,
+        queue_size: int = MY_CFG.events.queue_size
+    ) -> None:
+        self.save_dir_path: Path = Path(save_dir_path) / 'events'
+        self.rules: list[TriggerRule] = rules
+        self.post_seconds: float = post_seconds
+        self.buffer = FrameRingBuffer(
+            int(buffer_mb * 1e6),
+            pre_seconds,
+            jpeg_quality if buffer_jpeg else None
+        )
+        if image_writer is None:
+            image_writer = ImageWriter(
+                image_format= 'jpg' if buffer_jpeg else MY_CFG.writer.format,
+                quality= jpeg_quality if buffer_jpeg else None,
+                queue_size= self.WRITER_QUEUE_SIZE,
+                policy= WriterPolicies.DROP_NEW
+            )
+        self.image_writer: ImageWriter = image_writer
+        self.n_events: int = 0
+        self.dropped_frames: int = 0
+        self.dropped_events: int = 0
+        self._lock = Lock()
+        self._queue: Queue[Optional[FrameData | _EventTask]] = Queue(maxsize= max(1, queue_size))
+        self._worker: Optional[Thread] = None
+        self._event_path: Optional[Path] = None
+        self._post_until: float = 0.0
+
+    @property
+    def is_recording_event(self) -> bool:
+        return self._event_path is not None and monotonic() < self._post_until
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        self._worker = Thread(
+            target= self._run,
+            name= 'EventRecorder',
+            daemon= True
+        )
+        self._worker.start()
+
+    def on_frame(self, frame_data: FrameData) -> None:
+        self.start()
+        try:
+            self._queue.put_nowait(frame_data)
+        except Full:
+            self.dropped_frames += 1
+            my_logger.warning(f'Event recorder frame {frame_data["seq"]} dropped. Queue is full.')
+
+    def check(self, result: Optional[MyResults]) -> bool:
+        for rule in self.rules:
+            if rule.matches(result):
+                self.trigger(rule, result)
+                return True
+        return False
+
+    def trigger(
+        self,
+        rule: Optional[TriggerRule] = None,
+        result: Optional[MyResults] = None
+    ) -> Optional[Path]:
+        with self._lock:
+            self._post_until = monotonic() + self.post_seconds
+            if self._event_path is not None:
+                return self._event_path
+            self.n_events += 1
+            name: str = f'event_{datetime.now().strftime("%Y%m%d_%H%M%S")}_{self.n_events:04d}'
+            self._event_path = self.save_dir_path / name
+            event_path: Path = self._event_path
+        self.start()
+        try:
+            self._queue.put_nowait({
+                'path': event_path,
+                'info': {
+                    'date': datetime.now().isoformat(),
+                    'rule': repr(rule),
+                    'boxes': [] if result is None or result.valid_boxes is None
+                             else result.valid_boxes.data.tolist(),
+                    'post_seconds': self.post_seconds
+                }
+            })
+        except Full:
+            with self._lock:
+                if self._event_path == event_path:
+                    self._event_path = None
+                self.dropped_events += 1
+            my_logger.warning(f'Event "{event_path.name}" dropped. Queue is full.')
+            return None
+        return event_path
+
+    def _run(self) -> None:
+        event_path: Optional[Path] = None
+        while True:
+            task: Optional[FrameData | _EventTask] = self._queue.get()
+            try:
+                if task is None:
+                    return
+                if 'path' in task:
+                    event_path = task['path'] # type: ignore
+                    self._open_event(task) # type: ignore
+                    continue
+                frame_data: FrameData = task # type: ignore
+                with self._lock:
+                    if self._event_path is not None and frame_data['timestamp'] > self._post_until:
+                        self._close_event()
+                    if self._event_path is None:
+                        event_path = None
+                if event_path is None:
+                    self.buffer.push(frame_data)
+                else:
+                    self._write_frame(self.buffer.make_frame(frame_data), event_path, 'post')
+            except Exception as e:
+                my_logger.error(f'Event recorder failed: {e}')
+            finally:
+                self._queue.task_done()
+
+    def _open_event(self, task: _EventTask) -> None:
+        event_path: Path = task['path']
+        event_path.mkdir(
+            parents= True,
+            exist_ok= True
+        )
+        frames: list[BufferedFrame] = self.buffer.drain()
+        info: dict[str, Any] = {**task['info'], 'pre_frames': len(frames)}
+        with open(event_path / 'event.json', 'w') as f:
+            json.dump(info, f, default= str, indent= 2)
+        for frame in frames:
+            self._write_frame(frame, event_path, 'pre')
+        my_logger.info(f'Event triggered by {info["rule"]}: {len(frames)} pre-trigger frames saved to "{event_path}".')
+
+    def _write_frame(
+        self,
+        frame: BufferedFrame,
+        event_path: Path,
+        stage: str
+    ) -> None:
+        name: str = f'{frame["seq"]:08d}_{stage}'
+        if frame['data'] is not None:
+            self.image_writer.submit_encoded(frame['data'], event_path / f'{name}.jpg')
+        elif frame['image'] is not None:
+            self.image_writer.submit(frame['image'], event_path, image_name= name)
+
+    def _close_event(self) -> None:
+        my_logger.debug(f'Event "{self._event_path}" closed.', Styles.SUCCEED)
+        self._event_path = None
+
+    def close(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.put(None)
+            self._worker.join()
+        self._worker = None
+        with self._lock:
+            if self._event_path is not None:
+                self._close_event()
+        self.image_writer.flush()
@@ -0,0 +1,370 @@
+import re
+from abc import ABC, abstractmethod
+from pathlib import Path
+from time import perf_counter, sleep
+from typing import Callable, Optional
+
+import cv2
+import numpy as np
+
+from ..filesystem.files import ALLOWED_IMAGES_EXTENSIONS
+from ..utils.config import my_logger
+
+
+class FrameSource(ABC):
+    def __init__(
+        self,
+        name: str,
+        fps: Optional[float] = None
+    ) -> None:
+        self.name: str = name
+        self.fps: Optional[float] = fps
+        self._props: dict[int, float] = {}
+        self._next_frame_time: Optional[float] = None
+        self._grabbed: tuple[bool, Optional[np.ndarray]] = (False, None)
+
+    @abstractmethod
+    def open(self) -> bool:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def is_opened(self) -> bool:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def read(self) -> tuple[bool, Optional[np.ndarray]]:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def release(self) -> None:
+        raise NotImplementedError()
+
+    def grab(self) -> bool:
+        self._grabbed = self.read()
+        return self._grabbed[0]
+
+    def retrieve(self) -> tuple[bool, Optional[np.ndarray]]:
+        grabbed: tuple[bool, Optional[np.ndarray]] = self._grabbed
+        self._grabbed = (False, None)
+        return grabbed
+
+    def is_finished(self) -> bool:
+        return False
+
+    def get(self, prop_id: int) -> float:
+        return self._props.get(prop_id, 0.0)
+
+    def set(self, prop_id: int, value: float) -> bool:
+        self._props[prop_id] = float(value)
+        return True
+
+    def _throttle(self) -> None:
+        if self.fps is None or self.fps <= 0:
+            return
+        now: float = perf_counter()
+        if self._next_frame_time is None or self._next_frame_time < now:
+            self._next_frame_time = now
+        else:
+            sleep(self._next_frame_time - now)
+        self._next_frame_time += 1 / self.fps
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}("{self.name}")'
+
+
+class CameraFrameSource(FrameSource):
+    def __init__(
+        self,
+        index: int,
+        backend: Callable[[int], cv2.VideoCapture] = cv2.VideoCapture
+    ) -> None:
+        super().__init__(f'Camera {index}')
+        self.index: int = index
+        self.backend: Callable[[int], cv2.VideoCapture] = backend
+        self._cap: Optional[cv2.VideoCapture] = None
+
+    def open(self) -> bool:
+        self._cap = self.backend(self.index)
+        if not self._cap.isOpened():
+            return False
+        self._cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return True
+
+    def is_opened(self) -> bool:
+        return self._cap is not None and self._cap.isOpened()
+
+    def read(self) -> tuple[bool, Optional[np.ndarray]]:
+        if self._cap is None:
+            return False, None
+        return self._cap.read()
+
+    def grab(self) -> bool:
+        if self._cap is None:
+            return False
+        return self._cap.grab()
+
+    def retrieve(self) -> tuple[bool, Optional[np.ndarray]]:
+        if self._cap is None:
+            return False, None
+        return self._cap.retrieve()
+
+    def release(self) -> None:
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+    def get(self, prop_id: int) -> float:
+        if self._cap is None:
+            return 0.0
+        return self._cap.get(prop_id)
+
+    def set(self, prop_id: int, value: float) -> bool:
+        if self._cap is None:
+            return False
+        return self._cap.set(prop_id, value)
+
+
+class VideoFileFrameSource(FrameSource):
+    READONLY_PROPS: set[int] = {
+        cv2.CAP_PROP_FRAME_WIDTH,
+        cv2.CAP_PROP_FRAME_HEIGHT,
+        cv2.CAP_PROP_FPS,
+        cv2.CAP_PROP_FRAME_COUNT,
+    }
+
+    def __init__(
+        self,
+        path: str | Path,
+        realtime: bool = False,
+        loop: bool = False
+    ) -> None:
+        self.path: Path = Path(path)
+        super().__init__(self.path.name)
+        self.realtime: bool = realtime
+        self.loop: bool = loop
+        self._cap: Optional[cv2.VideoCapture] = None
+        self._finished: bool = False
+
+    def open(self) -> bool:
+        if not self.path.is_file():
+            my_logger.error(f'"{self.path}" does not exists.')
+            return False
+        self._cap = cv2.VideoCapture(str(self.path))
+        self._finished = False
+        self._next_frame_time = None
+        if self.realtime:
+            self.fps = self._cap.get(cv2.CAP_PROP_FPS) or None
+        return self._cap.isOpened()
+
+    def is_opened(self) -> bool:
+        return self._cap is not None and self._cap.isOpened()
+
+    def is_finished(self) -> bool:
+        return self._finished
+
+    def read(self) -> tuple[bool, Optional[np.ndarray]]:
+        if self._cap is None:
+            return False, None
+        self._throttle()
+        ret, frame = self._cap.read()
+        if not ret and self.loop:
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self._cap.read()
+        if not ret:
+            self._finished = True
+        return ret, frame
+
+    def release(self) -> None:
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+    def get(self, prop_id: int) -> float:
+        if self._cap is not None and prop_id in self.READONLY_PROPS:
+            return self._cap.get(prop_id)
+        return super().get(prop_id)
+
+    def set(self, prop_id: int, value: float) -> bool:
+        if prop_id in self.READONLY_PROPS:
+            return False
+        return super().set(prop_id, value)
+
+
+class ImageDirFrameSource(FrameSource):
+    def __init__(
+        self,
+        path: str | Path,
+        fps: Optional[float] = None,
+        loop: bool = False
+    ) -> None:
+        self.path: Path = Path(path)
+        super().__init__(self.path.name, fps)
+        self.loop: bool = loop
+        self._images: list[Path] = []
+        self._position: int = 0
+        self._opened: bool = False
+        self._shape: tuple[int, ...] = (0, 0)
+
+    def open(self) -> bool:
+        if not self.path.is_dir():
+            my_logger.error(f'"{self.path}" does not exists.')
+            return False
+        self._images = sorted(
+            file
+            for file in self.path.iterdir()
+            if file.is_file() and file.suffix.lower() in ALLOWED_IMAGES_EXTENSIONS
+        )
+        self._position = 0
+        self._next_frame_time = None
+        self._opened = len(self._images) > 0
+        for image in self._images:
+            first_image: Optional[np.ndarray] = cv2.imread(str(image))
+            if first_image is not None:
+                self._shape = first_image.shape
+                break
+        return self._opened
+
+    def is_opened(self) -> bool:
+        return self._opened
+
+    def is_finished(self) -> bool:
+        return self._position >= len(self._images) and not self.loop
+
+    def read(self) -> tuple[bool, Optional[np.ndarray]]:
+        if not self._opened or len(self._images) == 0:
+            return False, None
+        self._throttle()
+        while len(self._images) > 0:
+            if self._position >= len(self._images):
+                if not self.loop:
+                    return False, None
+                self._position = 0
+            image: Path = self._images[self._position]
+            frame: Optional[np.ndarray] = cv2.imread(str(image))
+            if frame is not None:
+                self._position += 1
+                return True, frame
+            my_logger.warning(f'"{image}" can\'t be read. It will be skipped.')
+            del self._images[self._position]
+        return False, None
+
+    def release(self) -> None:
+        self._opened = False
+
+    def get(self, prop_id: int) -> float:
+        if prop_id == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self._shape[1])
+        if prop_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self._shape[0])
+        if prop_id == cv2.CAP_PROP_FRAME_COUNT:
+            return float(len(self._images))
+        return super().get(prop_id)
+
+    def set(self, prop_id: int, value: float) -> bool:
+        if prop_id in (cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT):
+            return False
+        return super().set(prop_id, value)
+
+
+class SyntheticFrameSource(FrameSource):
+    def __init__(
+        self,
+        width: int = 640,
+        height: int = 480,
+        fps: Optional[float] = None,
+        n_frames: Optional[int] = None
+    ) -> None:
+        super().__init__(f'Synthetic {width}x{height}', fps)
+        self._props[cv2.CAP_PROP_FRAME_WIDTH] = float(width)
+        self._props[cv2.CAP_PROP_FRAME_HEIGHT] = float(height)
+        self.n_frames: Optional[int] = n_frames
+        self._count: int = 0
+        self._opened: bool = False
+        self._base: Optional[np.ndarray] = None
+
+    @property
+    def width(self) -> int:
+        return int(self._props[cv2.CAP_PROP_FRAME_WIDTH])
+
+    @property
+    def height(self) -> int:
+        return int(self._props[cv2.CAP_PROP_FRAME_HEIGHT])
+
+    def _build_base(self) -> np.ndarray:
+        x: np.ndarray = np.linspace(0, 255, self.width, dtype= np.uint8)
+        y: np.ndarray = np.linspace(0, 255, self.height, dtype= np.uint8)
+        base: np.ndarray = np.empty((self.height, self.width, 3), dtype= np.uint8)
+        base[:, :, 0] = x[np.newaxis, :]
+        base[:, :, 1] = y[:, np.newaxis]
+        base[:, :, 2] = 128
+        return base
+
+    def open(self) -> bool:
+        self._count = 0
+        self._next_frame_time = None
+        self._base = self._build_base()
+        self._opened = True
+        return True
+
+    def is_opened(self) -> bool:
+        return self._opened
+
+    def is_finished(self) -> bool:
+        return self.n_frames is not None and self._count >= self.n_frames
+
+    def read(self) -> tuple[bool, Optional[np.ndarray]]:
+        if not self._opened or self.is_finished():
+            return False, None
+        self._throttle()
+        if self._base is None or self._base.shape[:2] != (self.height, self.width):
+            self._base = self._build_base()
+        frame: np.ndarray = np.roll(self._base, self._count % self.width, axis= 1)
+        cv2.putText(
+            frame,
+            str(self._count),
+            (10, 30),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            1,
+            (255, 255, 255),
+            2
+        )
+        self._count += 1
+        return True, frame
+
+    def release(self) -> None:
+        self._opened = False
+
+
+def frame_source_factory(
+    source: str | Path,
+    realtime: bool = False,
+    loop: bool = False
+) -> FrameSource:
+    synthetic = re.fullmatch(
+        r'synthetic(?::(\d+)x(\d+))?(?:@(\d+(?:\.\d+)?))?',
+        str(source).lower()
+    )
+    if synthetic is not None:
+        return SyntheticFrameSource(
+            width= int(synthetic.group(1) or 640),
+            height= int(synthetic.group(2) or 480),
+            fps= float(synthetic.group(3)) if synthetic.group(3) else None
+        )
+    if str(source).isdigit():
+        return CameraFrameSource(int(source))
+    path = Path(source)
+    if path.is_dir():
+        return ImageDirFrameSource(
+            path,
+            fps= 1.0 if realtime else None,
+            loop= loop
+        )
+    if path.is_file():
+        return VideoFileFrameSource(
+            path,
+            realtime= realtime,
+            loop= loop
+        )
+    msg: str = f'"{source}" is not a valid frame source.'
+    my_logger.error(f'ValueError: {msg}')
+    raise ValueError(msg)
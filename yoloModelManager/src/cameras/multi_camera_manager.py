@@ -0,0 +1,173 @@
+from contextlib import ExitStack
+from time import sleep
+from typing import Callable, Optional
+
+import cv2
+import numpy as np
+
+from ..image.image_processing import ImageProcessing
+from ..model.model_manager import ModelManager
+from ..model.results import MyResults, ResultTracker
+from ..utils.config import my_logger
+from ..utils.profiling import PROFILER
+from .camera_manager import CameraManager, camera_manager_factory
+from .frame_sources import FrameSource
+
+CameraSink = Callable[[CameraManager, np.ndarray, MyResults], None]
+
+
+class MultiCameraManager:
+    IDLE_SLEEP: float = 0.001
+
+    def __init__(
+        self,
+        cameras: list[CameraManager],
+        model: ModelManager,
+        max_batch: Optional[int] = None,
+        sinks: Optional[dict[int, CameraSink]] = None
+    ) -> None:
+        if len(cameras) == 0:
+            msg: str = 'At least one camera is needed.'
+            my_logger.error(f'ValueError: {msg}')
+            raise ValueError(msg)
+        self.cameras: list[CameraManager] = cameras
+        self.model: ModelManager = model
+        self.max_batch = max_batch
+        self.sinks: dict[int, CameraSink] = {} if sinks is None else sinks
+        self.result_trackers: dict[int, ResultTracker] = {
+            position: ResultTracker()
+            for position in range(len(self.cameras))
+        }
+        self.keys_callbacks: dict[int, tuple[Callable, dict]] = {}
+        self._next_camera: int = 0
+        self._last_seqs: dict[int, int] = {}
+        self._ticks: int = 0
+        for camera in self.cameras:
+            camera.load_params_from_model(model)
+        my_logger.info(f'Multi-camera manager set to: {[camera.name for camera in self.cameras]}.')
+
+    @classmethod
+    def from_camera_ids(
+        cls,
+        camera_ids: list[int],
+        model: ModelManager,
+        max_batch: Optional[int] = None
+    ) -> 'MultiCameraManager':
+        return cls(
+            [camera_manager_factory(camera_id) for camera_id in camera_ids],
+            model,
+            max_batch
+        )
+
+    @property
+    def max_batch(self) -> int:
+        return self._max_batch
+
+    @max_batch.setter
+    def max_batch(self, value: Optional[int]) -> None:
+        if value is None:
+            value = len(self.cameras)
+        if value < 1:
+            msg: str = f'"{self.__class__.__name__}.max_batch" should be greater than 0.'
+            my_logger.error(f'ValueError: {msg}')
+            raise ValueError(msg)
+        self._max_batch: int = value
+
+    @property
+    def dropped_frames(self) -> dict[int, int]:
+        return {
+            position: camera.dropped_frames
+            for position, camera in enumerate(self.cameras)
+        }
+
+    def show_sink(
+        self,
+        camera: CameraManager,
+        result_img: np.ndarray,
+        result: MyResults
+    ) -> None:
+        cv2.imshow(
+            camera.name,
+            ImageProcessing.get_images_grid([camera.last_frame, result_img])
+        )
+
+    def select_ready_cameras(self) -> list[int]:
+        n: int = len(self.cameras)
+        ready: list[int] = []
+        last_position: Optional[int] = None
+        for offset in range(n):
+            position: int = (self._next_camera + offset) % n
+            camera: CameraManager = self.cameras[position]
+            if camera._capture_thread is None:
+                continue
+            if camera._capture_thread.latest_seq > self._last_seqs.get(position, 0):
+                ready.append(position)
+                last_position = position
+                if len(ready) == self.max_batch:
+                    break
+        if last_position is not None:
+            self._next_camera = (last_position + 1) % n
+        return ready
+
+    def process_tick(self) -> int:
+        ready: list[int] = self.select_ready_cameras()
+        if len(ready) == 0:
+            return 0
+        frames: list[np.ndarray] = []
+        timestamps: list[float] = []
+        for position in ready:
+            frame_data = self.cameras[position].capture_frame(timeout= 0)
+            self._last_seqs[position] = frame_data['seq']
+            frames.append(frame_data['frame'])
+            timestamps.append(frame_data['timestamp'])
+        self._ticks += 1
+        with PROFILER.frame(self._ticks, min(timestamps)):
+            results_imgs: list[np.ndarray] = self.model.process_frames(
+                frames,
+                [self.result_trackers[position] for position in ready]
+            )
+            for position, result_img in zip(ready, results_imgs):
+                camera: CameraManager = self.cameras[position]
+                result: Optional[MyResults] = self.result_trackers[position].last_result
+                if camera.event_recorder is not None:
+                    camera.event_recorder.check(result)
+                sink: CameraSink = self.sinks.get(position, self.show_sink)
+                with PROFILER.stage('display'):
+                    sink(camera, result_img, result) # type: ignore
+        return len(ready)
+
+    def save_last_frames(self, *args, **kwargs) -> int:
+        for camera in self.cameras:
+            if camera.last_frame_data is not None:
+                camera.save_last_frame(*args, **kwargs)
+        return 0
+
+    def exit(self, *args, **kwargs) -> int:
+        for camera in self.cameras:
+            camera.exit(*args, **kwargs)
+        return -1
+
+    def video_stream(self) -> None:
+        self.keys_callbacks[27] = (self.exit, {})
+        self._last_seqs = {}
+        with ExitStack() as stack:
+            for camera in self.cameras:
+                cap: FrameSource = stack.enter_context(camera.get_video_capture())
+                camera.apply_camera_settings(cap)
+                stack.enter_context(camera.start_capture_thread(cap))
+            my_logger.debug('Starting multi-camera video stream.')
+            while True:
+                try:
+                    if self.process_tick() == 0:
+                        sleep(self.IDLE_SLEEP)
+                except EOFError:
+                    self.exit()
+                    break
+                key: int = cv2.waitKey(1)
+                if key in self.keys_callbacks:
+                    if self.keys_callbacks[key][0](**self.keys_callbacks[key][1]) < 0:
+                        break
+                elif key != -1:
+                    my_logger.debug(f'Key pressed: "{key}".')
+            my_logger.info(f'Dropped frames per camera: {self.dropped_frames}.')
+        cv2.destroyAllWindows()
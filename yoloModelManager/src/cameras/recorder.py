@@ -0,0 +1,201 @@
+import json
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Optional, TextIO, TypedDict
+
+import cv2
+import numpy as np
+from pyUtils import Styles
+
+from ..filesystem.image_writer import ImageWriter, WriterPolicies
+from ..utils.config import MY_CFG, my_logger
+from .capture_thread import FrameData
+
+
+class RecordModes(Enum):
+    RATE = 'rate'
+    EVERY = 'every'
+    SCENE = 'scene'
+
+
+class RecordingSummaryDict(TypedDict):
+    session_path: str
+    frames_seen: int
+    frames_selected: int
+    frames_recorded: int
+    frames_dropped: int
+    frames_failed: int
+    bytes_written: int
+    elapsed: float
+    fps: float
+    mb_per_second: float
+
+
+class BurstRecorder:
+    SCENE_SIZE: tuple[int, int] = (64, 48)
+
+    def __init__(
+        self,
+        save_dir_path: Path,
+        settings_getter: Callable[[], dict[str, Any]],
+        mode: str | RecordModes = MY_CFG.recorder.mode,
+        rate: float = MY_CFG.recorder.rate,
+        every: int = MY_CFG.recorder.every,
+        scene_threshold: float = MY_CFG.recorder.scene_threshold,
+        chunk_size: int = MY_CFG.recorder.chunk_size,
+        filters: Optional[list[Callable[[np.ndarray], np.ndarray]]] = None,
+        image_writer: Optional[ImageWriter] = None
+    ) -> None:
+        self.save_dir_path: Path = Path(save_dir_path)
+        self.settings_getter: Callable[[], dict[str, Any]] = settings_getter
+        self.mode: RecordModes = RecordModes(mode)
+        self.rate: float = rate
+        self.every: int = max(1, every)
+        self.scene_threshold: float = scene_threshold
+        self.chunk_size: int = max(1, chunk_size)
+        self.filters: list[Callable[[np.ndarray], np.ndarray]] = [] if filters is None else filters
+        if image_writer is None:
+            image_writer = ImageWriter(policy= WriterPolicies.DROP_NEW)
+        self.image_writer: ImageWriter = image_writer
+        self.session_path: Optional[Path] = None
+        self._index_file: Optional[TextIO] = None
+        self._index_lock = Lock()
+        self._recording: bool = False
+        self._reset_counters()
+
+    @property
+    def is_recording(self) -> bool:
+        return self._recording
+
+    def _reset_counters(self) -> None:
+        self.frames_seen: int = 0
+        self.frames_selected: int = 0
+        self._start_time: float = monotonic()
+        self._start_stats = self.image_writer.stats()
+        self._last_timestamp: Optional[float] = None
+        self._last_scene: Optional[np.ndarray] = None
+
+    def start(self) -> Path:
+        if self._recording:
+            return self.session_path # type: ignore
+        name: str = f'record_{datetime.now().strftime("%Y%m%d_%H%M%S")}'
+        self.session_path = self.save_dir_path / name
+        self.session_path.mkdir(
+            parents= True,
+            exist_ok= True
+        )
+        self._index_file = open(self.session_path / 'index.jsonl', 'a')
+        self._reset_counters()
+        self._recording = True
+        my_logger.info(f'Recording ({self.mode.value}) to "{self.session_path}".')
+        return self.session_path
+
+    def stop(self) -> Optional[RecordingSummaryDict]:
+        if not self._recording:
+            return None
+        self._recording = False
+        self.image_writer.flush()
+        with self._index_lock:
+            if self._index_file is not None:
+                self._index_file.close()
+                self._index_file = None
+        summary: RecordingSummaryDict = self.summary()
+        print(
+            f'Recorded {summary["frames_recorded"]}/{summary["frames_seen"]} frames '
+            f'in {summary["elapsed"]:.1f} s to "{summary["session_path"]}": '
+            f'{summary["fps"]:.1f} frames/s, {summary["mb_per_second"]:.2f} MB/s, '
+            f'{summary["frames_dropped"]} dropped, {summary["frames_failed"]} failed.'
+        )
+        my_logger.debug(f'Recording finished: {summary}', Styles.SUCCEED)
+        return summary
+
+    def toggle(self, *args, **kwargs) -> int:
+        if self._recording:
+            self.stop()
+        else:
+            self.start()
+        return 0
+
+    def summary(self) -> RecordingSummaryDict:
+        elapsed: float = max(monotonic() - self._start_time, 1e-9)
+        stats = self.image_writer.stats()
+        frames_recorded: int = stats['written'] - self._start_stats['written']
+        bytes_written: int = stats['bytes_written'] - self._start_stats['bytes_written']
+        return {
+            'session_path': str(self.session_path),
+            'frames_seen': self.frames_seen,
+            'frames_selected': self.frames_selected,
+            'frames_recorded': frames_recorded,
+            'frames_dropped': stats['dropped'] - self._start_stats['dropped'],
+            'frames_failed': stats['failed'] - self._start_stats['failed'],
+            'bytes_written': bytes_written,
+            'elapsed': elapsed,
+            'fps': frames_recorded / elapsed,
+            'mb_per_second': bytes_written / elapsed / 1e6
+        }
+
+    def should_record(self, frame_data: FrameData) -> bool:
+        if self.mode == RecordModes.EVERY:
+            return (self.frames_seen - 1) % self.every == 0
+        if self.mode == RecordModes.RATE:
+            if self.rate <= 0:
+                return True
+            if self._last_timestamp is None:
+                return True
+            return frame_data['timestamp'] - self._last_timestamp >= 1 / self.rate
+        scene: np.ndarray = cv2.resize(
+            frame_data['frame'],
+            self.SCENE_SIZE,
+            interpolation= cv2.INTER_AREA
+        )
+        if len(scene.shape) == 3:
+            scene = cv2.cvtColor(scene, cv2.COLOR_BGR2GRAY)
+        if self._last_scene is None:
+            self._last_scene = scene
+            return True
+        if float(cv2.absdiff(scene, self._last_scene).mean()) < self.scene_threshold:
+            return False
+        self._last_scene = scene
+        return True
+
+    def on_frame(self, frame_data: FrameData) -> None:
+        if not self._recording or self.session_path is None:
+            return
+        self.frames_seen += 1
+        if not self.should_record(frame_data):
+            return
+        self._last_timestamp = frame_data['timestamp']
+        n: int = self.frames_selected
+        chunk: str = f'chunk_{n // self.chunk_size:04d}'
+        entry: dict[str, Any] = {
+            'n': n,
+            'seq': frame_data['seq'],
+            'timestamp': frame_data['timestamp'],
+            'date': datetime.now().isoformat(),
+            'chunk': chunk,
+            'settings': self.settings_getter()
+        }
+        self.frames_selected += 1
+        self.image_writer.submit(
+            frame_data['frame'],
+            self.session_path / chunk,
+            image_name= f'{n:08d}',
+            callback= lambda path, ok: self._on_written(entry, path, ok),
+            filters= self.filters
+        )
+
+    def _on_written(
+        self,
+        entry: dict[str, Any],
+        path: Path,
+        ok: bool
+    ) -> None:
+        if not ok:
+            return
+        entry['file'] = f'{entry["chunk"]}/{path.name}'
+        with self._index_lock:
+            if self._index_file is not None:
+                self._index_file.write(json.dumps(entry, default= str) + '\n')
@@ -1,4 +1,13 @@
+from .compression import CompressionSummaryDict, compress_images
+from .dedup import BKTree, HashMethods, cluster_hashes, compute_image_hash
 from .dirs import check_dir_path
-from .dirs_managers import DatasetDirManager, TrainingDatasetDirManager
-from .files import (ALLOWED_IMAGES_EXTENSIONS, create_dataset_medatada_yaml,
-                    save_image)
+from .dirs_managers import (DatasetDirManager, TrainingDatasetDirManager,
+                            ZipDatasetDirManager)
+from .files import (ALLOWED_IMAGES_EXTENSIONS, IMAGE_FORMATS,
+                    create_dataset_medatada_yaml, encode_image, save_image,
+                    write_image)
+from .image_writer import ImageWriter, WriterPolicies
+from .labels import LabelsStatsDict, get_labels_stats, load_labels
+from .manifest import DatasetManifest
+from .transfer import TransferModes, TransferSummaryDict, transfer_files
+from .validation import ValidationIssueDict, ValidationIssues
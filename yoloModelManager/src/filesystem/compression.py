@@ -0,0 +1,126 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from os import replace
+from pathlib import Path
+from time import monotonic
+from typing import Optional, TypedDict
+
+import cv2
+import numpy as np
+from pyUtils import Styles
+
+from ..utils.config import MY_CFG, my_logger
+from ..utils.data_types import ProgressCallback
+from .files import encode_image, get_image_format
+
+
+class CompressionSummaryDict(TypedDict):
+    images: int
+    compressed: int
+    skipped: int
+    failed: int
+    bytes_before: int
+    bytes_after: int
+    elapsed: float
+    renamed: dict[Path, Path]
+
+
+def is_compliant(
+    image_path: Path,
+    image_format: str,
+    quality: Optional[int] = None,
+    encoding: Optional[tuple[str, Optional[int]]] = None
+) -> bool:
+    if encoding is None:
+        return False
+    extension: str
+    default_quality: int
+    extension, _, default_quality = get_image_format(image_format)
+    try:
+        recorded_extension: str = get_image_format(str(encoding[0]))[0]
+    except ValueError:
+        return False
+    return all([
+        image_path.suffix.lower().replace('.jpeg', '.jpg') == extension,
+        recorded_extension == extension,
+        encoding[1] == (default_quality if quality is None else quality)
+    ])
+
+def compress_image(
+    image_path: Path,
+    image_format: str = MY_CFG.compression.format,
+    quality: Optional[int] = None
+) -> tuple[Path, int, int]:
+    destiny: Path = image_path.with_suffix(get_image_format(image_format)[0])
+    if destiny != image_path and destiny.exists():
+        raise FileExistsError(f'"{destiny}" already exists.')
+    image: Optional[np.ndarray] = cv2.imread(str(image_path), cv2.IMREAD_UNCHANGED)
+    if image is None:
+        raise ValueError(f'"{image_path}" can\'t be decoded.')
+    data: bytes = encode_image(image, image_format, quality)
+    before: int = image_path.stat().st_size
+    temp_path: Path = destiny.with_name(f'.{destiny.name}.tmp')
+    temp_path.write_bytes(data)
+    replace(temp_path, destiny)
+    if destiny != image_path:
+        image_path.unlink()
+    return destiny, before, len(data)
+
+def compress_images(
+    images: list[Path],
+    image_format: str = MY_CFG.compression.format,
+    quality: Optional[int] = None,
+    workers: int = MY_CFG.compression.workers,
+    force: bool = False,
+    progress: Optional[ProgressCallback] = None,
+    encoding: Optional[tuple[str, Optional[int]]] = None
+) -> CompressionSummaryDict:
+    get_image_format(image_format)
+    summary: CompressionSummaryDict = {
+        'images': len(images),
+        'compressed': 0,
+        'skipped': 0,
+        'failed': 0,
+        'bytes_before': 0,
+        'bytes_after': 0,
+        'elapsed': 0.0,
+        'renamed': {}
+    }
+    pending: list[Path] = []
+    for image in images:
+        if not force and is_compliant(image, image_format, quality, encoding):
+            summary['skipped'] += 1
+        else:
+            pending.append(image)
+    start: float = monotonic()
+    last_progress: float = start
+    if len(pending) > 0:
+        with ProcessPoolExecutor(max_workers= max(1, workers)) as executor:
+            futures = {
+                executor.submit(compress_image, image, image_format, quality): image
+                for image in pending
+            }
+            for i, future in enumerate(as_completed(futures), start= 1):
+                image: Path = futures[future]
+                try:
+                    destiny, before, after = future.result()
+                except (OSError, ValueError, RuntimeError) as e:
+                    summary['failed'] += 1
+                    my_logger.warning(f'"{image}" can\'t be compressed: {e}')
+                else:
+                    summary['compressed'] += 1
+                    summary['bytes_before'] += before
+                    summary['bytes_after'] += after
+                    if destiny != image:
+                        summary['renamed'][image] = destiny
+                now: float = monotonic()
+                if progress is not None and (now - last_progress > 0.5 or i == len(futures)):
+                    last_progress = now
+                    progress('Images compressed', i, len(futures))
+    summary['elapsed'] = monotonic() - start
+    my_logger.debug(
+        f'{summary["compressed"]} images compressed to {image_format}, {summary["skipped"]} skipped and '
+        f'{summary["failed"]} failed in {summary["elapsed"]:.2f} s: '
+        f'{summary["bytes_before"] / 1e6:.2f} MB -> {summary["bytes_after"] / 1e6:.2f} MB.',
+        Styles.SUCCEED
+    )
+    return summary
@@ -0,0 +1,119 @@
+from enum import Enum
+from pathlib import Path
+from typing import Callable, Generic, Optional, TypeVar
+
+import cv2
+import numpy as np
+
+from ..utils.config import MY_CFG, my_logger
+
+T = TypeVar('T')
+
+
+class HashMethods(Enum):
+    DHASH = 'dhash'
+    PHASH = 'phash'
+
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    return int.from_bytes(np.packbits(bits.flatten()).tobytes(), 'big')
+
+def dhash(gray: np.ndarray, size: int = 8) -> int:
+    resized: np.ndarray = cv2.resize(gray, (size + 1, size), interpolation= cv2.INTER_AREA)
+    return _bits_to_int(resized[:, 1:] > resized[:, :-1])
+
+def phash(gray: np.ndarray, size: int = 8) -> int:
+    resized: np.ndarray = cv2.resize(gray, (size * 4, size * 4), interpolation= cv2.INTER_AREA)
+    dct: np.ndarray = cv2.dct(resized.astype(np.float32))[:size, :size]
+    return _bits_to_int(dct > np.median(dct[1:, 1:]))
+
+def compute_image_hash(
+    path: Path,
+    method: str | HashMethods = MY_CFG.dedup.method,
+    read: Optional[Callable[[Path], bytes]] = None
+) -> Optional[int]:
+    method = HashMethods(method)
+    gray: Optional[np.ndarray]
+    if read is None:
+        gray = cv2.imread(str(path), cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    else:
+        gray = cv2.imdecode(np.frombuffer(read(path), np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    if gray is None:
+        my_logger.warning(f'Image "{path}" can\'t be read to compute its hash.')
+        return None
+    if method == HashMethods.PHASH:
+        return phash(gray)
+    return dhash(gray)
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class BKTree(Generic[T]):
+    def __init__(self) -> None:
+        self._root: Optional[tuple[int, list[T], dict[int, tuple]]] = None
+        self._size: int = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, value: int, item: T) -> None:
+        self._size += 1
+        if self._root is None:
+            self._root = (value, [item], {})
+            return
+        node = self._root
+        while True:
+            distance: int = hamming_distance(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (value, [item], {})
+                return
+            node = child
+
+    def search(self, value: int, radius: int) -> list[T]:
+        if self._root is None:
+            return []
+        found: list[T] = []
+        pending: list[tuple] = [self._root]
+        while pending:
+            node = pending.pop()
+            distance: int = hamming_distance(value, node[0])
+            if distance <= radius:
+                found.extend(node[1])
+            for child_distance, child in node[2].items():
+                if distance - radius <= child_distance <= distance + radius:
+                    pending.append(child)
+        return found
+
+
+def cluster_hashes(
+    hashes: dict[Path, int],
+    threshold: int = MY_CFG.dedup.threshold
+) -> dict[Path, Path]:
+    paths: list[Path] = sorted(hashes)
+    tree: BKTree[int] = BKTree()
+    for i, path in enumerate(paths):
+        tree.add(hashes[path], i)
+    parents: list[int] = list(range(len(paths)))
+
+    def find(i: int) -> int:
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+
+    for i, path in enumerate(paths):
+        for j in tree.search(hashes[path], threshold):
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parents[max(root_i, root_j)] = min(root_i, root_j)
+    return {path: paths[find(i)] for i, path in enumerate(paths)}
+
+def thin_cluster(images: list[T], keep: int) -> list[T]:
+    if keep <= 0 or len(images) <= keep:
+        return images
+    return [images[i] for i in np.linspace(0, len(images) - 1, keep).round().astype(int)]
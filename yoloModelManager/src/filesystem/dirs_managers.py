@@ -1,14 +1,74 @@
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from hashlib import blake2b
+from os import replace, sep
 from pathlib import Path
-from random import shuffle
+from threading import Lock, local
+from time import monotonic
 from typing import Any, Optional
 
+import numpy as np
 import yaml
 from pyUtils import Styles, copy_files, unzip_dir
 
-from ..utils.config import DATASETS_PATH, IMAGES_PATH, my_logger
-from ..utils.data_types import DatasetDataDict, DatasetMetadataDict, ModelTasks
+from ..utils.config import (CACHE_PATH, DATASETS_PATH, IMAGES_PATH, MY_CFG,
+                            my_logger)
+from ..utils.data_types import (DatasetDataDict, DatasetMetadataDict, ModelTasks,
+                                ProgressCallback)
+from .compression import CompressionSummaryDict, compress_images
+from .dedup import HashMethods, cluster_hashes, compute_image_hash, thin_cluster
 from .dirs import check_dir_path
-from .files import ALLOWED_IMAGES_EXTENSIONS
+from .files import ALLOWED_IMAGES_EXTENSIONS, get_image_format
+from .labels import (LabelsStatsDict, get_class_counts, get_labels_stats,
+                     load_labels, select_labels, stratified_assignment)
+from .manifest import DatasetManifest, pair_labels
+from .training_cache import build_split_cache, get_training_cache_key
+from .transfer import TransferModes, TransferSummaryDict, transfer_files
+from .validation import (ValidationIssueDict, ValidationIssues,
+                         get_image_validation_key, get_label_validation_key,
+                         validate_file, validate_keys)
+
+SPLIT_LISTS_NAMES: tuple[str, str, str] = ('train.txt', 'val.txt', 'test.txt')
+SPLIT_HASH_KEYS: tuple[str, str] = ('stem', 'content')
+DATA_YAML_KEYS: tuple[str, ...] = tuple(DatasetDataDict.__annotations__)
+METADATA_YAML_KEYS: tuple[str, ...] = ('camera_width', 'camera_height', 'filters')
+
+
+def get_split_position(
+    key: str,
+    seed: Optional[int] = None
+) -> float:
+    salt: str = '' if seed is None else f'{seed}:'
+    digest: bytes = blake2b(f'{salt}{key}'.encode(), digest_size= 8).digest()
+    return int.from_bytes(digest, 'big') / 2**64
+
+def get_split_index(
+    key: str,
+    validation: float,
+    test: float,
+    seed: Optional[int] = None
+) -> int:
+    position: float = get_split_position(key, seed)
+    if position < validation:
+        return 1
+    if position < validation + test:
+        return 2
+    return 0
+
+
+def load_yaml_file(path: Path, keys: tuple[str, ...]) -> dict:
+    with open(path, 'r') as f:
+        content: Optional[dict] = yaml.safe_load(f)
+    issues: list[ValidationIssueDict] = validate_keys(path, content, keys)
+    if len(issues) > 0:
+        msg: str = f'"{path}" is not valid. {" ".join(issue["detail"] for issue in issues)}'
+        my_logger.error(f'ValueError: {msg}')
+        raise ValueError(msg)
+    return content # type: ignore
+
+def get_yolo_label_path(image_path: Path) -> Path:
+    images_dir, labels_dir = f'{sep}images{sep}', f'{sep}labels{sep}'
+    return Path(labels_dir.join(str(image_path).rsplit(images_dir, 1))).with_suffix('.txt')
 
 
 class DatasetDirManager:
@@ -25,6 +85,7 @@ class DatasetDirManager:
         self._path: Path = check_dir_path(value, self.create)
         self._images_path: Path = check_dir_path(self._path / 'images', self.create)
         self._labels_path: Path = check_dir_path(self._path / 'labels', self.create)
+        self._manifest: Optional[DatasetManifest] = None
 
     @property
     def images_path(self) -> Path:
@@ -38,6 +99,16 @@ class DatasetDirManager:
     def metadata_path(self) -> Path:
         return self.path / 'metadata.yaml'
 
+    @property
+    def manifest(self) -> DatasetManifest:
+        if self._manifest is None:
+            self._manifest = DatasetManifest(self.path)
+        return self._manifest
+
+    def refresh(self, full: bool = False) -> DatasetManifest:
+        self.manifest.update(full)
+        return self.manifest
+
     def __repr__(self) -> str:
         return (f'{self.__class__.__name__}(\n'
                 f'  • path= "{self.path}"",\n'
@@ -49,27 +120,220 @@ class DatasetDirManager:
         return (f'{self.__class__.__name__}("{self.path}")')
 
     def get_images_list(self) -> list[Path]:
-        return [path for path in self.images_path.rglob('*')]
+        return self.refresh().images()
 
     def get_labels_list(self) -> list[Path]:
-        return [path for path in self.labels_path.rglob('*')]
+        return self.refresh().labels()
+
+    def get_pairs(self) -> list[tuple[Path, Optional[Path]]]:
+        return self.refresh().pairs()
+
+    @property
+    def labels_cache_path(self) -> Path:
+        return self.path / '.labels_cache.npz'
+
+    def get_labels_array(
+        self,
+        workers: int = MY_CFG.labels.workers
+    ) -> tuple[np.ndarray, list[Path], list[Optional[Path]]]:
+        signature: str = self.refresh(full= True).signature()
+        if self.labels_cache_path.is_file():
+            try:
+                with np.load(self.labels_cache_path) as cache:
+                    if str(cache['signature']) == signature:
+                        return (
+                            cache['labels'],
+                            [Path(image) for image in cache['images']],
+                            [Path(label) if label else None for label in cache['label_paths']]
+                        )
+            except (OSError, KeyError, ValueError) as e:
+                my_logger.warning(f'Labels cache "{self.labels_cache_path}" can\'t be read: {e}')
+        pairs: list[tuple[Path, Optional[Path]]] = self.manifest.pairs()
+        images: list[Path] = [image for image, _ in pairs]
+        label_paths: list[Optional[Path]] = [label for _, label in pairs]
+        labels: np.ndarray = load_labels(label_paths, workers)
+        try:
+            with open(self.labels_cache_path, 'wb') as f:
+                np.savez(
+                    f,
+                    signature= np.array(signature),
+                    labels= labels,
+                    images= np.array([str(image) for image in images]),
+                    label_paths= np.array(['' if label is None else str(label) for label in label_paths])
+                )
+            my_logger.debug(f'Labels cache "{self.labels_cache_path}" saved: {len(labels)} boxes.', Styles.SUCCEED)
+        except OSError as e:
+            my_logger.warning(f'Labels cache "{self.labels_cache_path}" can\'t be saved: {e}')
+        return labels, images, label_paths
+
+    def get_orphan_labels(self) -> list[Path]:
+        return self.refresh().orphan_labels()
+
+    def get_content_hashes(
+        self,
+        images: list[Path],
+        workers: int = MY_CFG.labels.workers
+    ) -> dict[Path, str]:
+        return self.manifest.get_content_hashes(images, workers)
+
+    def validate(
+        self,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        nc: Optional[int] = None,
+        workers: int = MY_CFG.validation.workers,
+        images: Optional[list[Path]] = None
+    ) -> list[ValidationIssueDict]:
+        pairs: list[tuple[Path, Optional[Path]]] = self.refresh(full= True).pairs()
+        if images is not None:
+            selected: set[Path] = set(images)
+            pairs = [pair for pair in pairs if pair[0] in selected]
+        files: list[tuple[str, Path]] = (
+            [('images', image) for image, _ in pairs]
+            + [('labels', label) for _, label in pairs if label is not None]
+        )
+        hashes: dict[Path, str] = self.get_content_hashes([path for _, path in files])
+        keys: dict[str, str] = {
+            'images': get_image_validation_key(width, height),
+            'labels': get_label_validation_key(nc)
+        }
+        results: dict[tuple[str, str], list[tuple[str, str]]] = {}
+        for kind, key in keys.items():
+            cached: dict[str, list[tuple[str, str]]] = self.manifest.get_validations(
+                [hashes[path] for file_kind, path in files if file_kind == kind],
+                key
+            )
+            results.update({(kind, content_hash): issues for content_hash, issues in cached.items()})
+        pending: dict[tuple[str, str], Path] = {
+            (kind, hashes[path]): path
+            for kind, path in files
+            if (kind, hashes[path]) not in results
+        }
+        if len(pending) > 0:
+            with ProcessPoolExecutor(max_workers= max(1, workers)) as executor:
+                checked: list[list[tuple[str, str]]] = list(executor.map(
+                    validate_file,
+                    [kind for kind, _ in pending],
+                    pending.values(),
+                    [width] * len(pending),
+                    [height] * len(pending),
+                    [nc] * len(pending),
+                    chunksize= 32
+                ))
+            for kind, key in keys.items():
+                self.manifest.set_validations(
+                    {
+                        content_hash: issues
+                        for (file_kind, content_hash), issues in zip(pending, checked)
+                        if file_kind == kind
+                    },
+                    key
+                )
+            results.update(zip(pending, checked))
+        my_logger.debug(f'{len(files)} files of "{self.path}" validated: {len(pending)} checked and {len(files) - len(pending)} cached.')
+        return [
+            {'path': str(path), 'issue': issue, 'detail': detail}
+            for kind, path in files
+            for issue, detail in results[(kind, hashes[path])]
+        ]
+
+    def get_classes(self) -> dict[int, str]:
+        with open(self.path / 'classes.txt', 'r') as f:
+            classes: dict[int, str] = {
+                i: line.strip()
+                for i, line in enumerate(f.readlines())
+                if len(line.strip()) > 0
+            }
+        return classes
+
+    def copy_metadata(self, dir_path: Path) -> None:
+        if self.metadata_path.is_file():
+            copy_files([self.metadata_path], dir_path)
+
+    def export_data(
+        self,
+        dataset_dir: 'DatasetDirManager',
+        images: list[Path],
+        labels: list[Path],
+        mode: str | TransferModes = MY_CFG.transfer.mode,
+        workers: int = MY_CFG.transfer.workers,
+        resume: bool = True,
+        progress: Optional[ProgressCallback] = None
+    ) -> list[TransferSummaryDict]:
+        return dataset_dir.add_data(images, labels, mode, workers, resume, progress)
+
+    def get_duplicate_clusters(
+        self,
+        method: str | HashMethods = MY_CFG.dedup.method,
+        threshold: int = MY_CFG.dedup.threshold,
+        workers: int = MY_CFG.labels.workers
+    ) -> dict[Path, Path]:
+        method = HashMethods(method)
+        images: list[Path] = self.get_images_list()
+        hashes: dict[Path, int] = self.manifest.get_perceptual_hashes(
+            images,
+            lambda path: compute_image_hash(path, method),
+            method.value,
+            workers
+        )
+        clusters: dict[Path, Path] = cluster_hashes(hashes, threshold)
+        clusters.update({image: image for image in images if image not in clusters})
+        my_logger.debug(f'{len(images)} images of "{self.path}" grouped in {len(set(clusters.values()))} clusters.')
+        return clusters
+
+    def get_unlabeled_images(self) -> list[Path]:
+        return [image for image, label in self.get_pairs() if label is None]
+
+    def get_labels_stats(
+        self,
+        classes: Optional[dict[int, str]] = None,
+        workers: int = MY_CFG.labels.workers
+    ) -> LabelsStatsDict:
+        labels, images, _ = self.get_labels_array(workers)
+        return get_labels_stats(labels, len(images), classes)
 
     def add_data(
         self,
         images: list[Path],
-        labels: list[Path]
-    ) -> None:
-        copy_files(images, self.images_path)
+        labels: list[Path],
+        mode: str | TransferModes = MY_CFG.transfer.mode,
+        workers: int = MY_CFG.transfer.workers,
+        resume: bool = True,
+        progress: Optional[ProgressCallback] = None
+    ) -> list[TransferSummaryDict]:
+        summaries: list[TransferSummaryDict] = [
+            transfer_files(images, self.images_path, mode= mode, workers= workers, resume= resume, progress= progress)
+        ]
+        pairs: dict[Path, Path] = pair_labels(images, labels)
+        paired_labels: list[Path] = list(pairs.values())
         labels_new_names: list[str]= [
             image.stem + '.txt'
-            for image in images
-            for label in labels
-            if label.stem.endswith(image.stem)
+            for image in pairs.keys()
         ]
-        copy_files(labels, self.labels_path, labels_new_names)
+        summaries.append(transfer_files(
+            paired_labels,
+            self.labels_path,
+            labels_new_names,
+            mode= mode,
+            workers= workers,
+            resume= resume,
+            progress= progress
+        ))
+        if self._manifest is not None:
+            self._manifest.add(
+                [self.images_path / image.name for image in images]
+                + [self.labels_path / name for name in labels_new_names]
+            )
         my_logger.debug(f'Data added to "{self.path}".', Styles.SUCCEED)
+        return summaries
 
-    def add_images(self, images_path: Path) -> None:
+    def add_images(
+        self,
+        images_path: Path,
+        mode: str | TransferModes = MY_CFG.transfer.mode,
+        workers: int = MY_CFG.transfer.workers,
+        progress: Optional[ProgressCallback] = None
+    ) -> TransferSummaryDict:
         if not images_path.is_absolute():
             images_path = IMAGES_PATH / images_path
         if not images_path.is_dir():
@@ -81,21 +345,292 @@ class DatasetDirManager:
             for file in images_path.iterdir()
             if file.is_file() and file.suffix.lower() in ALLOWED_IMAGES_EXTENSIONS
         ]
-        copy_files(images, self.images_path)
+        summary: TransferSummaryDict = transfer_files(
+            images,
+            self.images_path,
+            mode= mode,
+            workers= workers,
+            progress= progress
+        )
+        if self._manifest is not None:
+            self._manifest.add([self.images_path / image.name for image in images])
         if (images_path / 'metadata.yaml').is_file():
             copy_files([images_path / 'metadata.yaml'], self.path)
         my_logger.debug(f'Images copied from "{images_path}" to "{self.images_path}".', Styles.SUCCEED)
+        return summary
+
+    def get_n_images(self) -> int:
+        return self.refresh().count('images')
+
+    def compress_images(
+        self,
+        image_format: str = MY_CFG.compression.format,
+        quality: Optional[int] = None,
+        workers: int = MY_CFG.compression.workers,
+        force: bool = False,
+        progress: Optional[ProgressCallback] = None
+    ) -> CompressionSummaryDict:
+        metadata: dict = {}
+        if self.metadata_path.is_file():
+            with open(self.metadata_path, 'r') as f:
+                metadata = yaml.safe_load(f) or {}
+        encoding: Optional[tuple[str, Optional[int]]] = None
+        if 'image_format' in metadata:
+            encoding = (metadata['image_format'], metadata.get('image_quality'))
+        summary: CompressionSummaryDict = compress_images(
+            self.get_images_list(),
+            image_format,
+            quality,
+            workers,
+            force,
+            progress,
+            encoding
+        )
+        if self.metadata_path.is_file() and summary['compressed'] > 0:
+            if summary['failed'] > 0:
+                my_logger.warning(f'{summary["failed"]} images of "{self.path}" weren\'t compressed. "{self.metadata_path}" won\'t be updated.')
+            else:
+                metadata['image_format'] = image_format
+                metadata['image_quality'] = quality if quality is not None else get_image_format(image_format)[2]
+                with open(self.metadata_path, 'w') as f:
+                    yaml.dump(metadata, f, sort_keys= False)
+        my_logger.debug(f'Images of "{self.path}" compressed.', Styles.SUCCEED)
+        return summary
+
+
+class ZipDatasetDirManager(DatasetDirManager):
+    def __init__(self, path: Path) -> None:
+        self.create: bool = False
+        self.path = path
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @path.setter
+    def path(self, value: Any) -> None:
+        path: Path = Path(value)
+        if not path.is_file() or not zipfile.is_zipfile(path):
+            msg: str = f'"{path}" is not a zip file.'
+            my_logger.error(f'FileNotFoundError: {msg}')
+            raise FileNotFoundError(msg)
+        with zipfile.ZipFile(path) as archive:
+            infos: list[zipfile.ZipInfo] = [info for info in archive.infolist() if not info.is_dir()]
+        prefix: str = ''
+        for info in infos:
+            parts: list[str] = info.filename.split('/')
+            if 'images' in parts[:-1] or 'labels' in parts[:-1]:
+                index: int = parts.index('images') if 'images' in parts[:-1] else parts.index('labels')
+                prefix = '/'.join(parts[:index])
+                break
+        self._path: Path = path
+        self._root: Path = path / prefix if prefix else path
+        self._images_path: Path = self._root / 'images'
+        self._labels_path: Path = self._root / 'labels'
+        self._members: dict[Path, zipfile.ZipInfo] = {path / info.filename: info for info in infos}
+        self._archives = local()
+        self._manifest: Optional[DatasetManifest] = None
+        my_logger.debug(f'{len(self._members)} entries indexed on "{path}".')
+
+    @property
+    def metadata_path(self) -> Path:
+        return self._root / 'metadata.yaml'
+
+    @property
+    def manifest(self) -> DatasetManifest:
+        msg: str = f'"{self.path}" is a zip file. It has no manifest.'
+        my_logger.error(f'AttributeError: {msg}')
+        raise AttributeError(msg)
+
+    def _archive(self) -> zipfile.ZipFile:
+        archive: Optional[zipfile.ZipFile] = getattr(self._archives, 'archive', None)
+        if archive is None:
+            archive = zipfile.ZipFile(self.path)
+            self._archives.archive = archive
+        return archive
+
+    def read_bytes(self, path: Path) -> bytes:
+        return self._archive().read(self._members[path])
+
+    def _list(self, dir_path: Path, extensions: set[str]) -> list[Path]:
+        return sorted(
+            path
+            for path in self._members
+            if path.parent == dir_path and path.suffix.lower() in extensions
+        )
+
+    def get_images_list(self) -> list[Path]:
+        return self._list(self.images_path, ALLOWED_IMAGES_EXTENSIONS)
+
+    def get_labels_list(self) -> list[Path]:
+        return self._list(self.labels_path, {'.txt'})
+
+    def get_pairs(self) -> list[tuple[Path, Optional[Path]]]:
+        images: list[Path] = self.get_images_list()
+        pairs: dict[Path, Path] = pair_labels(images, self.get_labels_list())
+        return [(image, pairs.get(image)) for image in images]
+
+    def get_orphan_labels(self) -> list[Path]:
+        paired: set[Path] = {label for _, label in self.get_pairs() if label is not None}
+        return [label for label in self.get_labels_list() if label not in paired]
 
     def get_n_images(self) -> int:
         return len(self.get_images_list())
 
+    def get_labels_array(
+        self,
+        workers: int = MY_CFG.labels.workers
+    ) -> tuple[np.ndarray, list[Path], list[Optional[Path]]]:
+        pairs: list[tuple[Path, Optional[Path]]] = self.get_pairs()
+        label_paths: list[Optional[Path]] = [label for _, label in pairs]
+        return load_labels(label_paths, workers, self.read_bytes), [image for image, _ in pairs], label_paths
+
+    def get_content_hashes(
+        self,
+        images: list[Path],
+        workers: int = MY_CFG.labels.workers
+    ) -> dict[Path, str]:
+        return {
+            image: f'{self._members[image].CRC:08x}{self._members[image].file_size:x}'
+            for image in images
+        }
+
+    def get_duplicate_clusters(
+        self,
+        method: str | HashMethods = MY_CFG.dedup.method,
+        threshold: int = MY_CFG.dedup.threshold,
+        workers: int = MY_CFG.labels.workers
+    ) -> dict[Path, Path]:
+        method = HashMethods(method)
+        images: list[Path] = self.get_images_list()
+        with ThreadPoolExecutor(max_workers= max(1, workers)) as executor:
+            values: list[Optional[int]] = list(executor.map(
+                lambda image: compute_image_hash(image, method, self.read_bytes),
+                images
+            ))
+        clusters: dict[Path, Path] = cluster_hashes(
+            {image: value for image, value in zip(images, values) if value is not None},
+            threshold
+        )
+        clusters.update({image: image for image in images if image not in clusters})
+        return clusters
+
+    def get_classes(self) -> dict[int, str]:
+        data: str = self.read_bytes(self._root / 'classes.txt').decode()
+        return {
+            i: line.strip()
+            for i, line in enumerate(data.splitlines())
+            if len(line.strip()) > 0
+        }
+
+    def copy_metadata(self, dir_path: Path) -> None:
+        if self.metadata_path in self._members:
+            (dir_path / 'metadata.yaml').write_bytes(self.read_bytes(self.metadata_path))
+
+    def extract_files(
+        self,
+        files: list[Path],
+        destinies: list[Path],
+        workers: int = MY_CFG.transfer.workers,
+        resume: bool = True,
+        progress: Optional[ProgressCallback] = None
+    ) -> TransferSummaryDict:
+        lock = Lock()
+        summary: TransferSummaryDict = {
+            'files': len(files),
+            'transferred': 0,
+            'skipped': 0,
+            'failed': 0,
+            'bytes': 0,
+            'elapsed': 0.0,
+            'files_per_second': 0.0,
+            'mb_per_second': 0.0,
+            'modes': {}
+        }
+        start: float = monotonic()
+
+        def extract(source: Path, destiny: Path) -> None:
+            info: zipfile.ZipInfo = self._members[source]
+            if resume and destiny.is_file() and destiny.stat().st_size == info.file_size:
+                with lock:
+                    summary['skipped'] += 1
+                return
+            temp_path: Path = destiny.with_name(f'.{destiny.name}.tmp')
+            try:
+                with self._archive().open(info) as src, open(temp_path, 'wb') as dst:
+                    while chunk := src.read(1 << 20):
+                        dst.write(chunk)
+                replace(temp_path, destiny)
+            except (OSError, zipfile.BadZipFile) as e:
+                temp_path.unlink(missing_ok= True)
+                my_logger.error(f'"{source}" can\'t be extracted: {e}')
+                with lock:
+                    summary['failed'] += 1
+                return
+            with lock:
+                summary['transferred'] += 1
+                summary['bytes'] += info.file_size
+                summary['modes']['extract'] = summary['modes'].get('extract', 0) + 1
+
+        last_progress: float = start
+        with ThreadPoolExecutor(max_workers= max(1, workers)) as executor:
+            for i, _ in enumerate(executor.map(extract, files, destinies), start= 1):
+                now: float = monotonic()
+                if progress is not None and (now - last_progress > 0.5 or i == len(files)):
+                    last_progress = now
+                    progress(f'{destinies[0].parent.parent.name}/{destinies[0].parent.name}', i, len(files))
+        summary['elapsed'] = monotonic() - start
+        elapsed: float = max(summary['elapsed'], 1e-9)
+        summary['files_per_second'] = (summary['transferred'] + summary['skipped']) / elapsed
+        summary['mb_per_second'] = summary['bytes'] / elapsed / 1e6
+        return summary
+
+    def export_data(
+        self,
+        dataset_dir: DatasetDirManager,
+        images: list[Path],
+        labels: list[Path],
+        mode: str | TransferModes = MY_CFG.transfer.mode,
+        workers: int = MY_CFG.transfer.workers,
+        resume: bool = True,
+        progress: Optional[ProgressCallback] = None
+    ) -> list[TransferSummaryDict]:
+        pairs: dict[Path, Path] = pair_labels(images, labels)
+        image_destinies: list[Path] = [dataset_dir.images_path / image.name for image in images]
+        label_destinies: list[Path] = [dataset_dir.labels_path / (image.stem + '.txt') for image in pairs]
+        summaries: list[TransferSummaryDict] = [
+            self.extract_files(images, image_destinies, workers, resume, progress),
+            self.extract_files(list(pairs.values()), label_destinies, workers, resume, progress)
+        ]
+        if dataset_dir._manifest is not None:
+            dataset_dir._manifest.add(image_destinies + label_destinies)
+        my_logger.debug(f'Data extracted from "{self.path}" to "{dataset_dir.path}".', Styles.SUCCEED)
+        return summaries
+
+    def add_data(self, *args, **kwargs) -> list[TransferSummaryDict]:
+        msg: str = f'"{self.path}" is a zip file. Data can\'t be added.'
+        my_logger.error(f'PermissionError: {msg}')
+        raise PermissionError(msg)
+
+    def add_images(self, *args, **kwargs) -> TransferSummaryDict:
+        msg: str = f'"{self.path}" is a zip file. Images can\'t be added.'
+        my_logger.error(f'PermissionError: {msg}')
+        raise PermissionError(msg)
+
+    def compress_images(self, *args, **kwargs) -> CompressionSummaryDict:
+        msg: str = f'"{self.path}" is a zip file. Images can\'t be compressed.'
+        my_logger.error(f'PermissionError: {msg}')
+        raise PermissionError(msg)
+
 
 class TrainingDatasetDirManager:
     def __init__(
         self,
         dataset_dir: Optional[str | Path] = None,
-        source_dataset_dir: Optional[str | Path] = None
+        source_dataset_dir: Optional[str | Path] = None,
+        stream_zip: bool = MY_CFG.split.stream_zip
     ) -> None:
+        self.stream_zip: bool = stream_zip
         if dataset_dir is not None:
             self.path = Path(dataset_dir)
             self.set_paths()
@@ -122,6 +657,9 @@ class TrainingDatasetDirManager:
     def source_dataset_dir(self, path: Path) -> None:
         if not path.is_absolute():
             path = DATASETS_PATH / path
+        if self.stream_zip and path.is_file() and zipfile.is_zipfile(path):
+            self._source_dataset_dir = ZipDatasetDirManager(path)
+            return
         path = unzip_dir(path)
         self._source_dataset_dir: Optional[DatasetDirManager] = DatasetDirManager(
             path,
@@ -148,26 +686,30 @@ class TrainingDatasetDirManager:
 
     @property
     def data(self) -> DatasetDataDict:
-        with open(self.data_yaml_file_path, 'r') as f:
-            data: DatasetDataDict = yaml.safe_load(f) #TODO: validate file
-        return data
+        return load_yaml_file(self.data_yaml_file_path, DATA_YAML_KEYS) # type: ignore
 
     @property
     def metadata_yaml_file_path(self) -> Path:
         return self.path / 'metadata.yaml'
 
+    @property
+    def split_lists_paths(self) -> list[Path]:
+        return [self.path / name for name in SPLIT_LISTS_NAMES]
+
+    @property
+    def is_list_split(self) -> bool:
+        return all(path.is_file() for path in self.split_lists_paths)
+
     @property
     def metadata(self) -> DatasetMetadataDict:
-        with open(self.metadata_yaml_file_path, 'r') as f:
-            metadata: DatasetMetadataDict = yaml.safe_load(f) #TODO: validate file
-        return metadata
+        return load_yaml_file(self.metadata_yaml_file_path, METADATA_YAML_KEYS) # type: ignore
 
     def __repr__(self) -> str:
         return (f'{self.__class__.__name__}(\n'
                 f'  • path= "{self.path}",\n'
-                f'  • train_dir= {self.train_dir},\n'
-                f'  • validation_dir= {self.validation_dir},\n'
-                f'  • test_dir= {self.test_dir}\n)')
+                f'  • train_dir= {getattr(self, "train_dir", None)},\n'
+                f'  • validation_dir= {getattr(self, "validation_dir", None)},\n'
+                f'  • test_dir= {getattr(self, "test_dir", None)}\n)')
 
     def __str__(self) -> str:
         return (f'{self.__class__.__name__}("{self.path}")')
@@ -188,6 +730,10 @@ class TrainingDatasetDirManager:
             )
         except AttributeError:
             my_logger.warning('Can\'t set paths. No "path" is defined.')
+        except NotADirectoryError:
+            if not self.is_list_split:
+                raise
+            my_logger.debug(f'"{self.path}" is a split of list files.')
 
     def create_paths(self) -> None:
         try:
@@ -209,55 +755,353 @@ class TrainingDatasetDirManager:
     def split(
         self,
         validation: float = 0.2,
-        test: float = 0.1
-    ) -> None:
-        images: list[Path] = self.source_dataset_dir.get_images_list()
-        labels: list[Path] = self.source_dataset_dir.get_labels_list()
-        n_val: int = int(len(images) * validation)
-        n_test: int = int(len(images) * test)
-        shuffle(images)
-        shuffle_labels: list[Path] = [
-            label
-            for image in images
-            for label in labels
-            if label.stem.endswith(image.stem)
-        ]
-        images_lists: list[list[Path]] = [
-            images[n_val+n_test:], #Train
-            images[:n_val], #Val
-            images[n_val:n_val+n_test], #Test
-        ]
-        labels_lists: list[list[Path]] = [
-            shuffle_labels[n_val+n_test:], #Train
-            shuffle_labels[:n_val], #Val
-            shuffle_labels[n_val:n_val+n_test], #Test
-        ]
-        self.train_dir.add_data(images_lists[0], labels_lists[0])
-        self.validation_dir.add_data(images_lists[1], labels_lists[1])
-        self.test_dir.add_data(images_lists[2], labels_lists[2])
-        if self.source_dataset_dir.metadata_path.is_file():
-            copy_files([self.source_dataset_dir.metadata_path], self.path)
+        test: float = 0.1,
+        mode: str | TransferModes = MY_CFG.transfer.mode,
+        workers: int = MY_CFG.transfer.workers,
+        resume: bool = True,
+        lists: bool = False,
+        seed: Optional[int] = None,
+        hash_key: str = MY_CFG.split.hash_key,
+        stratify: bool = False,
+        dedup: bool = False,
+        thin: int = MY_CFG.dedup.thin,
+        progress: Optional[ProgressCallback] = None
+    ) -> list[TransferSummaryDict]:
+        if lists:
+            self.split_lists(validation, test, seed, hash_key, stratify, dedup, thin)
+            return []
+        pairs_lists: list[list[tuple[Path, Optional[Path]]]] = self.assign_splits(
+            validation,
+            test,
+            seed,
+            hash_key,
+            stratify,
+            dedup,
+            thin
+        )
+        if resume:
+            placed: set[str] = {
+                image.name
+                for dataset_dir in (self.train_dir, self.validation_dir, self.test_dir)
+                for image in dataset_dir.get_images_list()
+            }
+            pairs_lists = [
+                [(image, label) for image, label in split_pairs if image.name not in placed]
+                for split_pairs in pairs_lists
+            ]
+            my_logger.info(f'{len(placed)} images already split. Adding {sum(len(split_pairs) for split_pairs in pairs_lists)} new images.')
+        summaries: list[TransferSummaryDict] = []
+        for dataset_dir, split_pairs in zip(
+            [self.train_dir, self.validation_dir, self.test_dir],
+            pairs_lists
+        ):
+            summaries.extend(self.source_dataset_dir.export_data(
+                dataset_dir,
+                [image for image, _ in split_pairs],
+                [label for _, label in split_pairs if label is not None],
+                mode= mode,
+                workers= workers,
+                resume= resume,
+                progress= progress
+            ))
+        self.source_dataset_dir.copy_metadata(self.path)
+        for path in self.split_lists_paths:
+            path.unlink(missing_ok= True)
         self.create_yaml_data_file()
         my_logger.debug(
             f'{self.source_dataset_dir.path.name} splited into {self.path.name}.',
             Styles.SUCCEED
         )
+        return summaries
 
-    def create_yaml_data_file(self) -> None:
-        classes_path: Path = self.source_dataset_dir.path / 'classes.txt'
-        with open(classes_path, 'r') as f:
-            classes: dict[int, str] = {
-                i: line.strip()
-                for i, line in enumerate(f.readlines())
-                if len(line.strip()) > 0
+    def assign_splits(
+        self,
+        validation: float,
+        test: float,
+        seed: Optional[int] = None,
+        hash_key: str = MY_CFG.split.hash_key,
+        stratify: bool = False,
+        dedup: bool = False,
+        thin: int = MY_CFG.dedup.thin
+    ) -> list[list[tuple[Path, Optional[Path]]]]:
+        if hash_key not in SPLIT_HASH_KEYS:
+            msg: str = f'Split hash key "{hash_key}" not valid. Valid options: {list(SPLIT_HASH_KEYS)}.'
+            my_logger.error(f'ValueError: {msg}')
+            raise ValueError(msg)
+        pairs: list[tuple[Path, Optional[Path]]] = self.source_dataset_dir.get_pairs()
+        keys: dict[Path, str]
+        if hash_key == 'content':
+            keys = self.source_dataset_dir.get_content_hashes([image for image, _ in pairs])
+        else:
+            keys = {image: image.stem for image, _ in pairs}
+        clusters: dict[Path, Path] = {image: image for image, _ in pairs}
+        if dedup:
+            clusters = self.source_dataset_dir.get_duplicate_clusters()
+            keys = {image: keys[clusters[image]] for image, _ in pairs}
+        pairs_lists: list[list[tuple[Path, Optional[Path]]]] = [[], [], []] #Train, Val, Test
+        if not stratify:
+            for image, label in pairs:
+                pairs_lists[get_split_index(keys[image], validation, test, seed)].append((image, label))
+        else:
+            representatives: list[Path] = sorted(set(clusters[image] for image, _ in pairs))
+            cluster_ids: dict[Path, int] = {image: i for i, image in enumerate(representatives)}
+            image_clusters: np.ndarray = np.array([cluster_ids[clusters[image]] for image, _ in pairs], dtype= np.int64)
+            labels, _, _ = self.source_dataset_dir.get_labels_array()
+            class_counts: np.ndarray = get_class_counts(labels, len(pairs), len(self.get_classes()))
+            cluster_counts: np.ndarray = np.zeros((len(representatives), class_counts.shape[1]), dtype= np.int64)
+            np.add.at(cluster_counts, image_clusters, class_counts)
+            order: np.ndarray = np.argsort([get_split_position(keys[image], seed) for image in representatives])
+            assignment: np.ndarray = stratified_assignment(
+                cluster_counts,
+                (1 - validation - test, validation, test),
+                order
+            )[image_clusters]
+            for pair, split_index in zip(pairs, assignment):
+                pairs_lists[split_index].append(pair)
+            for name, split_index in (('train', 0), ('validation', 1), ('test', 2)):
+                my_logger.debug(f'Stratified {name} boxes per class: {class_counts[assignment == split_index].sum(axis= 0).tolist()}')
+        if dedup and thin > 0:
+            for i, split_pairs in enumerate(pairs_lists):
+                grouped: dict[Path, list[tuple[Path, Optional[Path]]]] = {}
+                for pair in split_pairs:
+                    grouped.setdefault(clusters[pair[0]], []).append(pair)
+                pairs_lists[i] = [
+                    pair
+                    for cluster_pairs in grouped.values()
+                    for pair in thin_cluster(cluster_pairs, thin)
+                ]
+            my_logger.info(f'Clusters thinned to {thin} images: {sum(len(split_pairs) for split_pairs in pairs_lists)} of {len(pairs)} images kept.')
+        return pairs_lists
+
+    def split_lists(
+        self,
+        validation: float = 0.2,
+        test: float = 0.1,
+        seed: Optional[int] = None,
+        hash_key: str = MY_CFG.split.hash_key,
+        stratify: bool = False,
+        dedup: bool = False,
+        thin: int = MY_CFG.dedup.thin
+    ) -> None:
+        if isinstance(self.source_dataset_dir, ZipDatasetDirManager):
+            msg: str = f'"{self.source_dataset_dir.path}" is a zip file. List splits need the images extracted.'
+            my_logger.error(f'ValueError: {msg}')
+            raise ValueError(msg)
+        self.path.mkdir(
+            parents= True,
+            exist_ok= True
+        )
+        pairs_lists: list[list[tuple[Path, Optional[Path]]]] = self.assign_splits(
+            validation,
+            test,
+            seed,
+            hash_key,
+            stratify,
+            dedup,
+            thin
+        )
+        linked_dir: Optional[DatasetDirManager] = None
+        for list_path, split_pairs in zip(self.split_lists_paths, pairs_lists):
+            images: list[Path] = []
+            unmatched: list[tuple[Path, Path]] = []
+            for image, label in split_pairs:
+                if label is None or label == get_yolo_label_path(image):
+                    images.append(image.absolute())
+                else:
+                    unmatched.append((image, label))
+            if len(unmatched) > 0:
+                if linked_dir is None:
+                    linked_dir = DatasetDirManager(self.path / 'linked', create= True)
+                linked_dir.add_data(
+                    [image for image, _ in unmatched],
+                    [label for _, label in unmatched],
+                    mode= TransferModes.HARDLINK
+                )
+                images.extend(
+                    (linked_dir.images_path / image.name).absolute()
+                    for image, _ in unmatched
+                )
+            with open(list_path, 'w') as f:
+                f.writelines(f'{image}\n' for image in images)
+        self.source_dataset_dir.copy_metadata(self.path)
+        self.create_yaml_data_file(lists= True)
+        my_logger.debug(
+            f'{self.source_dataset_dir.path.name} splited into list files on {self.path.name}: '
+            f'{[len(split_pairs) for split_pairs in pairs_lists]}.',
+            Styles.SUCCEED
+        )
+
+    def get_classes(self) -> dict[int, str]:
+        return self.source_dataset_dir.get_classes()
+
+    def get_data_classes(self) -> dict[int, str]:
+        if self.data_yaml_file_path.is_file():
+            return {int(i): name for i, name in self.data.get('name', {}).items()}
+        try:
+            return self.get_classes()
+        except (AttributeError, OSError):
+            return {}
+
+    def get_splits_stats(
+        self,
+        workers: int = MY_CFG.labels.workers
+    ) -> dict[str, LabelsStatsDict]:
+        classes: dict[int, str] = self.get_data_classes()
+        if not self.is_list_split:
+            return {
+                name: dataset_dir.get_labels_stats(classes, workers)
+                for name, dataset_dir in (
+                    ('train', self.train_dir),
+                    ('validation', self.validation_dir),
+                    ('test', self.test_dir)
+                )
             }
+        arrays: dict[Path, tuple[np.ndarray, dict[Path, int]]] = {}
+        stats: dict[str, LabelsStatsDict] = {}
+        for name, list_path in zip(('train', 'validation', 'test'), self.split_lists_paths):
+            with open(list_path, 'r') as f:
+                images: list[Path] = [Path(line.strip()) for line in f if line.strip()]
+            split_labels: list[np.ndarray] = []
+            n_images: int = 0
+            for image in images:
+                root: Path = image.parent.parent
+                if root not in arrays:
+                    labels, root_images, _ = DatasetDirManager(root, create= False).get_labels_array(workers)
+                    arrays[root] = (labels, {path.absolute(): i for i, path in enumerate(root_images)})
+            for root, (labels, indices) in arrays.items():
+                selected: list[int] = [
+                    indices[image]
+                    for image in images
+                    if image.parent.parent == root and image in indices
+                ]
+                root_labels: np.ndarray = select_labels(labels, len(indices), selected)
+                root_labels[:, 0] += n_images
+                split_labels.append(root_labels)
+                n_images += len(selected)
+            stats[name] = get_labels_stats(
+                np.concatenate(split_labels) if len(split_labels) > 0 else load_labels([]),
+                n_images,
+                classes
+            )
+        return stats
+
+    def validate(
+        self,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        nc: Optional[int] = None,
+        workers: int = MY_CFG.validation.workers
+    ) -> dict[str, list[ValidationIssueDict]]:
+        issues: dict[str, list[ValidationIssueDict]] = {'dataset': []}
+        data: Optional[dict] = None
+        metadata: Optional[dict] = None
+        try:
+            with open(self.data_yaml_file_path, 'r') as f:
+                data = yaml.safe_load(f)
+        except (OSError, yaml.YAMLError) as e:
+            issues['dataset'].append({'path': str(self.data_yaml_file_path), 'issue': ValidationIssues.MISSING_KEY.value, 'detail': str(e)})
+        else:
+            issues['dataset'].extend(validate_keys(self.data_yaml_file_path, data, DATA_YAML_KEYS))
+        if self.metadata_yaml_file_path.is_file():
+            try:
+                with open(self.metadata_yaml_file_path, 'r') as f:
+                    metadata = yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                issues['dataset'].append({'path': str(self.metadata_yaml_file_path), 'issue': ValidationIssues.MISSING_KEY.value, 'detail': str(e)})
+            else:
+                issues['dataset'].extend(validate_keys(self.metadata_yaml_file_path, metadata, METADATA_YAML_KEYS))
+        if isinstance(metadata, dict):
+            width = width or metadata.get('camera_width')
+            height = height or metadata.get('camera_height')
+        if nc is None and isinstance(data, dict):
+            nc = data.get('nc')
+        for name, split_pairs in zip(('train', 'validation', 'test'), self.get_split_pairs()):
+            roots: dict[Path, list[Path]] = {}
+            for image, _ in split_pairs:
+                roots.setdefault(image.parent.parent, []).append(image)
+            issues[name] = [
+                issue
+                for root, images in roots.items()
+                for issue in DatasetDirManager(root, create= False).validate(width, height, nc, workers, images)
+            ]
+        return issues
+
+    def get_split_pairs(self) -> list[list[tuple[Path, Optional[Path]]]]:
+        if not self.is_list_split:
+            return [
+                dataset_dir.get_pairs()
+                for dataset_dir in (self.train_dir, self.validation_dir, self.test_dir)
+            ]
+        pairs_lists: list[list[tuple[Path, Optional[Path]]]] = []
+        for list_path in self.split_lists_paths:
+            with open(list_path, 'r') as f:
+                images: list[Path] = [Path(line.strip()) for line in f if line.strip()]
+            pairs_lists.append([
+                (image, label if (label := get_yolo_label_path(image)).is_file() else None)
+                for image in images
+            ])
+        return pairs_lists
+
+    def get_training_cache_path(
+        self,
+        filters: list[str],
+        imgsz: int,
+        image_format: str = MY_CFG.training_cache.format,
+        quality: Optional[int] = MY_CFG.training_cache.quality
+    ) -> Path:
+        key: str = get_training_cache_key(self.path, filters, imgsz, image_format, quality)
+        return CACHE_PATH / 'training' / f'{self.dataset_name}-{key}'
+
+    def build_training_cache(
+        self,
+        filters: list[str],
+        imgsz: int,
+        image_format: str = MY_CFG.training_cache.format,
+        quality: Optional[int] = MY_CFG.training_cache.quality,
+        workers: int = MY_CFG.training_cache.workers
+    ) -> Path:
+        cache_path: Path = self.get_training_cache_path(filters, imgsz, image_format, quality)
+        pairs_lists: list[list[tuple[Path, Optional[Path]]]] = self.get_split_pairs()
+        hashes: dict[Path, str] = {}
+        roots: dict[Path, list[Path]] = {}
+        for image, _ in (pair for split_pairs in pairs_lists for pair in split_pairs):
+            roots.setdefault(image.parent.parent, []).append(image)
+        for root, images in roots.items():
+            hashes.update(DatasetDirManager(root, create= False).refresh().get_content_hashes(images))
+        for name, split_pairs in zip(('train', 'validation', 'test'), pairs_lists):
+            cached, reused = build_split_cache(
+                split_pairs,
+                hashes,
+                cache_path / name,
+                filters,
+                imgsz,
+                image_format,
+                quality,
+                workers
+            )
+            my_logger.info(f'Training cache of {name}: {cached} images cached and {reused} reused.')
+        data: DatasetDataDict = {
+            **self.data,
+            'path': str(cache_path),
+            'train': 'train/images',
+            'val': 'validation/images',
+            'test': 'test/images'
+        }
+        data_path: Path = cache_path / 'data.yaml'
+        with open(data_path, 'w') as f:
+            yaml.dump(data, f, sort_keys= False)
+        my_logger.debug(f'Training cache of "{self.path}" built on "{cache_path}".', Styles.SUCCEED)
+        return data_path
+
+    def create_yaml_data_file(self, lists: bool = False) -> None:
+        classes: dict[int, str] = self.get_classes()
         n_classes: int = len(classes)
         data: DatasetDataDict = {
             'path': str(self.path),
             'task': str(ModelTasks.DETECT.value),
-            'train': 'train/images',
-            'val': 'validation/images',
-            'test': 'test/images',
+            'train': SPLIT_LISTS_NAMES[0] if lists else 'train/images',
+            'val': SPLIT_LISTS_NAMES[1] if lists else 'validation/images',
+            'test': SPLIT_LISTS_NAMES[2] if lists else 'test/images',
             'nc': n_classes,
             'name': classes,
         }
@@ -268,11 +1112,21 @@ class TrainingDatasetDirManager:
             Styles.SUCCEED
         )
 
+    def get_n_list_images(self, list_path: Path) -> int:
+        with open(list_path, 'rb') as f:
+            return sum(1 for line in f if line.strip())
+
     def get_n_train(self) -> int:
+        if self.is_list_split:
+            return self.get_n_list_images(self.split_lists_paths[0])
         return self.train_dir.get_n_images()
 
     def get_n_val(self) -> int:
+        if self.is_list_split:
+            return self.get_n_list_images(self.split_lists_paths[1])
         return self.validation_dir.get_n_images()
 
     def get_n_test(self) -> int:
+        if self.is_list_split:
+            return self.get_n_list_images(self.split_lists_paths[2])
         return self.test_dir.get_n_images()
@@ -9,7 +9,7 @@ import yaml
 from psutil import disk_usage
 from pyUtils import Styles
 
-from ..utils.config import IMAGES_PATH, my_logger
+from ..utils.config import IMAGES_PATH, MY_CFG, my_logger
 from ..utils.data_types import DatasetMetadataDict
 
 ALLOWED_IMAGES_EXTENSIONS: set[str] = {
@@ -18,9 +18,44 @@ ALLOWED_IMAGES_EXTENSIONS: set[str] = {
     '.jpeg',
     '.bmp',
     '.gif',
-    '.tiff'
+    '.tiff',
+    '.webp'
 }
 
+IMAGE_FORMATS: dict[str, tuple[str, int, int]] = {
+    'png': ('.png', cv2.IMWRITE_PNG_COMPRESSION, MY_CFG.writer.png_compression),
+    'jpg': ('.jpg', cv2.IMWRITE_JPEG_QUALITY, MY_CFG.writer.jpeg_quality),
+    'webp': ('.webp', cv2.IMWRITE_WEBP_QUALITY, MY_CFG.writer.webp_quality),
+}
+
+def get_image_format(image_format: str) -> tuple[str, int, int]:
+    try:
+        return IMAGE_FORMATS[image_format.lower().lstrip('.').replace('jpeg', 'jpg')]
+    except KeyError:
+        msg: str = f'Image format "{image_format}" not supported. Valid options: {list(IMAGE_FORMATS.keys())}.'
+        my_logger.error(f'ValueError: {msg}')
+        raise ValueError(msg)
+
+def encode_image(
+    image: np.ndarray,
+    image_format: str = 'png',
+    quality: Optional[int] = None
+) -> bytes:
+    extension: str
+    param: int
+    default_quality: int
+    extension, param, default_quality = get_image_format(image_format)
+    if quality is None:
+        quality = default_quality
+    if param == cv2.IMWRITE_PNG_COMPRESSION:
+        quality = min(max(int(quality), 0), 9)
+    ret, buffer = cv2.imencode(extension, image, [param, int(quality)])
+    if not ret:
+        msg: str = f'Failed to encode image as "{extension}".'
+        my_logger.error(f'RuntimeError: {msg}')
+        raise RuntimeError(msg)
+    return buffer.tobytes()
+
 def create_dataset_medatada_yaml(
     dir_path: Optional[Path],
     data: DatasetMetadataDict
@@ -33,25 +68,50 @@ def create_dataset_medatada_yaml(
         yaml.dump(data, f, sort_keys= False)
     my_logger.debug(f'{file_path.name} created on {file_path.parent}.', Styles.SUCCEED)
 
-def save_image(
-    image: np.ndarray,
-    dir_path: Optional[Path] = None
+def get_image_path(
+    dir_path: Optional[Path] = None,
+    image_format: str = 'png',
+    image_name: Optional[str] = None
 ) -> Path:
     if dir_path is None:
         dir_path = IMAGES_PATH
-    image_name: str = f'{uuid4()}.png'
-    image_path: Path = dir_path / image_name
-    dir_path.mkdir(
+    if image_name is None:
+        image_name = str(uuid4())
+    return dir_path / (image_name + get_image_format(image_format)[0])
+
+def write_image(
+    image: np.ndarray,
+    image_path: Path,
+    image_format: str = 'png',
+    quality: Optional[int] = None
+) -> int:
+    data: bytes = encode_image(image, image_format, quality)
+    image_path.parent.mkdir(
+        parents= True,
+        exist_ok= True
+    )
+    try:
+        image_path.write_bytes(data)
+    except OSError as e:
+        msg: str = f'Failed to save image to "{image_path.parent}". {e}'
+        my_logger.error(f'RuntimeError: {msg}')
+        raise RuntimeError(msg)
+    my_logger.debug(f'New image saved to "{image_path}"', Styles.SUCCEED)
+    return len(data)
+
+def save_image(
+    image: np.ndarray,
+    dir_path: Optional[Path] = None,
+    image_format: str = 'png',
+    quality: Optional[int] = None
+) -> Path:
+    image_path: Path = get_image_path(dir_path, image_format)
+    image_path.parent.mkdir(
         parents= True,
         exist_ok= True
     )
-    if disk_usage('/').percent < 100: #TODO: cahnge to 80
-        if cv2.imwrite(str(image_path), image):
-            my_logger.debug(f'New image saved to "{image_path}"', Styles.SUCCEED)
-        else:
-            msg: str = f'Failed to save image to "{image_path.parent}". Check if directory exists.'
-            my_logger.error(f'RuntimeError: {msg}')
-            raise RuntimeError(msg)
+    if disk_usage(image_path.parent).percent < MY_CFG.writer.max_disk_usage:
+        write_image(image, image_path, image_format, quality)
     else:
         my_logger.warning(f'Can\'t save image to "{image_path.parent}". Disk is full.')
     return image_path
@@ -0,0 +1,281 @@
+import atexit
+from enum import Enum
+from os import stat
+from pathlib import Path
+from queue import Empty, Full, Queue
+from threading import Lock, Thread
+from time import monotonic
+from typing import Callable, Optional, TypedDict
+
+import numpy as np
+from psutil import disk_usage
+from pyUtils import Styles
+
+from ..utils.config import IMAGES_PATH, MY_CFG, my_logger
+from .files import get_image_format, get_image_path, write_image
+
+
+class WriterPolicies(Enum):
+    BLOCK = 'block'
+    DROP_NEW = 'drop_new'
+    DROP_OLDEST = 'drop_oldest'
+
+
+class ImageWriterStatsDict(TypedDict):
+    queued: int
+    written: int
+    dropped: int
+    failed: int
+    bytes_written: int
+    pending: int
+    elapsed: float
+
+
+class _WriteTask(TypedDict):
+    image: Optional[np.ndarray]
+    data: Optional[bytes]
+    path: Path
+    filters: list[Callable[[np.ndarray], np.ndarray]]
+    callback: Optional[Callable[[Path, bool], None]]
+
+
+class ImageWriter:
+    def __init__(
+        self,
+        image_format: str = MY_CFG.writer.format,
+        quality: Optional[int] = None,
+        queue_size: int = MY_CFG.writer.queue_size,
+        workers: int = MY_CFG.writer.workers,
+        policy: str | WriterPolicies = MY_CFG.writer.policy,
+        max_disk_usage: float = MY_CFG.writer.max_disk_usage,
+        disk_check_interval: float = MY_CFG.writer.disk_check_interval
+    ) -> None:
+        get_image_format(image_format)
+        self.image_format: str = image_format
+        self.quality: Optional[int] = quality
+        self.policy: WriterPolicies = WriterPolicies(policy)
+        self.max_disk_usage: float = max_disk_usage
+        self.disk_check_interval: float = disk_check_interval
+        self.n_workers: int = max(1, workers)
+        self._queue: Queue[Optional[_WriteTask]] = Queue(maxsize= max(1, queue_size))
+        self._workers: list[Thread] = []
+        self._stats_lock = Lock()
+        self._disk_lock = Lock()
+        self._disk_checks: dict[int, tuple[float, bool]] = {}
+        self._start_time: Optional[float] = None
+        self.queued: int = 0
+        self.written: int = 0
+        self.dropped: int = 0
+        self.failed: int = 0
+        self.bytes_written: int = 0
+        self._closing: bool = False
+
+    @property
+    def extension(self) -> str:
+        return get_image_format(self.image_format)[0]
+
+    @property
+    def pending(self) -> int:
+        return self._queue.unfinished_tasks
+
+    @property
+    def is_running(self) -> bool:
+        return any(worker.is_alive() for worker in self._workers)
+
+    def stats(self) -> ImageWriterStatsDict:
+        elapsed: float = 0.0
+        if self._start_time is not None:
+            elapsed = monotonic() - self._start_time
+        with self._stats_lock:
+            return {
+                'queued': self.queued,
+                'written': self.written,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'bytes_written': self.bytes_written,
+                'pending': self.pending,
+                'elapsed': elapsed
+            }
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+        atexit.register(self.close)
+        self._start_time = monotonic()
+        self._workers = [
+            Thread(
+                target= self._worker,
+                name= f'ImageWriter-{i}',
+                daemon= True
+            )
+            for i in range(self.n_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def has_free_space(self, dir_path: Path) -> bool:
+        try:
+            device: int = stat(dir_path).st_dev
+        except OSError:
+            return True
+        now: float = monotonic()
+        with self._disk_lock:
+            checked_at, ok = self._disk_checks.get(device, (-self.disk_check_interval - 1, True))
+            if now - checked_at < self.disk_check_interval:
+                return ok
+            ok = disk_usage(str(dir_path)).percent < self.max_disk_usage
+            self._disk_checks[device] = (now, ok)
+        if not ok:
+            my_logger.warning(f'Disk of "{dir_path}" is over {self.max_disk_usage}% usage.')
+        return ok
+
+    def submit(
+        self,
+        image: np.ndarray,
+        dir_path: Optional[Path] = None,
+        image_name: Optional[str] = None,
+        callback: Optional[Callable[[Path, bool], None]] = None,
+        filters: Optional[list[Callable[[np.ndarray], np.ndarray]]] = None
+    ) -> Optional[Path]:
+        if dir_path is None:
+            dir_path = IMAGES_PATH
+        dir_path.mkdir(
+            parents= True,
+            exist_ok= True
+        )
+        image_path: Path = get_image_path(dir_path, self.image_format, image_name)
+        task: _WriteTask = {
+            'image': image.copy(),
+            'data': None,
+            'path': image_path,
+            'filters': [] if filters is None else filters,
+            'callback': callback
+        }
+        return self._enqueue(task)
+
+    def submit_encoded(
+        self,
+        data: bytes,
+        image_path: Path,
+        callback: Optional[Callable[[Path, bool], None]] = None
+    ) -> Optional[Path]:
+        image_path.parent.mkdir(
+            parents= True,
+            exist_ok= True
+        )
+        task: _WriteTask = {
+            'image': None,
+            'data': data,
+            'path': image_path,
+            'filters': [],
+            'callback': callback
+        }
+        return self._enqueue(task)
+
+    def _enqueue(self, task: _WriteTask) -> Optional[Path]:
+        image_path: Path = task['path']
+        callback: Optional[Callable[[Path, bool], None]] = task['callback']
+        if self._closing:
+            self._drop(image_path, callback, 'Writer is closing')
+            return None
+        if not self.has_free_space(image_path.parent):
+            self._drop(image_path, callback, 'Disk is full')
+            return None
+        self.start()
+        try:
+            if self.policy == WriterPolicies.BLOCK:
+                self._queue.put(task)
+            elif self.policy == WriterPolicies.DROP_NEW:
+                self._queue.put_nowait(task)
+            else:
+                self._put_dropping_oldest(task)
+        except Full:
+            self._drop(image_path, callback, 'Queue is full')
+            return None
+        with self._stats_lock:
+            self.queued += 1
+        return image_path
+
+    def _put_dropping_oldest(self, task: _WriteTask) -> None:
+        while True:
+            try:
+                self._queue.put_nowait(task)
+                return
+            except Full:
+                try:
+                    oldest: Optional[_WriteTask] = self._queue.get_nowait()
+                except Empty:
+                    continue
+                self._queue.task_done()
+                if oldest is None:
+                    self._queue.put(None)
+                    raise Full()
+                self._drop(oldest['path'], oldest['callback'], 'Queue is full')
+
+    def _drop(
+        self,
+        image_path: Path,
+        callback: Optional[Callable[[Path, bool], None]],
+        reason: str
+    ) -> None:
+        with self._stats_lock:
+            self.dropped += 1
+        my_logger.warning(f'Image "{image_path.name}" dropped. {reason}.')
+        if callback is not None:
+            callback(image_path, False)
+
+    def _worker(self) -> None:
+        while True:
+            task: Optional[_WriteTask] = self._queue.get()
+            if task is None:
+                self._queue.task_done()
+                return
+            ok: bool = False
+            try:
+                n_bytes: int
+                if task['data'] is not None:
+                    task['path'].write_bytes(task['data'])
+                    n_bytes = len(task['data'])
+                else:
+                    image: np.ndarray = task['image'] # type: ignore
+                    for filter in task['filters']:
+                        image = filter(image)
+                    n_bytes = write_image(
+                        image,
+                        task['path'],
+                        self.image_format,
+                        self.quality
+                    )
+                ok = True
+                with self._stats_lock:
+                    self.written += 1
+                    self.bytes_written += n_bytes
+            except Exception as e:
+                with self._stats_lock:
+                    self.failed += 1
+                my_logger.error(f'Image writer failed on "{task["path"]}": {e}')
+            finally:
+                self._queue.task_done()
+            if task['callback'] is not None:
+                task['callback'](task['path'], ok)
+
+    def flush(self) -> None:
+        if not self.is_running:
+            return
+        self._queue.join()
+        my_logger.debug(f'Image writer flushed: {self.stats()}', Styles.SUCCEED)
+
+    def close(self) -> None:
+        atexit.unregister(self.close)
+        if not self.is_running:
+            return
+        self._closing = True
+        try:
+            self.flush()
+            for _ in self._workers:
+                self._queue.put(None)
+            for worker in self._workers:
+                worker.join()
+            self._workers = []
+        finally:
+            self._closing = False
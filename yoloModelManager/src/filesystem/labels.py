@@ -0,0 +1,190 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional, TypedDict
+
+import numpy as np
+
+from ..utils.config import MY_CFG, my_logger
+
+LABELS_COLUMNS: tuple[str, ...] = ('image_id', 'class', 'x', 'y', 'w', 'h')
+LABELS_CHUNK_SIZE: int = 512
+BOX_AREA_BINS: tuple[float, ...] = (0, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1)
+
+
+class LabelsStatsDict(TypedDict):
+    images: int
+    labeled_images: int
+    unlabeled_images: int
+    boxes: int
+    class_counts: dict[str, int]
+    boxes_per_image: dict[int, int]
+    box_area: dict[str, int]
+    box_width: dict[str, float]
+    box_height: dict[str, float]
+
+
+def parse_label_data(data: bytes) -> np.ndarray:
+    lines: list[bytes] = [line for line in data.splitlines() if line.strip()]
+    if len(lines) == 0:
+        return np.zeros((0, 5), dtype= np.float32)
+    values: np.ndarray = np.array(data.split(), dtype= np.float32)
+    if values.size == len(lines) * 5:
+        return values.reshape(-1, 5)
+    boxes: list[list[float]] = []
+    for line in lines:
+        row: np.ndarray = np.array(line.split(), dtype= np.float32)
+        if row.size == 5:
+            boxes.append(row.tolist())
+        elif row.size > 5:
+            points: np.ndarray = row[1:1 + (row.size - 1) // 2 * 2].reshape(-1, 2)
+            x_min, y_min = points.min(axis= 0)
+            x_max, y_max = points.max(axis= 0)
+            boxes.append([
+                row[0],
+                (x_min + x_max) / 2,
+                (y_min + y_max) / 2,
+                x_max - x_min,
+                y_max - y_min
+            ])
+    return np.array(boxes, dtype= np.float32).reshape(-1, 5)
+
+def _load_labels_chunk(
+    chunk: list[tuple[int, Path]],
+    read: Callable[[Path], bytes] = Path.read_bytes
+) -> np.ndarray:
+    boxes: list[np.ndarray] = []
+    image_ids: list[np.ndarray] = []
+    for image_id, label_path in chunk:
+        try:
+            data: bytes = read(label_path)
+        except OSError as e:
+            my_logger.warning(f'Label "{label_path}" can\'t be read: {e}')
+            continue
+        try:
+            file_boxes: np.ndarray = parse_label_data(data)
+        except ValueError as e:
+            my_logger.warning(f'Label "{label_path}" is not valid: {e}')
+            continue
+        boxes.append(file_boxes)
+        image_ids.append(np.full(len(file_boxes), image_id, dtype= np.float32))
+    if len(boxes) == 0:
+        return np.zeros((0, len(LABELS_COLUMNS)), dtype= np.float32)
+    return np.column_stack((np.concatenate(image_ids), np.concatenate(boxes)))
+
+def load_labels(
+    labels: list[Optional[Path]],
+    workers: int = MY_CFG.labels.workers,
+    read: Callable[[Path], bytes] = Path.read_bytes
+) -> np.ndarray:
+    indexed: list[tuple[int, Path]] = [
+        (image_id, label)
+        for image_id, label in enumerate(labels)
+        if label is not None
+    ]
+    chunks: list[list[tuple[int, Path]]] = [
+        indexed[i:i + LABELS_CHUNK_SIZE]
+        for i in range(0, len(indexed), LABELS_CHUNK_SIZE)
+    ]
+    if len(chunks) == 0:
+        return np.zeros((0, len(LABELS_COLUMNS)), dtype= np.float32)
+    with ThreadPoolExecutor(max_workers= max(1, workers)) as executor:
+        arrays: list[np.ndarray] = list(executor.map(lambda chunk: _load_labels_chunk(chunk, read), chunks))
+    return np.concatenate(arrays)
+
+def get_class_counts(
+    labels: np.ndarray,
+    n_images: int,
+    n_classes: Optional[int] = None
+) -> np.ndarray:
+    classes: np.ndarray = labels[:, 1].astype(np.int64)
+    if n_classes is None:
+        n_classes = int(classes.max()) + 1 if len(classes) > 0 else 0
+    counts: np.ndarray = np.zeros((n_images, n_classes), dtype= np.int64)
+    valid: np.ndarray = (classes >= 0) & (classes < n_classes)
+    np.add.at(counts, (labels[valid, 0].astype(np.int64), classes[valid]), 1)
+    return counts
+
+def stratified_assignment(
+    class_counts: np.ndarray,
+    ratios: tuple[float, ...],
+    order: Optional[np.ndarray] = None
+) -> np.ndarray:
+    n_images, n_classes = class_counts.shape
+    ratios_array: np.ndarray = np.array(ratios, dtype= np.float64)
+    totals: np.ndarray = class_counts.sum(axis= 0)
+    desired_boxes: np.ndarray = np.outer(ratios_array, totals)
+    desired_images: np.ndarray = ratios_array * n_images
+    if order is None:
+        order = np.arange(n_images)
+    frequency: np.ndarray = np.where(totals > 0, totals, np.iinfo(np.int64).max)
+    present_frequency: np.ndarray = np.where(class_counts > 0, frequency, np.iinfo(np.int64).max)
+    rarest_class: np.ndarray = present_frequency.argmin(axis= 1) if n_classes > 0 else np.zeros(n_images, dtype= np.int64)
+    rarest_frequency: np.ndarray = present_frequency.min(axis= 1) if n_classes > 0 else np.zeros(n_images, dtype= np.int64)
+    position: np.ndarray = np.empty(n_images, dtype= np.int64)
+    position[order] = np.arange(n_images)
+    sorted_images: np.ndarray = np.lexsort((position, rarest_frequency))
+    assignment: np.ndarray = np.zeros(n_images, dtype= np.int64)
+    for image in sorted_images:
+        counts: np.ndarray = class_counts[image]
+        if n_classes > 0 and counts.any():
+            deficit: np.ndarray = desired_boxes[:, rarest_class[image]]
+            candidates: np.ndarray = np.flatnonzero(deficit == deficit.max())
+            split: int = int(candidates[np.argmax(desired_images[candidates])])
+        else:
+            split = int(np.argmax(desired_images))
+        assignment[image] = split
+        desired_boxes[split] -= counts
+        desired_images[split] -= 1
+    return assignment
+
+def select_labels(
+    labels: np.ndarray,
+    n_images: int,
+    indices: np.ndarray | list[int]
+) -> np.ndarray:
+    new_ids: np.ndarray = np.full(n_images, -1, dtype= np.int64)
+    new_ids[np.asarray(indices, dtype= np.int64)] = np.arange(len(indices))
+    image_ids: np.ndarray = new_ids[labels[:, 0].astype(np.int64)]
+    selected: np.ndarray = labels[image_ids >= 0].copy()
+    selected[:, 0] = image_ids[image_ids >= 0]
+    return selected
+
+def get_labels_stats(
+    labels: np.ndarray,
+    n_images: int,
+    classes: Optional[dict[int, str]] = None
+) -> LabelsStatsDict:
+    class_ids: np.ndarray = labels[:, 1].astype(np.int64)
+    n_classes: int = max(len(classes or {}), int(class_ids.max()) + 1 if len(class_ids) > 0 else 0)
+    class_counts: np.ndarray = np.bincount(class_ids[class_ids >= 0], minlength= n_classes)
+    boxes_per_image: np.ndarray = np.bincount(labels[:, 0].astype(np.int64), minlength= n_images)
+    per_image_counts: np.ndarray = np.bincount(boxes_per_image)
+    area_counts, _ = np.histogram(labels[:, 4] * labels[:, 5], bins= BOX_AREA_BINS)
+    percentiles: tuple[int, ...] = (5, 50, 95)
+    return {
+        'images': n_images,
+        'labeled_images': int((boxes_per_image > 0).sum()),
+        'unlabeled_images': int((boxes_per_image == 0).sum()),
+        'boxes': len(labels),
+        'class_counts': {
+            (classes or {}).get(i, str(i)): int(n)
+            for i, n in enumerate(class_counts)
+        },
+        'boxes_per_image': {
+            i: int(n)
+            for i, n in enumerate(per_image_counts)
+            if n > 0
+        },
+        'box_area': {
+            f'{low:g}-{high:g}': int(n)
+            for low, high, n in zip(BOX_AREA_BINS[:-1], BOX_AREA_BINS[1:], area_counts)
+        },
+        'box_width': {
+            f'p{p}': float(np.percentile(labels[:, 4], p)) if len(labels) > 0 else 0.0
+            for p in percentiles
+        },
+        'box_height': {
+            f'p{p}': float(np.percentile(labels[:, 5], p)) if len(labels) > 0 else 0.0
+            for p in percentiles
+        }
+    }
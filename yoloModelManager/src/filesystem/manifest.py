@@ -0,0 +1,428 @@
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import blake2b
+from os import scandir
+from pathlib import Path
+from threading import RLock
+from typing import Callable, Iterable, Optional
+
+from pyUtils import Styles
+
+from ..utils.config import my_logger
+
+MANIFEST_FILE_NAME: str = '.manifest.sqlite'
+MANIFEST_VERSION: int = 3
+HASH_CHUNK_SIZE: int = 1 << 20
+
+
+def match_label_stem(label_stem: str, image_stems: set[str] | dict[str, Path]) -> Optional[str]:
+    for i in range(len(label_stem)):
+        if label_stem[i:] in image_stems:
+            return label_stem[i:]
+    return None
+
+def hash_file(path: Path) -> str:
+    file_hash = blake2b(digest_size= 16)
+    with open(path, 'rb') as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+def pair_labels(
+    images: Iterable[Path],
+    labels: Iterable[Path]
+) -> dict[Path, Path]:
+    images_by_stem: dict[str, Path] = {image.stem: image for image in images}
+    pairs: dict[Path, Path] = {}
+    for label in labels:
+        stem: Optional[str] = match_label_stem(label.stem, images_by_stem)
+        if stem is not None and images_by_stem[stem] not in pairs:
+            pairs[images_by_stem[stem]] = label
+    return pairs
+
+
+class DatasetManifest:
+    KINDS: tuple[str, ...] = ('images', 'labels')
+
+    def __init__(
+        self,
+        path: Path,
+        db_path: Optional[Path] = None
+    ) -> None:
+        self.path: Path = Path(path)
+        self.db_path: Path = self.path / MANIFEST_FILE_NAME if db_path is None else Path(db_path)
+        self._lock = RLock()
+        self._absolute_paths: dict[str, Path] = {}
+        self._connection: sqlite3.Connection = self._connect()
+        self._create_tables()
+
+    def _connect(self) -> sqlite3.Connection:
+        try:
+            connection = sqlite3.connect(str(self.db_path), check_same_thread= False)
+            connection.execute('PRAGMA journal_mode=WAL')
+        except sqlite3.Error as e:
+            my_logger.warning(f'Manifest "{self.db_path}" can\'t be opened ({e}). Using an in-memory manifest.')
+            connection = sqlite3.connect(':memory:', check_same_thread= False)
+        connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+
+    def _create_tables(self) -> None:
+        with self._lock, self._connection:
+            self._connection.executescript('''
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    stem TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    label_stem TEXT,
+                    content_hash TEXT,
+                    perceptual_hash TEXT
+                );
+                CREATE INDEX IF NOT EXISTS files_kind_stem ON files (kind, stem);
+                CREATE INDEX IF NOT EXISTS files_label_stem ON files (label_stem);
+                CREATE TABLE IF NOT EXISTS dirs (
+                    path TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS validation (
+                    content_hash TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    issues TEXT NOT NULL,
+                    PRIMARY KEY (content_hash, key)
+                );
+                CREATE TABLE IF NOT EXISTS info (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            ''')
+            version: Optional[tuple] = self._connection.execute(
+                "SELECT value FROM info WHERE key = 'version'"
+            ).fetchone()
+            if version is None or int(version[0]) != MANIFEST_VERSION:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO info VALUES ('version', ?)",
+                    (str(MANIFEST_VERSION),)
+                )
+                self._connection.execute('DROP TABLE files')
+                self._connection.execute('DELETE FROM dirs')
+                self._create_tables()
+
+    def __len__(self) -> int:
+        return self.count('images')
+
+    def _absolute(self, path: str) -> Path:
+        absolute_path: Optional[Path] = self._absolute_paths.get(path)
+        if absolute_path is None:
+            absolute_path = self._absolute_paths[path] = self.path / path
+        return absolute_path
+
+    def _relative(self, path: Path) -> str:
+        return path.relative_to(self.path).as_posix()
+
+    def _kind(self, path: Path) -> Optional[str]:
+        try:
+            kind: str = path.relative_to(self.path).parts[0]
+        except (ValueError, IndexError):
+            return None
+        return kind if kind in self.KINDS else None
+
+    def _scan_dir(
+        self,
+        dir_path: Path,
+        full: bool,
+        known_dirs: dict[str, int],
+        children: dict[str, list[str]],
+        found: dict[str, tuple[int, int]],
+        unchanged_dirs: set[str]
+    ) -> None:
+        rel_dir: str = self._relative(dir_path)
+        try:
+            mtime_ns: int = dir_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+        if not full and known_dirs.get(rel_dir) == mtime_ns:
+            unchanged_dirs.add(rel_dir)
+            for child in children.get(rel_dir, []):
+                self._scan_dir(self.path / child, full, known_dirs, children, found, unchanged_dirs)
+            return
+        self._connection.execute(
+            'INSERT OR REPLACE INTO dirs VALUES (?, ?)',
+            (rel_dir, mtime_ns)
+        )
+        with scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks= False):
+                    self._scan_dir(Path(entry.path), full, known_dirs, children, found, unchanged_dirs)
+                elif entry.is_file() and not entry.name.startswith('.'):
+                    st = entry.stat()
+                    found[self._relative(Path(entry.path))] = (st.st_size, st.st_mtime_ns)
+
+    def update(self, full: bool = False) -> int:
+        changes: int = 0
+        with self._lock, self._connection:
+            known_dirs: dict[str, int] = dict(
+                self._connection.execute('SELECT path, mtime_ns FROM dirs').fetchall()
+            )
+            children: dict[str, list[str]] = {}
+            for known_dir in known_dirs:
+                children.setdefault(known_dir.rpartition('/')[0], []).append(known_dir)
+            for kind in self.KINDS:
+                dir_path: Path = self.path / kind
+                if not dir_path.is_dir():
+                    changes += self._connection.execute(
+                        'DELETE FROM files WHERE kind = ?',
+                        (kind,)
+                    ).rowcount
+                    continue
+                found: dict[str, tuple[int, int]] = {}
+                unchanged_dirs: set[str] = set()
+                self._scan_dir(dir_path, full, known_dirs, children, found, unchanged_dirs)
+                if kind in unchanged_dirs and all(
+                    known_dir in unchanged_dirs
+                    for known_dir in known_dirs
+                    if known_dir == kind or known_dir.startswith(f'{kind}/')
+                ):
+                    continue
+                known: dict[str, tuple[int, int]] = {
+                    path: (size, mtime_ns)
+                    for path, size, mtime_ns in self._connection.execute(
+                        'SELECT path, size, mtime_ns FROM files WHERE kind = ?',
+                        (kind,)
+                    )
+                }
+                removed: list[tuple[str]] = [
+                    (path,)
+                    for path in known
+                    if path not in found and path.rpartition('/')[0] not in unchanged_dirs
+                ]
+                added: list[tuple[str, str, str, int, int, Optional[str]]] = [
+                    (path, kind, Path(path).stem, size, mtime_ns, None)
+                    for path, (size, mtime_ns) in found.items()
+                    if known.get(path) != (size, mtime_ns)
+                ]
+                self._connection.executemany('DELETE FROM files WHERE path = ?', removed)
+                for path, in removed:
+                    self._absolute_paths.pop(path, None)
+                self._connection.executemany(
+                    'INSERT OR REPLACE INTO files (path, kind, stem, size, mtime_ns, label_stem) VALUES (?, ?, ?, ?, ?, ?)',
+                    added
+                )
+                changes += len(removed) + len(added)
+            if changes > 0:
+                self._pair_labels()
+        if changes > 0:
+            my_logger.debug(f'Manifest of "{self.path}" updated: {changes} changes.', Styles.SUCCEED)
+        return changes
+
+    def add(self, paths: Iterable[Path]) -> None:
+        rows: list[tuple[str, str, str, int, int, Optional[str]]] = []
+        added: list[Path] = []
+        for path in paths:
+            kind: Optional[str] = self._kind(path)
+            if kind is None:
+                continue
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            rows.append((self._relative(path), kind, path.stem, st.st_size, st.st_mtime_ns, None))
+            added.append(path)
+        if len(rows) == 0:
+            return
+        with self._lock, self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO files (path, kind, stem, size, mtime_ns, label_stem) VALUES (?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            for dir_path in {path.parent for path in added}:
+                self._connection.execute(
+                    'INSERT OR REPLACE INTO dirs VALUES (?, ?)',
+                    (self._relative(dir_path), dir_path.stat().st_mtime_ns)
+                )
+            self._pair_labels()
+
+    def _pair_labels(self) -> None:
+        image_stems: set[str] = {
+            stem
+            for stem, in self._connection.execute("SELECT stem FROM files WHERE kind = 'images'")
+        }
+        updates: list[tuple[Optional[str], str]] = [
+            (match_label_stem(stem, image_stems), path)
+            for path, stem in self._connection.execute(
+                "SELECT path, stem FROM files WHERE kind = 'labels'"
+            ).fetchall()
+        ]
+        self._connection.executemany('UPDATE files SET label_stem = ? WHERE path = ?', updates)
+
+    def _paths(self, query: str, args: tuple = ()) -> list[Path]:
+        with self._lock:
+            return [self._absolute(path) for path, in self._connection.execute(query, args)]
+
+    def images(self) -> list[Path]:
+        return self._paths("SELECT path FROM files WHERE kind = 'images' ORDER BY path")
+
+    def labels(self) -> list[Path]:
+        return self._paths("SELECT path FROM files WHERE kind = 'labels' ORDER BY path")
+
+    def count(self, kind: str = 'images') -> int:
+        with self._lock:
+            return self._connection.execute(
+                'SELECT COUNT(*) FROM files WHERE kind = ?',
+                (kind,)
+            ).fetchone()[0]
+
+    def pairs(self) -> list[tuple[Path, Optional[Path]]]:
+        with self._lock:
+            rows: list[tuple[str, Optional[str]]] = self._connection.execute("""
+                SELECT images.path, MIN(labels.path)
+                FROM files AS images
+                LEFT JOIN files AS labels
+                    ON labels.kind = 'labels' AND labels.label_stem = images.stem
+                WHERE images.kind = 'images'
+                GROUP BY images.path
+                ORDER BY images.path
+            """).fetchall()
+        return [
+            (self._absolute(image), None if label is None else self._absolute(label))
+            for image, label in rows
+        ]
+
+    def orphan_labels(self) -> list[Path]:
+        return self._paths(
+            "SELECT path FROM files WHERE kind = 'labels' AND label_stem IS NULL ORDER BY path"
+        )
+
+    def signature(self) -> str:
+        signature = blake2b(digest_size= 16)
+        with self._lock:
+            for path, size, mtime_ns in self._connection.execute(
+                'SELECT path, size, mtime_ns FROM files ORDER BY path'
+            ):
+                signature.update(f'{path}\0{size}\0{mtime_ns}\n'.encode())
+        return signature.hexdigest()
+
+    def get_label(self, image_stem: str) -> Optional[Path]:
+        with self._lock:
+            row: Optional[tuple] = self._connection.execute(
+                "SELECT MIN(path) FROM files WHERE kind = 'labels' AND label_stem = ?",
+                (image_stem,)
+            ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return self._absolute(row[0])
+
+    def _get_cached_values(
+        self,
+        column: str,
+        paths: list[Path],
+        function: Callable[[Path], Optional[str]],
+        workers: int = 8
+    ) -> dict[Path, Optional[str]]:
+        relative_paths: dict[str, Path] = {self._relative(path): path for path in paths}
+        with self._lock:
+            known: dict[str, str] = dict(self._connection.execute(
+                f'SELECT path, {column} FROM files WHERE {column} IS NOT NULL'
+            ).fetchall())
+        values: dict[Path, Optional[str]] = {
+            path: known[relative_path]
+            for relative_path, path in relative_paths.items()
+            if relative_path in known
+        }
+        missing: list[str] = [
+            relative_path
+            for relative_path in relative_paths
+            if relative_path not in known
+        ]
+        if len(missing) == 0:
+            return values
+        with ThreadPoolExecutor(max_workers= max(1, workers)) as executor:
+            new_values: list[Optional[str]] = list(executor.map(
+                function,
+                [relative_paths[relative_path] for relative_path in missing]
+            ))
+        with self._lock, self._connection:
+            self._connection.executemany(
+                f'UPDATE files SET {column} = ? WHERE path = ?',
+                list(zip(new_values, missing))
+            )
+        values.update({
+            relative_paths[relative_path]: new_value
+            for relative_path, new_value in zip(missing, new_values)
+        })
+        my_logger.debug(f'{len(missing)} values of {column} computed on "{self.path}".')
+        return values
+
+    def get_content_hashes(
+        self,
+        paths: list[Path],
+        workers: int = 8
+    ) -> dict[Path, str]:
+        return self._get_cached_values('content_hash', paths, hash_file, workers) # type: ignore
+
+    def get_perceptual_hashes(
+        self,
+        paths: list[Path],
+        function: Callable[[Path], Optional[int]],
+        method: str,
+        workers: int = 8
+    ) -> dict[Path, int]:
+
+        def compute(path: Path) -> Optional[str]:
+            value: Optional[int] = function(path)
+            return None if value is None else f'{method}:{value:016x}'
+
+        values: dict[Path, Optional[str]] = self._get_cached_values('perceptual_hash', paths, compute, workers)
+        stale: list[Path] = [
+            path
+            for path, value in values.items()
+            if value is not None and not value.startswith(f'{method}:')
+        ]
+        if len(stale) > 0:
+            with self._lock, self._connection:
+                self._connection.executemany(
+                    'UPDATE files SET perceptual_hash = NULL WHERE path = ?',
+                    [(self._relative(path),) for path in stale]
+                )
+            values.update(self._get_cached_values('perceptual_hash', stale, compute, workers))
+        return {
+            path: int(value.partition(':')[2], 16)
+            for path, value in values.items()
+            if value is not None
+        }
+
+    def get_validations(
+        self,
+        content_hashes: Iterable[str],
+        key: str
+    ) -> dict[str, list[tuple[str, str]]]:
+        content_hashes = set(content_hashes)
+        with self._lock:
+            rows: list[tuple[str, str]] = self._connection.execute(
+                'SELECT content_hash, issues FROM validation WHERE key = ?',
+                (key,)
+            ).fetchall()
+        return {
+            content_hash: [tuple(issue) for issue in json.loads(issues)]
+            for content_hash, issues in rows
+            if content_hash in content_hashes
+        }
+
+    def set_validations(
+        self,
+        validations: dict[str, list[tuple[str, str]]],
+        key: str
+    ) -> None:
+        with self._lock, self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO validation VALUES (?, ?, ?)',
+                [
+                    (content_hash, key, json.dumps(issues))
+                    for content_hash, issues in validations.items()
+                ]
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
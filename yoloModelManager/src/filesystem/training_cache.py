@@ -0,0 +1,132 @@
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from hashlib import blake2b
+from os import replace
+from pathlib import Path
+from typing import Callable, Optional
+
+import cv2
+import numpy as np
+
+from ..image import ImageProcessing
+from ..utils.config import YOLO_IMAGE_HEIGHT, YOLO_IMAGE_WIDTH, my_logger
+from .files import encode_image, get_image_format
+
+TRAINING_CACHE_INDEX_NAME: str = '.index.json'
+CONFORM_CHECKS: dict[str, Callable[[np.ndarray], bool]] = {
+    'GREY': lambda image: image.ndim == 3,
+    'COLOR': lambda image: image.ndim == 2,
+    'RESIZE': lambda image: image.shape[:2] != (YOLO_IMAGE_HEIGHT, YOLO_IMAGE_WIDTH)
+}
+
+
+def get_training_cache_key(
+    dataset_path: Path,
+    filters: list[str],
+    imgsz: int,
+    image_format: str,
+    quality: Optional[int]
+) -> str:
+    key: str = json.dumps([str(dataset_path), filters, imgsz, image_format, quality])
+    return blake2b(key.encode(), digest_size= 8).hexdigest()
+
+def check_conform_filters(filters: list[str]) -> None:
+    for filter in filters:
+        if filter not in ImageProcessing.FILTERS:
+            msg: str = f'Unknown filter "{filter}". Valid options: {list(ImageProcessing.FILTERS)}.'
+            my_logger.error(f'ValueError: {msg}')
+            raise ValueError(msg)
+        if filter not in CONFORM_CHECKS:
+            msg = f'Filter "{filter}" changes the geometry of the labels. Train without cache.'
+            my_logger.error(f'ValueError: {msg}')
+            raise ValueError(msg)
+
+def conform_image(
+    image: np.ndarray,
+    filters: list[str],
+    imgsz: int
+) -> np.ndarray:
+    check_conform_filters(filters)
+    for filter in filters:
+        if CONFORM_CHECKS[filter](image):
+            image = ImageProcessing.FILTERS[filter](image)
+    scale: float = imgsz / max(image.shape[:2])
+    if scale < 1:
+        image = cv2.resize(
+            image,
+            (round(image.shape[1] * scale), round(image.shape[0] * scale)),
+            interpolation= cv2.INTER_AREA
+        )
+    return image
+
+def cache_image(
+    source: Path,
+    destiny: Path,
+    filters: list[str],
+    imgsz: int,
+    image_format: str,
+    quality: Optional[int] = None
+) -> int:
+    image: Optional[np.ndarray] = cv2.imread(str(source), cv2.IMREAD_UNCHANGED)
+    if image is None:
+        raise ValueError(f'"{source}" can\'t be decoded.')
+    data: bytes = encode_image(conform_image(image, filters, imgsz), image_format, quality)
+    temp_path: Path = destiny.with_name(f'.{destiny.name}.tmp')
+    temp_path.write_bytes(data)
+    replace(temp_path, destiny)
+    return len(data)
+
+def build_split_cache(
+    pairs: list[tuple[Path, Optional[Path]]],
+    hashes: dict[Path, str],
+    cache_dir: Path,
+    filters: list[str],
+    imgsz: int,
+    image_format: str,
+    quality: Optional[int] = None,
+    workers: int = 4
+) -> tuple[int, int]:
+    check_conform_filters(filters)
+    images_dir: Path = cache_dir / 'images'
+    labels_dir: Path = cache_dir / 'labels'
+    images_dir.mkdir(parents= True, exist_ok= True)
+    labels_dir.mkdir(parents= True, exist_ok= True)
+    index_path: Path = cache_dir / TRAINING_CACHE_INDEX_NAME
+    try:
+        index: dict[str, str] = json.loads(index_path.read_text())
+    except (OSError, ValueError):
+        index = {}
+    extension: str = get_image_format(image_format)[0]
+    new_index: dict[str, str] = {}
+    pending: list[tuple[Path, Path]] = []
+    for image, label in pairs:
+        destiny: Path = images_dir / (image.stem + extension)
+        label_destiny: Path = labels_dir / (image.stem + '.txt')
+        new_index[image.stem] = hashes[image]
+        if index.get(image.stem) != hashes[image] or not destiny.is_file():
+            pending.append((image, destiny))
+        if label is None:
+            label_destiny.unlink(missing_ok= True)
+        else:
+            label_data: bytes = label.read_bytes()
+            if not label_destiny.is_file() or label_destiny.read_bytes() != label_data:
+                label_destiny.write_bytes(label_data)
+    for stem in set(index) - set(new_index):
+        (images_dir / (stem + extension)).unlink(missing_ok= True)
+        (labels_dir / (stem + '.txt')).unlink(missing_ok= True)
+    failed: int = 0
+    if len(pending) > 0:
+        with ProcessPoolExecutor(max_workers= max(1, workers)) as executor:
+            futures = {
+                executor.submit(cache_image, image, destiny, filters, imgsz, image_format, quality): image
+                for image, destiny in pending
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except (OSError, ValueError, RuntimeError) as e:
+                    failed += 1
+                    new_index.pop(futures[future].stem, None)
+                    my_logger.warning(f'"{futures[future]}" can\'t be cached: {e}')
+    index_path.write_text(json.dumps(new_index))
+    return len(pending) - failed, len(pairs) - len(pending)
@@ -0,0 +1,158 @@
+import platform
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from enum import Enum
+from os import link, symlink
+from pathlib import Path
+from shutil import copy2
+from threading import Lock
+from time import monotonic
+from typing import Optional, TypedDict
+
+from pyUtils import Styles
+
+from ..utils.config import MY_CFG, my_logger
+from ..utils.data_types import ProgressCallback
+
+FICLONE: int = 0x40049409
+
+
+class TransferModes(Enum):
+    COPY = 'copy'
+    HARDLINK = 'hardlink'
+    REFLINK = 'reflink'
+    SYMLINK = 'symlink'
+
+
+class TransferSummaryDict(TypedDict):
+    files: int
+    transferred: int
+    skipped: int
+    failed: int
+    bytes: int
+    elapsed: float
+    files_per_second: float
+    mb_per_second: float
+    modes: dict[str, int]
+
+
+def _reflink(source: Path, destiny: Path) -> None:
+    if platform.system() != 'Linux':
+        raise OSError('Reflinks are only supported on Linux.')
+    import fcntl
+    with open(source, 'rb') as src, open(destiny, 'wb') as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            destiny.unlink(missing_ok= True)
+            raise
+
+def transfer_file(
+    source: Path,
+    destiny: Path,
+    mode: TransferModes = TransferModes.COPY
+) -> TransferModes:
+    if mode == TransferModes.HARDLINK:
+        try:
+            link(source, destiny)
+            return mode
+        except OSError:
+            pass
+    elif mode == TransferModes.REFLINK:
+        try:
+            _reflink(source, destiny)
+            return mode
+        except OSError:
+            pass
+    elif mode == TransferModes.SYMLINK:
+        try:
+            symlink(source.resolve(), destiny)
+            return mode
+        except OSError:
+            pass
+    copy2(source, destiny)
+    return TransferModes.COPY
+
+def _is_transferred(source: Path, destiny: Path) -> bool:
+    try:
+        return destiny.stat().st_size == source.stat().st_size
+    except OSError:
+        return False
+
+def transfer_files(
+    files_list: list[Path],
+    destiny_dir: Path,
+    new_names: Optional[list[str]] = None,
+    mode: str | TransferModes = MY_CFG.transfer.mode,
+    workers: int = MY_CFG.transfer.workers,
+    resume: bool = True,
+    progress: Optional[ProgressCallback] = None
+) -> TransferSummaryDict:
+    if not destiny_dir.is_dir():
+        msg: str = f'"{destiny_dir}" does not exists.'
+        my_logger.error(f'NotADirectoryError: {msg}')
+        raise NotADirectoryError(msg)
+    mode = TransferModes(mode)
+    if new_names is None:
+        new_names = [file.name for file in files_list]
+    lock = Lock()
+    summary: TransferSummaryDict = {
+        'files': len(files_list),
+        'transferred': 0,
+        'skipped': 0,
+        'failed': 0,
+        'bytes': 0,
+        'elapsed': 0.0,
+        'files_per_second': 0.0,
+        'mb_per_second': 0.0,
+        'modes': {}
+    }
+    start: float = monotonic()
+    last_progress: float = start
+
+    def transfer(source: Path, destiny: Path) -> None:
+        if not source.is_file():
+            my_logger.warning(f'"{source}" won\'t be copied. File doesn\'t exists.')
+            with lock:
+                summary['failed'] += 1
+            return
+        if destiny.exists() or destiny.is_symlink():
+            if resume and _is_transferred(source, destiny):
+                with lock:
+                    summary['skipped'] += 1
+                return
+            destiny.unlink()
+        used: TransferModes = transfer_file(source, destiny, mode) # type: ignore
+        size: int = source.stat().st_size
+        with lock:
+            summary['transferred'] += 1
+            summary['bytes'] += size
+            summary['modes'][used.value] = summary['modes'].get(used.value, 0) + 1
+
+    with ThreadPoolExecutor(max_workers= max(1, workers)) as executor:
+        futures = [
+            executor.submit(transfer, source, destiny_dir / new_name)
+            for source, new_name in zip(files_list, new_names)
+        ]
+        for i, future in enumerate(as_completed(futures), start= 1):
+            try:
+                future.result()
+            except OSError as e:
+                with lock:
+                    summary['failed'] += 1
+                my_logger.error(f'Transfer to "{destiny_dir}" failed: {e}')
+            now: float = monotonic()
+            if progress is not None and (now - last_progress > 0.5 or i == len(futures)):
+                last_progress = now
+                progress(f'{destiny_dir.parent.name}/{destiny_dir.name}', i, len(futures))
+    summary['elapsed'] = monotonic() - start
+    elapsed: float = max(summary['elapsed'], 1e-9)
+    summary['files_per_second'] = (summary['transferred'] + summary['skipped']) / elapsed
+    summary['mb_per_second'] = summary['bytes'] / elapsed / 1e6
+    my_logger.debug(
+        f'{summary["transferred"]} files transferred ({summary["modes"]}), {summary["skipped"]} skipped '
+        f'and {summary["failed"]} failed to "{destiny_dir}" in {summary["elapsed"]:.2f} s: '
+        f'{summary["files_per_second"]:.1f} files/s, {summary["mb_per_second"]:.2f} MB/s.',
+        Styles.SUCCEED
+    )
+    return summary
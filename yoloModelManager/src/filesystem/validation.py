@@ -0,0 +1,108 @@
+from enum import Enum
+from pathlib import Path
+from typing import Optional, TypedDict
+
+import cv2
+import numpy as np
+
+
+class ValidationIssues(Enum):
+    UNREADABLE_IMAGE = 'unreadable_image'
+    IMAGE_SIZE = 'image_size'
+    UNREADABLE_LABEL = 'unreadable_label'
+    MALFORMED_LABEL = 'malformed_label'
+    CLASS_ID = 'class_id'
+    COORDINATES = 'coordinates'
+    DUPLICATE_BOX = 'duplicate_box'
+    MISSING_KEY = 'missing_key'
+
+
+class ValidationIssueDict(TypedDict):
+    path: str
+    issue: str
+    detail: str
+
+
+def get_image_validation_key(width: Optional[int], height: Optional[int]) -> str:
+    return f'image:{width}x{height}'
+
+def get_label_validation_key(nc: Optional[int]) -> str:
+    return f'label:{nc}'
+
+def validate_image(
+    path: Path,
+    width: Optional[int] = None,
+    height: Optional[int] = None
+) -> list[tuple[str, str]]:
+    image: Optional[np.ndarray] = cv2.imread(str(path), cv2.IMREAD_UNCHANGED)
+    if image is None:
+        return [(ValidationIssues.UNREADABLE_IMAGE.value, 'The image can\'t be decoded.')]
+    image_height, image_width = image.shape[:2]
+    if (width is not None and image_width != width) or (height is not None and image_height != height):
+        return [(ValidationIssues.IMAGE_SIZE.value, f'{image_width}x{image_height} instead of {width}x{height}.')]
+    return []
+
+def validate_label(
+    path: Path,
+    nc: Optional[int] = None
+) -> list[tuple[str, str]]:
+    try:
+        lines: list[str] = path.read_text().splitlines()
+    except (OSError, UnicodeDecodeError) as e:
+        return [(ValidationIssues.UNREADABLE_LABEL.value, str(e))]
+    issues: list[tuple[str, str]] = []
+    boxes: set[tuple[str, ...]] = set()
+    for n, line in enumerate(lines, start= 1):
+        tokens: list[str] = line.split()
+        if len(tokens) == 0:
+            continue
+        if len(tokens) < 5 or (len(tokens) > 5 and len(tokens) % 2 == 0):
+            issues.append((ValidationIssues.MALFORMED_LABEL.value, f'Line {n}: {len(tokens)} values.'))
+            continue
+        try:
+            class_id: float = float(tokens[0])
+            values: list[float] = [float(token) for token in tokens[1:]]
+        except ValueError:
+            issues.append((ValidationIssues.MALFORMED_LABEL.value, f'Line {n}: "{line.strip()}" is not numeric.'))
+            continue
+        if not class_id.is_integer() or class_id < 0 or (nc is not None and class_id >= nc):
+            issues.append((ValidationIssues.CLASS_ID.value, f'Line {n}: class {tokens[0]} not in [0, {nc}).'))
+        if any(not 0 <= value <= 1 for value in values):
+            issues.append((ValidationIssues.COORDINATES.value, f'Line {n}: coordinates out of [0, 1].'))
+        box: tuple[str, ...] = (tokens[0], *(f'{value:.6f}' for value in values))
+        if box in boxes:
+            issues.append((ValidationIssues.DUPLICATE_BOX.value, f'Line {n}: duplicated box.'))
+        boxes.add(box)
+    return issues
+
+def validate_file(
+    kind: str,
+    path: Path,
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    nc: Optional[int] = None
+) -> list[tuple[str, str]]:
+    if kind == 'images':
+        return validate_image(path, width, height)
+    return validate_label(path, nc)
+
+def validate_keys(
+    path: Path,
+    data: Optional[dict],
+    keys: tuple[str, ...]
+) -> list[ValidationIssueDict]:
+    if not isinstance(data, dict):
+        return [{
+            'path': str(path),
+            'issue': ValidationIssues.MISSING_KEY.value,
+            'detail': 'The file is empty or not a mapping.'
+        }]
+    return [
+        {
+            'path': str(path),
+            'issue': ValidationIssues.MISSING_KEY.value,
+            'detail': f'"{key}" is missing.'
+        }
+        for key in keys
+        if key not in data
+    ]
@@ -1,2 +1,7 @@
+from .auto_label import AutoLabelSummaryDict, auto_label_images
 from .model_manager import ModelManager
 from .results import MyResults, ResultTracker
+from .sweep import (SweepConfigDict, SweepResultDict, get_sweep_configs,
+                    save_sweep_results, sweep_models)
+from .training_job import (TrainingJob, TrainingJobStates,
+                           TrainingProgressDict, format_progress)
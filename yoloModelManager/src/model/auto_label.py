@@ -0,0 +1,230 @@
+import json
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from os import scandir
+from pathlib import Path
+from time import monotonic
+from typing import Callable, Iterable, Iterator, Optional, TypedDict
+
+import cv2
+import numpy as np
+from pyUtils import Styles, copy_files
+
+from ..filesystem import ALLOWED_IMAGES_EXTENSIONS, DatasetDirManager
+from ..filesystem.transfer import TransferModes, transfer_file
+from ..utils.config import MY_CFG, my_logger
+from .inference_server import boxes_to_array
+from .model_manager import ModelManager
+
+ImagePrediction = tuple[Path, Optional[np.ndarray], tuple[int, int]]
+
+
+class AutoLabelSummaryDict(TypedDict):
+    images: int
+    labeled: int
+    empty: int
+    review: int
+    skipped: int
+    failed: int
+    boxes: int
+    elapsed: float
+
+
+_WORKER_MODEL: Optional[ModelManager] = None
+
+
+def iter_images(images_path: Path) -> Iterator[Path]:
+    with scandir(images_path) as entries:
+        for entry in entries:
+            if entry.is_file() and Path(entry.name).suffix.lower() in ALLOWED_IMAGES_EXTENSIONS:
+                yield Path(entry.path)
+
+def iter_batches(items: Iterable[Path], size: int) -> Iterator[list[Path]]:
+    iterator: Iterator[Path] = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def predict_images(
+    model: ModelManager,
+    images: list[Path]
+) -> list[ImagePrediction]:
+    frames: list[np.ndarray] = []
+    readable: list[Path] = []
+    predictions: list[ImagePrediction] = []
+    for image in images:
+        frame: Optional[np.ndarray] = cv2.imread(str(image))
+        if frame is None:
+            predictions.append((image, None, (0, 0)))
+        else:
+            frames.append(frame)
+            readable.append(image)
+    if len(frames) > 0:
+        for image, result in zip(readable, model.predict_batch(frames)):
+            predictions.append((image, boxes_to_array(result.boxes), (result.img_w, result.img_h)))
+    return predictions
+
+def _init_worker(model_name: str) -> None:
+    global _WORKER_MODEL
+    _WORKER_MODEL = ModelManager(model_name)
+
+def _predict_worker(images: list[Path]) -> list[ImagePrediction]:
+    return predict_images(_WORKER_MODEL, images) # type: ignore
+
+def to_yolo_lines(boxes: np.ndarray, width: int, height: int) -> list[str]:
+    return [
+        f'{int(cls)} {(x1 + x2) / 2 / width:.6f} {(y1 + y2) / 2 / height:.6f} '
+        f'{(x2 - x1) / width:.6f} {(y2 - y1) / height:.6f}'
+        for x1, y1, x2, y2, _, cls in boxes
+    ]
+
+def to_label_studio_task(
+    image_url: str,
+    boxes: np.ndarray,
+    width: int,
+    height: int,
+    names: dict[int, str],
+    model_version: str
+) -> dict:
+    return {
+        'data': {'image': image_url},
+        'predictions': [{
+            'model_version': model_version,
+            'score': float(boxes[:, 4].mean()) if len(boxes) > 0 else 0.0,
+            'result': [
+                {
+                    'id': f'{i}',
+                    'type': 'rectanglelabels',
+                    'from_name': 'label',
+                    'to_name': 'image',
+                    'original_width': width,
+                    'original_height': height,
+                    'image_rotation': 0,
+                    'score': float(conf),
+                    'value': {
+                        'rotation': 0,
+                        'x': float(100 * x1 / width),
+                        'y': float(100 * y1 / height),
+                        'width': float(100 * (x2 - x1) / width),
+                        'height': float(100 * (y2 - y1) / height),
+                        'rectanglelabels': [names.get(int(cls), str(int(cls)))]
+                    }
+                }
+                for i, (x1, y1, x2, y2, conf, cls) in enumerate(boxes)
+            ]
+        }]
+    }
+
+def merge_tasks(predictions_path: Path, tasks_path: Path) -> int:
+    tasks: list[Path] = sorted(predictions_path.glob('*.json'))
+    temp_path: Path = tasks_path.with_name(f'.{tasks_path.name}.tmp')
+    with open(temp_path, 'w') as f:
+        f.write('[\n')
+        for i, task in enumerate(tasks):
+            f.write((',\n' if i > 0 else '') + task.read_text().strip())
+        f.write('\n]\n' if len(tasks) > 0 else ']\n')
+    temp_path.replace(tasks_path)
+    return len(tasks)
+
+def auto_label_images(
+    model_name: str,
+    images_path: Path,
+    output_path: Path,
+    batch: int = MY_CFG.auto_label.batch,
+    workers: int = MY_CFG.auto_label.workers,
+    conf: float = MY_CFG.auto_label.conf,
+    review_conf: float = MY_CFG.auto_label.review_conf,
+    overwrite: bool = False,
+    progress: Optional[Callable[[AutoLabelSummaryDict], None]] = None
+) -> AutoLabelSummaryDict:
+    model: ModelManager = ModelManager(model_name)
+    names: dict[int, str] = model.object_classes
+    dataset_dir: DatasetDirManager = DatasetDirManager(output_path, create= True)
+    with open(dataset_dir.path / 'classes.txt', 'w') as f:
+        f.writelines(f'{names[i]}\n' for i in sorted(names))
+    if (images_path / 'metadata.yaml').is_file():
+        copy_files([images_path / 'metadata.yaml'], dataset_dir.path)
+    predictions_path: Path = dataset_dir.path / 'predictions'
+    predictions_path.mkdir(exist_ok= True)
+    review_path: Path = dataset_dir.path / 'review.txt'
+    review: set[str] = set(review_path.read_text().splitlines()) if review_path.is_file() else set()
+    summary: AutoLabelSummaryDict = {
+        'images': 0,
+        'labeled': 0,
+        'empty': 0,
+        'review': 0,
+        'skipped': 0,
+        'failed': 0,
+        'boxes': 0,
+        'elapsed': 0.0
+    }
+    start: float = monotonic()
+
+    def pending_images() -> Iterator[Path]:
+        for image in iter_images(images_path):
+            summary['images'] += 1
+            if not overwrite and (dataset_dir.labels_path / (image.stem + '.txt')).is_file():
+                summary['skipped'] += 1
+                continue
+            yield image
+
+    def write(predictions: list[ImagePrediction]) -> None:
+        for image, boxes, (width, height) in predictions:
+            if boxes is None:
+                summary['failed'] += 1
+                my_logger.warning(f'"{image}" can\'t be read.')
+                continue
+            boxes = boxes[boxes[:, 4] >= conf]
+            destiny: Path = dataset_dir.images_path / image.name
+            if not destiny.exists():
+                transfer_file(image, destiny, TransferModes.HARDLINK)
+            (dataset_dir.labels_path / (image.stem + '.txt')).write_text(
+                ''.join(f'{line}\n' for line in to_yolo_lines(boxes, width, height))
+            )
+            task: dict = to_label_studio_task(
+                f'{MY_CFG.auto_label.image_url_prefix}{destiny.relative_to(dataset_dir.path).as_posix()}',
+                boxes,
+                width,
+                height,
+                names,
+                model_name
+            )
+            (predictions_path / (image.stem + '.json')).write_text(json.dumps(task))
+            summary['boxes'] += len(boxes)
+            summary['labeled' if len(boxes) > 0 else 'empty'] += 1
+            if len(boxes) > 0 and boxes[:, 4].min() < review_conf:
+                summary['review'] += 1
+                review.add(str(destiny))
+            else:
+                review.discard(str(destiny))
+        if progress is not None:
+            progress(summary)
+
+    try:
+        if workers <= 0:
+            for images in iter_batches(pending_images(), batch):
+                write(predict_images(model, images))
+        else:
+            with ProcessPoolExecutor(
+                max_workers= workers,
+                initializer= _init_worker,
+                initargs= (model_name,)
+            ) as executor:
+                in_flight: deque[Future] = deque()
+                for images in iter_batches(pending_images(), batch):
+                    in_flight.append(executor.submit(_predict_worker, images))
+                    if len(in_flight) >= 2 * workers:
+                        write(in_flight.popleft().result())
+                while in_flight:
+                    write(in_flight.popleft().result())
+    finally:
+        review_path.write_text(''.join(f'{image}\n' for image in sorted(review)))
+        tasks: int = merge_tasks(predictions_path, dataset_dir.path / 'predictions.json')
+    summary['elapsed'] = monotonic() - start
+    my_logger.debug(
+        f'{summary["labeled"] + summary["empty"]} images of "{images_path}" auto-labeled in '
+        f'{summary["elapsed"]:.1f} s: {summary["boxes"]} boxes, {summary["review"]} to review, '
+        f'{tasks} tasks in predictions.json.',
+        Styles.SUCCEED
+    )
+    return summary
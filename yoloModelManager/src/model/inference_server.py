@@ -0,0 +1,490 @@
+import json
+import struct
+from concurrent.futures import Future
+from http.client import HTTPConnection, HTTPResponse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from queue import Empty, Full, Queue
+from socket import AF_UNIX, SOCK_STREAM, socket
+from socketserver import ThreadingMixIn, UnixStreamServer
+from threading import Lock, Thread
+from time import monotonic
+from typing import Any, Optional, TypedDict
+from urllib.parse import parse_qs, urlparse
+
+import cv2
+import numpy as np
+
+from ..utils.config import MY_CFG, my_logger
+from ..utils.profiling import LatencyHistogram
+from .model_manager import ModelManager
+from .results import MyBoxes, MyResults
+
+BINARY_MAGIC: bytes = b'YMB1'
+BINARY_HEADER = struct.Struct('<4sIII')
+BOXES_COLUMNS: int = 6
+
+
+class PredictionDict(TypedDict):
+    model: str
+    names: dict[int, str]
+    valid_boxes: np.ndarray
+    completed_boxes: np.ndarray
+    queue_ms: float
+    batch_size: int
+
+
+class BatcherStatsDict(TypedDict):
+    model: str
+    requests: int
+    rejected: int
+    failed: int
+    batches: int
+    mean_batch_size: float
+    batch_sizes: dict[int, int]
+    pending: int
+    queue_ms: dict[str, float]
+    batch_ms: dict[str, float]
+
+
+class _InferenceRequest(TypedDict):
+    image: np.ndarray
+    future: Future
+    queued_at: float
+
+
+def boxes_to_array(boxes: Optional[MyBoxes]) -> np.ndarray:
+    if boxes is None or len(boxes) == 0:
+        return np.zeros((0, BOXES_COLUMNS), dtype= np.float32)
+    data: Any = boxes.data
+    if hasattr(data, 'cpu'):
+        data = data.cpu().numpy()
+    data = np.asarray(data, dtype= np.float32)
+    return np.concatenate((data[:, :4], data[:, -2:]), axis= 1)
+
+
+def encode_prediction_json(prediction: PredictionDict) -> bytes:
+    return json.dumps({
+        'model': prediction['model'],
+        'names': prediction['names'],
+        'valid_boxes': np.round(prediction['valid_boxes'], 3).tolist(),
+        'completed_boxes': np.round(prediction['completed_boxes'], 3).tolist(),
+        'queue_ms': round(prediction['queue_ms'], 3),
+        'batch_size': prediction['batch_size']
+    }, separators= (',', ':')).encode()
+
+
+def encode_prediction_binary(prediction: PredictionDict) -> bytes:
+    valid_boxes: np.ndarray = prediction['valid_boxes'].astype('<f4')
+    completed_boxes: np.ndarray = prediction['completed_boxes'].astype('<f4')
+    return (
+        BINARY_HEADER.pack(
+            BINARY_MAGIC,
+            len(valid_boxes),
+            len(completed_boxes),
+            BOXES_COLUMNS
+        )
+        + valid_boxes.tobytes()
+        + completed_boxes.tobytes()
+    )
+
+
+def decode_prediction_binary(data: bytes) -> tuple[np.ndarray, np.ndarray]:
+    magic, n_valid, n_completed, n_columns = BINARY_HEADER.unpack_from(data)
+    if magic != BINARY_MAGIC:
+        msg: str = 'Binary prediction payload not valid.'
+        my_logger.error(f'ValueError: {msg}')
+        raise ValueError(msg)
+    boxes: np.ndarray = np.frombuffer(
+        data,
+        dtype= '<f4',
+        offset= BINARY_HEADER.size
+    ).reshape(-1, n_columns)
+    return boxes[:n_valid], boxes[n_valid:n_valid + n_completed]
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        model: ModelManager,
+        max_batch: int = MY_CFG.server.max_batch,
+        max_wait: float = MY_CFG.server.max_wait_ms / 1000,
+        queue_size: int = MY_CFG.server.queue_size
+    ) -> None:
+        self.model: ModelManager = model
+        self.max_batch: int = max(1, max_batch)
+        self.max_wait: float = max(0.0, max_wait)
+        self._queue: Queue[Optional[_InferenceRequest]] = Queue(maxsize= max(1, queue_size))
+        self._thread: Optional[Thread] = None
+        self._stats_lock = Lock()
+        self._queue_hist = LatencyHistogram()
+        self._batch_hist = LatencyHistogram()
+        self.batch_sizes: dict[int, int] = {}
+        self.requests: int = 0
+        self.rejected: int = 0
+        self.failed: int = 0
+        self.batches: int = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+        self._thread = Thread(
+            target= self._worker,
+            name= f'MicroBatcher-{self.model.name}',
+            daemon= True
+        )
+        self._thread.start()
+
+    def submit(self, image: np.ndarray) -> Future:
+        self.start()
+        future: Future = Future()
+        try:
+            self._queue.put_nowait({
+                'image': image,
+                'future': future,
+                'queued_at': monotonic()
+            })
+        except Full:
+            with self._stats_lock:
+                self.rejected += 1
+            msg: str = f'Inference queue of "{self.model.name}" is full.'
+            my_logger.warning(msg)
+            future.set_exception(RuntimeError(msg))
+            return future
+        with self._stats_lock:
+            self.requests += 1
+        return future
+
+    def predict(
+        self,
+        image: np.ndarray,
+        timeout: Optional[float] = None
+    ) -> PredictionDict:
+        return self.submit(image).result(timeout)
+
+    def _collect_batch(self) -> Optional[list[_InferenceRequest]]:
+        first: Optional[_InferenceRequest] = self._queue.get()
+        if first is None:
+            return None
+        batch: list[_InferenceRequest] = [first]
+        deadline: float = monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining: float = deadline - monotonic()
+            try:
+                request: Optional[_InferenceRequest] = (
+                    self._queue.get(timeout= remaining) if remaining > 0
+                    else self._queue.get_nowait()
+                )
+            except Empty:
+                break
+            if request is None:
+                self._queue.put(None)
+                break
+            batch.append(request)
+        return batch
+
+    def _worker(self) -> None:
+        while True:
+            batch: Optional[list[_InferenceRequest]] = self._collect_batch()
+            if batch is None:
+                return
+            start: float = monotonic()
+            try:
+                results: list[MyResults] = self.model.predict_batch(
+                    [request['image'] for request in batch]
+                )
+            except Exception as e:
+                with self._stats_lock:
+                    self.failed += len(batch)
+                my_logger.error(f'Inference of "{self.model.name}" failed: {e}')
+                for request in batch:
+                    request['future'].set_exception(e)
+                continue
+            end: float = monotonic()
+            with self._stats_lock:
+                self.batches += 1
+                self.batch_sizes[len(batch)] = self.batch_sizes.get(len(batch), 0) + 1
+                self._batch_hist.record(int((end - start) * 1e9))
+                for request in batch:
+                    self._queue_hist.record(int((start - request['queued_at']) * 1e9))
+            for request, result in zip(batch, results):
+                request['future'].set_result(PredictionDict(
+                    model= self.model.name,
+                    names= dict(result.names),
+                    valid_boxes= boxes_to_array(result.valid_boxes),
+                    completed_boxes= boxes_to_array(result.completed_boxes),
+                    queue_ms= (start - request['queued_at']) * 1000,
+                    batch_size= len(batch)
+                ))
+
+    def stats(self) -> BatcherStatsDict:
+        with self._stats_lock:
+            return {
+                'model': self.model.name,
+                'requests': self.requests,
+                'rejected': self.rejected,
+                'failed': self.failed,
+                'batches': self.batches,
+                'mean_batch_size': sum(size * n for size, n in self.batch_sizes.items()) / max(self.batches, 1),
+                'batch_sizes': dict(sorted(self.batch_sizes.items())),
+                'pending': self._queue.qsize(),
+                'queue_ms': {
+                    f'p{p}': self._queue_hist.percentile(p)
+                    for p in (50, 95, 99)
+                },
+                'batch_ms': {
+                    f'p{p}': self._batch_hist.percentile(p)
+                    for p in (50, 95, 99)
+                }
+            }
+
+    def stop(self) -> None:
+        if not self.is_running:
+            return
+        self._queue.put(None)
+        self._thread.join() # type: ignore
+        self._thread = None
+
+
+class _InferenceRequestHandler(BaseHTTPRequestHandler):
+    server_version: str = 'YoloModelManager'
+    batchers: dict[str, MicroBatcher] = {}
+    request_timeout: float = 30.0
+
+    def address_string(self) -> str:
+        if isinstance(self.client_address, tuple) and len(self.client_address) > 0:
+            return str(self.client_address[0])
+        return 'unix'
+
+    def log_message(self, format: str, *args) -> None:
+        my_logger.debug(f'Inference server request: {format % args}')
+
+    def _send(
+        self,
+        code: int,
+        body: bytes,
+        content_type: str = 'application/json'
+    ) -> None:
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, code: int, msg: str) -> None:
+        self._send(code, json.dumps({'error': msg}).encode())
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        if url.path == '/stats':
+            stats: list[BatcherStatsDict] = [
+                batcher.stats()
+                for batcher in self.batchers.values()
+            ]
+            self._send(200, json.dumps(stats).encode())
+        elif url.path == '/models':
+            self._send(200, json.dumps(list(self.batchers.keys())).encode())
+        else:
+            self._send_error(404, f'"{url.path}" not found.')
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        parts: list[str] = url.path.strip('/').split('/')
+        if len(parts) == 0 or parts[0] != 'predict':
+            self._send_error(404, f'"{url.path}" not found.')
+            return
+        model_name: str = parts[1] if len(parts) > 1 else next(iter(self.batchers))
+        if model_name not in self.batchers:
+            self._send_error(404, f'Model "{model_name}" not served.')
+            return
+        length: int = int(self.headers.get('Content-Length', 0))
+        data: bytes = self.rfile.read(length)
+        image: Optional[np.ndarray] = cv2.imdecode(
+            np.frombuffer(data, dtype= np.uint8),
+            cv2.IMREAD_COLOR
+        )
+        if image is None:
+            self._send_error(400, 'Request body is not a valid image.')
+            return
+        try:
+            prediction: PredictionDict = self.batchers[model_name].predict(
+                image,
+                self.request_timeout
+            )
+        except Exception as e:
+            self._send_error(503, str(e))
+            return
+        output_format: str = parse_qs(url.query).get('format', ['json'])[0]
+        if output_format == 'binary':
+            self._send(200, encode_prediction_binary(prediction), 'application/octet-stream')
+        else:
+            self._send(200, encode_prediction_json(prediction))
+
+
+class ThreadingUnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads: bool = True
+
+
+class InferenceServer:
+    def __init__(
+        self,
+        models: list[ModelManager],
+        host: str = MY_CFG.server.host,
+        port: int = MY_CFG.server.port,
+        socket_path: Optional[Path] = None,
+        max_batch: int = MY_CFG.server.max_batch,
+        max_wait: float = MY_CFG.server.max_wait_ms / 1000,
+        queue_size: int = MY_CFG.server.queue_size
+    ) -> None:
+        if len(models) == 0:
+            msg: str = 'At least one model is needed.'
+            my_logger.error(f'ValueError: {msg}')
+            raise ValueError(msg)
+        self.batchers: dict[str, MicroBatcher] = {
+            model.name: MicroBatcher(model, max_batch, max_wait, queue_size)
+            for model in models
+        }
+        self.host: str = host
+        self.port: int = port
+        self.socket_path: Optional[Path] = socket_path
+        self._server: Optional[ThreadingHTTPServer | ThreadingUnixHTTPServer] = None
+
+    @property
+    def address(self) -> str:
+        if self.socket_path is not None:
+            return f'unix:{self.socket_path}'
+        return f'http://{self.host}:{self.port}'
+
+    def stats(self) -> list[BatcherStatsDict]:
+        return [batcher.stats() for batcher in self.batchers.values()]
+
+    def _create_server(self) -> ThreadingHTTPServer | ThreadingUnixHTTPServer:
+        handler = type(
+            '_ModelsRequestHandler',
+            (_InferenceRequestHandler,),
+            {'batchers': self.batchers}
+        )
+        if self.socket_path is None:
+            server = ThreadingHTTPServer((self.host, self.port), handler)
+            server.daemon_threads = True
+            self.port = server.server_address[1]
+            return server
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+        return ThreadingUnixHTTPServer(str(self.socket_path), handler)
+
+    def start(self) -> None:
+        for batcher in self.batchers.values():
+            batcher.start()
+        self._server = self._create_server()
+        Thread(
+            target= self._server.serve_forever,
+            name= 'InferenceServer',
+            daemon= True
+        ).start()
+        my_logger.info(f'Serving {list(self.batchers.keys())} at {self.address}.')
+
+    def serve_forever(self) -> None:
+        for batcher in self.batchers.values():
+            batcher.start()
+        self._server = self._create_server()
+        my_logger.info(f'Serving {list(self.batchers.keys())} at {self.address}.')
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self.socket_path is not None and self.socket_path.exists():
+            self.socket_path.unlink()
+        for batcher in self.batchers.values():
+            batcher.stop()
+        my_logger.info(f'Inference server stopped: {self.stats()}')
+
+
+class _UnixHTTPConnection(HTTPConnection):
+    def __init__(self, socket_path: Path, timeout: float) -> None:
+        super().__init__('localhost', timeout= timeout)
+        self.socket_path: Path = socket_path
+
+    def connect(self) -> None:
+        self.sock = socket(AF_UNIX, SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(str(self.socket_path))
+
+
+class InferenceClient:
+    def __init__(
+        self,
+        host: str = MY_CFG.server.host,
+        port: int = MY_CFG.server.port,
+        socket_path: Optional[Path] = None,
+        timeout: float = 30.0,
+        image_format: str = 'jpg'
+    ) -> None:
+        self.host: str = host
+        self.port: int = port
+        self.socket_path: Optional[Path] = socket_path
+        self.timeout: float = timeout
+        self.image_format: str = image_format
+
+    def _connection(self) -> HTTPConnection:
+        if self.socket_path is not None:
+            return _UnixHTTPConnection(self.socket_path, self.timeout)
+        return HTTPConnection(self.host, self.port, timeout= self.timeout)
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        body: Optional[bytes] = None
+    ) -> bytes:
+        connection: HTTPConnection = self._connection()
+        try:
+            connection.request(method, path, body)
+            response: HTTPResponse = connection.getresponse()
+            data: bytes = response.read()
+        finally:
+            connection.close()
+        if response.status != 200:
+            msg: str = f'Inference server error {response.status}: {data.decode(errors= "replace")}'
+            my_logger.error(f'RuntimeError: {msg}')
+            raise RuntimeError(msg)
+        return data
+
+    def predict(
+        self,
+        image: np.ndarray,
+        model_name: str = '',
+        binary: bool = False
+    ) -> dict[str, Any]:
+        ok, encoded = cv2.imencode(f'.{self.image_format}', image)
+        if not ok:
+            msg: str = 'Image can\'t be encoded.'
+            my_logger.error(f'ValueError: {msg}')
+            raise ValueError(msg)
+        path: str = f'/predict/{model_name}' if model_name else '/predict'
+        if binary:
+            data: bytes = self._request('POST', f'{path}?format=binary', encoded.tobytes())
+            valid_boxes, completed_boxes = decode_prediction_binary(data)
+            return {
+                'valid_boxes': valid_boxes,
+                'completed_boxes': completed_boxes
+            }
+        prediction: dict[str, Any] = json.loads(self._request('POST', path, encoded.tobytes()))
+        for key in ('valid_boxes', 'completed_boxes'):
+            prediction[key] = np.array(prediction[key], dtype= np.float32).reshape(-1, BOXES_COLUMNS)
+        return prediction
+
+    def stats(self) -> list[BatcherStatsDict]:
+        return json.loads(self._request('GET', '/stats'))
@@ -1,23 +1,27 @@
-import logging
 from datetime import datetime, timezone
-from os import getcwd
 from pathlib import Path
-from shutil import copy2
-from typing import Any, Callable
+from typing import Any, Callable, Optional
 
 import numpy as np
 import yaml
 from pyUtils import Styles
 from ultralytics import YOLO
+from ultralytics.engine.results import Results
 
 from ..filesystem import TrainingDatasetDirManager
 from ..image import ImageProcessing
-from ..utils.config import MODELS_PATH, ULTRALYTICS_LOGGING_LVL, my_logger
+from ..utils.config import MODELS_PATH, MY_CFG, my_logger
 from ..utils.data_types import ModelMetadataDict
-from .results import ResultTracker
+from ..utils.metrics import METRICS
+from ..utils.profiling import PROFILER
+from .results import MyResults, ResultTracker
+from .training_job import (JOB_FILE_NAME, TrainingJob, TrainingJobStates,
+                           TrainingProgressDict)
 
 
 class ModelManager:
+    NCNN_MAX_BATCH: int = 1
+
     def __init__(self, name: str) -> None:
         self.name = name
 
@@ -166,15 +170,53 @@ class ModelManager:
 
     def process_frame(self, frame: np.ndarray) -> np.ndarray:
         frames: list[np.ndarray] = [frame]
-        for filter in self.filters:
-            frames.append(filter(frames[-1]))
-        self.result_tracker.add_new_result(self.model(frames[-1])[0])
-        frames.append(self.result_tracker.plot())
+        with PROFILER.stage('filters'):
+            for filter in self.filters:
+                frames.append(filter(frames[-1]))
+        with PROFILER.stage('inference'):
+            result: Results = self.model(frames[-1])[0]
+        with PROFILER.stage('postprocess'):
+            self.result_tracker.add_new_result(MyResults(result))
+        with PROFILER.stage('plot'):
+            frames.append(self.result_tracker.plot())
+        METRICS.inc('frames_processed_total', model= self.name)
         self.last_input_img: np.ndarray = frame
         self.last_processed_img: np.ndarray = frames[-2]
         self.last_result_img: np.ndarray = frames[-1]
         return frames[-1]
 
+    def predict_batch(
+        self,
+        frames: list[np.ndarray]
+    ) -> list[MyResults]:
+        filters: list[Callable[..., Any]] = self.filters
+        inputs: list[np.ndarray] = []
+        with PROFILER.stage('filters'):
+            for frame in frames:
+                for filter in filters:
+                    frame = filter(frame)
+                inputs.append(frame)
+        results: list[MyResults] = []
+        for i in range(0, len(inputs), self.NCNN_MAX_BATCH):
+            with PROFILER.stage('inference'):
+                raw_results: list[Results] = self.model(inputs[i:i+self.NCNN_MAX_BATCH], verbose= False)
+            with PROFILER.stage('postprocess'):
+                results.extend(MyResults(result) for result in raw_results)
+        return results
+
+    def process_frames(
+        self,
+        frames: list[np.ndarray],
+        result_trackers: list[ResultTracker]
+    ) -> list[np.ndarray]:
+        results_imgs: list[np.ndarray] = []
+        METRICS.inc('frames_processed_total', len(frames), model= self.name)
+        for result_tracker, result in zip(result_trackers, self.predict_batch(frames)):
+            result_tracker.add_new_result(result)
+            with PROFILER.stage('plot'):
+                results_imgs.append(result_tracker.plot())
+        return results_imgs
+
     def get_last_result_image(self, source: bool = True) -> np.ndarray:
         if source:
             return ImageProcessing.get_images_grid(
@@ -187,7 +229,12 @@ class ModelManager:
         dataset: TrainingDatasetDirManager,
         new_name: str,
         epochs: int = 60,
-    ) -> None:
+        cache: bool = MY_CFG.training_cache.enabled,
+        background: bool = False,
+        imgsz: Optional[int] = None,
+        threads: Optional[int] = None,
+        callback: Optional[Callable[[TrainingProgressDict], None]] = None
+    ) -> TrainingJob:
         if any([
             dataset.metadata['camera_width'] != self.metadata['camera_width'],
             dataset.metadata['camera_height'] != self.metadata['camera_height'],
@@ -197,40 +244,50 @@ class ModelManager:
             my_logger.error(f'ValueError: {msg}')
             raise ValueError(msg)
         new_model_path: Path = MODELS_PATH / new_name
-        if new_model_path.is_dir():
-            my_logger.warning(f'The model already exists. {new_name}.pt won\'t be overwritten. metadata.yaml will be overwrite.')
-        model = YOLO(self.pt_model_path)
-        cwd: Path = Path(getcwd())
+        job: Optional[TrainingJob] = TrainingJob(new_name) if (new_model_path / JOB_FILE_NAME).is_file() else None
+        if job is not None and job.is_running():
+            my_logger.warning(f'Training job "{new_name}" is already running. It won\'t be started again.')
+        elif job is not None and job.is_resumable():
+            my_logger.info(f'Training job "{new_name}" resumed from "{job.last_path}".')
+            job.resume(threads= threads)
+        else:
+            if new_model_path.is_dir():
+                my_logger.warning(f'The model already exists. {new_name}.pt won\'t be overwritten. metadata.yaml will be overwrite.')
+            if imgsz is None:
+                imgsz = dataset.metadata['camera_width']
+            data_path: Path = dataset.data_yaml_file_path
+            if cache:
+                data_path = dataset.build_training_cache(
+                    self.metadata['filters'],
+                    imgsz
+                )
+            data: ModelMetadataDict = {
+                **dataset.metadata,
+                'train_images': dataset.get_n_train(),
+                'val_images': dataset.get_n_val(),
+                'test_images': dataset.get_n_test(),
+                'task': dataset.data['task'],
+                'name': dataset.data['name']
+            }
+            job = TrainingJob.create(
+                name= new_name,
+                base_model_path= self.pt_model_path,
+                data_path= data_path,
+                epochs= epochs,
+                imgsz= imgsz,
+                metadata= data
+            )
+            job.start(threads= threads)
+        if background:
+            return job
         start_time: datetime = datetime.now(timezone.utc)
-        logging.getLogger('ultralytics').setLevel(my_logger._logger.level)
-        model.train(
-            data= dataset.data_yaml_file_path,
-            epochs= epochs,
-            imgsz= dataset.metadata['camera_width'],
-            project= new_model_path,
-            batch= -1,
-            verbose= True
-        )
-        logging.getLogger('ultralytics').setLevel(ULTRALYTICS_LOGGING_LVL)
+        progress: TrainingProgressDict = job.wait(callback)
+        if progress['state'] != TrainingJobStates.FINISHED.value:
+            msg: str = f'Training for "{new_name}" {progress["state"]}: {progress["error"]}. See "{job.log_path}".'
+            my_logger.error(f'RuntimeError: {msg}')
+            raise RuntimeError(msg)
         my_logger.debug(
             f'Training for "{new_name}" finished in {datetime.now(timezone.utc) - start_time}.',
             Styles.SUCCEED
         )
-        data: ModelMetadataDict = {
-            **dataset.metadata,
-            'train_images': dataset.get_n_train(),
-            'val_images': dataset.get_n_val(),
-            'test_images': dataset.get_n_test(),
-            'task': dataset.data['task'],
-            'name': dataset.data['name']
-        }
-        with open((new_model_path / 'metadata.yaml'), 'w') as f:
-            yaml.dump(data, f, sort_keys= False)
-        copy2(
-            (new_model_path / 'train' / 'weights' / 'best.pt'),
-            (new_model_path / f'{new_name}.pt')
-        )
-        try:
-            (cwd / 'yolo11n.pt').unlink()
-        except FileNotFoundError:
-            pass
+        return job
@@ -14,6 +14,7 @@ from ..utils.config import (RESULT_BORDER_THICKNESS, RESULT_BOX_MARGIN,
                             RESULT_CENTER_THICKNESS, RESULT_FONT_SCALE,
                             RESULT_TEXT_THICKNESS, RESULT_X_TOLERANCE,
                             RESULT_Y_TOLERANCE)
+from ..utils.metrics import METRICS
 
 
 class Point(tuple):
@@ -326,8 +327,19 @@ class ResultTracker:
     def __init__(self) -> None:
         self.results_hist: list[MyResults] = []
 
+    @property
+    def last_result(self) -> Optional[MyResults]:
+        if len(self.results_hist) == 0:
+            return None
+        return self.results_hist[-1]
+
     def add_new_result(self, new_result: Results) -> None:
-        self.results_hist.append(MyResults(new_result))
+        if not isinstance(new_result, MyResults):
+            new_result = MyResults(new_result)
+        if METRICS.enabled and new_result.valid_boxes is not None:
+            for box in new_result.valid_boxes.boxes:
+                METRICS.inc('detections_total', object_class= new_result.names.get(box.object_n, box.object_n))
+        self.results_hist.append(new_result)
         if len(self.results_hist) > self.MAX_RESULTS:
             self.results_hist.pop(0)
 
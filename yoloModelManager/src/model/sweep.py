@@ -0,0 +1,196 @@
+import csv
+from collections import deque
+from itertools import product
+from os import cpu_count
+from pathlib import Path
+from random import Random
+from time import perf_counter_ns, sleep
+from typing import Callable, Optional, TypedDict
+
+import numpy as np
+from psutil import virtual_memory
+from pyUtils import Styles
+
+from ..filesystem import TrainingDatasetDirManager
+from ..utils.config import MODELS_PATH, MY_CFG, my_logger
+from ..utils.profiling import LatencyHistogram
+from .model_manager import ModelManager
+from .training_job import JOB_FILE_NAME, TrainingJob, TrainingJobStates
+
+MAP50_95_METRIC: str = 'metrics/mAP50-95(B)'
+MAP50_METRIC: str = 'metrics/mAP50(B)'
+
+
+class SweepConfigDict(TypedDict):
+    name: str
+    base_model: str
+    imgsz: int
+    epochs: int
+
+
+class SweepResultDict(SweepConfigDict):
+    state: str
+    map50_95: Optional[float]
+    map50: Optional[float]
+    latency_p50_ms: Optional[float]
+    latency_p95_ms: Optional[float]
+    pareto: bool
+
+
+def get_sweep_configs(
+    prefix: str,
+    base_models: list[str],
+    imgszs: list[int],
+    epochs: list[int],
+    samples: int = MY_CFG.sweep.samples,
+    seed: int = MY_CFG.sweep.seed
+) -> list[SweepConfigDict]:
+    grid: list[tuple[str, int, int]] = list(dict.fromkeys(product(base_models, imgszs, epochs)))
+    if 0 < samples < len(grid):
+        grid = Random(seed).sample(grid, samples)
+    return [
+        {
+            'name': f'{prefix}_{base_model}_{imgsz}_{n_epochs}e',
+            'base_model': base_model,
+            'imgsz': imgsz,
+            'epochs': n_epochs
+        }
+        for base_model, imgsz, n_epochs in grid
+    ]
+
+def get_max_concurrent_jobs(
+    cores_per_job: int = MY_CFG.sweep.cores_per_job,
+    memory_per_job: float = MY_CFG.sweep.memory_per_job,
+    cores: Optional[int] = None
+) -> int:
+    if cores is None:
+        cores = cpu_count() or 1
+    available_gb: float = virtual_memory().available / 1e9
+    return max(1, min(cores // max(1, cores_per_job), int(available_gb // memory_per_job)))
+
+def profile_latency(
+    model: ModelManager,
+    runs: int = MY_CFG.sweep.latency_runs,
+    warmup: int = 5
+) -> LatencyHistogram:
+    frame: np.ndarray = np.random.default_rng(0).integers(
+        0,
+        256,
+        (model.camera_height, model.camera_width, 3),
+        dtype= np.uint8
+    )
+    for _ in range(warmup):
+        model.predict_batch([frame])
+    histogram: LatencyHistogram = LatencyHistogram()
+    for _ in range(runs):
+        start: int = perf_counter_ns()
+        model.predict_batch([frame])
+        histogram.record(perf_counter_ns() - start)
+    return histogram
+
+def mark_pareto(results: list[SweepResultDict]) -> None:
+    best_map: float = -1.0
+    for result in sorted(
+        (result for result in results if result['map50_95'] is not None and result['latency_p50_ms'] is not None),
+        key= lambda result: (result['latency_p50_ms'], -result['map50_95']) # type: ignore
+    ):
+        if result['map50_95'] > best_map: # type: ignore
+            best_map = result['map50_95'] # type: ignore
+            result['pareto'] = True
+
+def save_sweep_results(results: list[SweepResultDict], path: Path) -> None:
+    with open(path, 'w', newline= '') as f:
+        writer: csv.DictWriter = csv.DictWriter(f, fieldnames= list(SweepResultDict.__annotations__))
+        writer.writeheader()
+        writer.writerows(results)
+
+def sweep_models(
+    dataset: TrainingDatasetDirManager,
+    configs: list[SweepConfigDict],
+    cores_per_job: int = MY_CFG.sweep.cores_per_job,
+    memory_per_job: float = MY_CFG.sweep.memory_per_job,
+    cores: Optional[int] = None,
+    cache: bool = MY_CFG.training_cache.enabled,
+    latency_runs: int = MY_CFG.sweep.latency_runs,
+    poll_interval: float = MY_CFG.training_job.poll_interval,
+    progress: Optional[Callable[[int, int, int], None]] = None
+) -> list[SweepResultDict]:
+    base_models: dict[str, ModelManager] = {
+        base_model: ModelManager(base_model)
+        for base_model in {config['base_model'] for config in configs}
+    }
+    for name, base_model in base_models.items():
+        if any([
+            dataset.metadata['camera_width'] != base_model.metadata['camera_width'],
+            dataset.metadata['camera_height'] != base_model.metadata['camera_height'],
+            dataset.metadata['filters'] != base_model.metadata['filters']
+        ]):
+            msg: str = f'Base model "{name}" and dataset must have the same image size and filters.'
+            my_logger.error(f'ValueError: {msg}')
+            raise ValueError(msg)
+    max_jobs: int = get_max_concurrent_jobs(cores_per_job, memory_per_job, cores)
+    my_logger.info(f'Sweep of {len(configs)} configurations with up to {max_jobs} concurrent jobs of {cores_per_job} cores.')
+    states: dict[str, str] = {}
+    pending: deque[SweepConfigDict] = deque()
+    existing: set[str] = set()
+    for config in configs:
+        if (MODELS_PATH / config['name'] / JOB_FILE_NAME).is_file():
+            if TrainingJob(config['name']).state == TrainingJobStates.FINISHED:
+                states[config['name']] = TrainingJobStates.FINISHED.value
+                my_logger.info(f'"{config["name"]}" already trained. It won\'t be trained again.')
+                continue
+            existing.add(config['name'])
+        pending.append(config)
+    running: dict[str, TrainingJob] = {}
+    while pending or running:
+        while pending and len(running) < max_jobs:
+            config: SweepConfigDict = pending.popleft()
+            if config['name'] in existing:
+                job: TrainingJob = TrainingJob(config['name'])
+                if not job.is_running():
+                    my_logger.info(f'Training job "{config["name"]}" {job.state.value}. It will be resumed.')
+                    job.resume(threads= cores_per_job)
+                running[config['name']] = job
+                continue
+            running[config['name']] = base_models[config['base_model']].train(
+                dataset= dataset,
+                new_name= config['name'],
+                epochs= config['epochs'],
+                cache= cache,
+                background= True,
+                imgsz= config['imgsz'],
+                threads= cores_per_job
+            )
+        sleep(poll_interval)
+        for name, job in list(running.items()):
+            if not job.is_running():
+                states[name] = job.state.value
+                del running[name]
+                my_logger.info(f'Training job "{name}" {states[name]}.')
+        if progress is not None:
+            progress(len(states), len(running), len(pending))
+    results: list[SweepResultDict] = []
+    for config in configs:
+        result: SweepResultDict = {
+            **config,
+            'state': states[config['name']],
+            'map50_95': None,
+            'map50': None,
+            'latency_p50_ms': None,
+            'latency_p95_ms': None,
+            'pareto': False
+        }
+        if result['state'] == TrainingJobStates.FINISHED.value:
+            metrics: dict[str, float] = TrainingJob(config['name']).progress['metrics']
+            result['map50_95'] = metrics.get(MAP50_95_METRIC)
+            result['map50'] = metrics.get(MAP50_METRIC)
+            histogram: LatencyHistogram = profile_latency(ModelManager(config['name']), latency_runs)
+            result['latency_p50_ms'] = histogram.percentile(50)
+            result['latency_p95_ms'] = histogram.percentile(95)
+        results.append(result)
+    mark_pareto(results)
+    my_logger.debug(
+        f'Sweep finished: {sum(result["pareto"] for result in results)} Pareto-optimal models of {len(results)}.',
+        Styles.SUCCEED
+    )
+    return results
@@ -0,0 +1,380 @@
+import json
+import logging
+import signal
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from os import environ, getpid, kill, replace
+from pathlib import Path
+from shutil import copy2
+from time import monotonic, sleep
+from typing import Any, Callable, Optional, TypedDict
+
+import yaml
+from pyUtils import Styles
+
+from ..utils.config import MODELS_PATH, MY_CFG, ULTRALYTICS_LOGGING_LVL, my_logger
+from ..utils.data_types import ModelMetadataDict
+
+JOB_FILE_NAME: str = 'job.yaml'
+PROGRESS_FILE_NAME: str = 'progress.json'
+CANCEL_FILE_NAME: str = 'cancel'
+LOG_FILE_NAME: str = 'train.log'
+
+
+class TrainingJobStates(Enum):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FINISHED = 'finished'
+    CANCELLED = 'cancelled'
+    FAILED = 'failed'
+
+
+class TrainingJobDict(TypedDict):
+    name: str
+    base_model_path: str
+    data_path: str
+    epochs: int
+    imgsz: int
+    metadata: ModelMetadataDict
+
+
+class TrainingProgressDict(TypedDict):
+    state: str
+    pid: Optional[int]
+    epoch: int
+    epochs: int
+    losses: dict[str, float]
+    metrics: dict[str, float]
+    elapsed: float
+    eta: Optional[float]
+    error: Optional[str]
+    updated: str
+
+
+def write_progress(path: Path, progress: TrainingProgressDict) -> None:
+    progress['updated'] = datetime.now(timezone.utc).isoformat()
+    temp_path: Path = path.with_name(f'.{path.name}.tmp')
+    temp_path.write_text(json.dumps(progress))
+    replace(temp_path, path)
+
+def format_progress(progress: TrainingProgressDict) -> str:
+    text: str = f'{progress["state"]}: epoch {progress["epoch"]}/{progress["epochs"]}'
+    if len(progress['losses']) > 0:
+        text += ' | ' + ' '.join(f'{name} {value:.3f}' for name, value in progress['losses'].items())
+    if 'metrics/mAP50-95(B)' in progress['metrics']:
+        text += f' | mAP50-95 {progress["metrics"]["metrics/mAP50-95(B)"]:.3f}'
+    if progress['eta'] is not None:
+        text += f' | ETA {timedelta(seconds= round(progress["eta"]))}'
+    return text
+
+def get_threads_env(threads: Optional[int]) -> dict[str, str]:
+    if threads is None:
+        return {}
+    return {
+        variable: str(threads)
+        for variable in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS')
+    }
+
+def is_process_alive(pid: Optional[int]) -> bool:
+    if pid is None:
+        return False
+    try:
+        kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class TrainingJob:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @name.setter
+    def name(self, value: Any) -> None:
+        if not isinstance(value, str):
+            msg: str = f'"{self.__class__.__name__}.name" should be a str.'
+            my_logger.error(f'TypeError: {msg}')
+            raise TypeError(msg)
+        path: Path = MODELS_PATH / value
+        if not (path / JOB_FILE_NAME).is_file():
+            msg: str = f'"{path}" is not a training job directory. "{JOB_FILE_NAME}" does not exists.'
+            my_logger.error(f'FileNotFoundError: {msg}')
+            raise FileNotFoundError(msg)
+        self._name: str = value
+        self._path: Path = path
+        self._process: Optional[subprocess.Popen] = None
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def job_path(self) -> Path:
+        return self._path / JOB_FILE_NAME
+
+    @property
+    def progress_path(self) -> Path:
+        return self._path / PROGRESS_FILE_NAME
+
+    @property
+    def cancel_path(self) -> Path:
+        return self._path / CANCEL_FILE_NAME
+
+    @property
+    def log_path(self) -> Path:
+        return self._path / LOG_FILE_NAME
+
+    @property
+    def last_path(self) -> Path:
+        return self._path / 'train' / 'weights' / 'last.pt'
+
+    @property
+    def job(self) -> TrainingJobDict:
+        with open(self.job_path, 'r') as f:
+            job: TrainingJobDict = yaml.safe_load(f)
+        return job
+
+    @property
+    def progress(self) -> TrainingProgressDict:
+        try:
+            progress: TrainingProgressDict = json.loads(self.progress_path.read_text())
+        except (OSError, ValueError):
+            progress = {
+                'state': TrainingJobStates.PENDING.value,
+                'pid': None,
+                'epoch': 0,
+                'epochs': self.job['epochs'],
+                'losses': {},
+                'metrics': {},
+                'elapsed': 0.0,
+                'eta': None,
+                'error': None,
+                'updated': ''
+            }
+        if progress['state'] == TrainingJobStates.RUNNING.value and not self._is_alive(progress['pid']):
+            progress['state'] = TrainingJobStates.FAILED.value
+            progress['error'] = progress['error'] or 'The training process died.'
+        elif progress['state'] == TrainingJobStates.PENDING.value and progress['pid'] is not None \
+                and not self._is_alive(progress['pid']):
+            progress['state'] = TrainingJobStates.FAILED.value
+            progress['error'] = progress['error'] or f'The training process exited before starting. See "{self.log_path}".'
+        return progress
+
+    def _is_alive(self, pid: Optional[int]) -> bool:
+        if self._process is not None and (pid is None or self._process.pid == pid):
+            return self._process.poll() is None
+        return is_process_alive(pid)
+
+    @property
+    def state(self) -> TrainingJobStates:
+        return TrainingJobStates(self.progress['state'])
+
+    def is_running(self) -> bool:
+        progress: TrainingProgressDict = self.progress
+        return progress['state'] in (TrainingJobStates.PENDING.value, TrainingJobStates.RUNNING.value) \
+            and self._is_alive(progress['pid'])
+
+    def is_resumable(self) -> bool:
+        return self.state != TrainingJobStates.FINISHED and not self.is_running() and self.last_path.is_file()
+
+    @classmethod
+    def create(
+        cls,
+        name: str,
+        base_model_path: Path,
+        data_path: Path,
+        epochs: int,
+        imgsz: int,
+        metadata: ModelMetadataDict
+    ) -> 'TrainingJob':
+        path: Path = MODELS_PATH / name
+        path.mkdir(parents= True, exist_ok= True)
+        job: TrainingJobDict = {
+            'name': name,
+            'base_model_path': str(base_model_path),
+            'data_path': str(data_path),
+            'epochs': epochs,
+            'imgsz': imgsz,
+            'metadata': metadata
+        }
+        with open(path / JOB_FILE_NAME, 'w') as f:
+            yaml.dump(job, f, sort_keys= False)
+        (path / PROGRESS_FILE_NAME).unlink(missing_ok= True)
+        (path / CANCEL_FILE_NAME).unlink(missing_ok= True)
+        my_logger.debug(f'Training job "{name}" created in "{path}".', Styles.SUCCEED)
+        return cls(name)
+
+    def start(self, resume: bool = False, threads: Optional[int] = None) -> int:
+        if self.is_running():
+            msg: str = f'Training job "{self.name}" is already running.'
+            my_logger.error(f'RuntimeError: {msg}')
+            raise RuntimeError(msg)
+        self.cancel_path.unlink(missing_ok= True)
+        progress: TrainingProgressDict = self.progress
+        progress['state'] = TrainingJobStates.PENDING.value
+        progress['pid'] = None
+        progress['error'] = None
+        write_progress(self.progress_path, progress)
+        with open(self.log_path, 'a') as log_file:
+            self._process = subprocess.Popen(
+                [sys.executable, '-m', __name__, str(self.path), *(['--resume'] if resume else [])],
+                cwd= self.path,
+                stdin= subprocess.DEVNULL,
+                stdout= log_file,
+                stderr= subprocess.STDOUT,
+                start_new_session= True,
+                env= {**environ, **get_threads_env(threads)}
+            )
+        progress = self.progress
+        if progress['pid'] is None:
+            progress['pid'] = self._process.pid
+            write_progress(self.progress_path, progress)
+        my_logger.debug(
+            f'Training job "{self.name}" started with pid {self._process.pid}. Log: "{self.log_path}".',
+            Styles.SUCCEED
+        )
+        return self._process.pid
+
+    def resume(self, threads: Optional[int] = None) -> int:
+        if self.state == TrainingJobStates.FINISHED:
+            msg: str = f'Training job "{self.name}" already finished.'
+            my_logger.error(f'RuntimeError: {msg}')
+            raise RuntimeError(msg)
+        if not self.last_path.is_file():
+            my_logger.warning(f'"{self.last_path}" does not exists. Training job "{self.name}" starts from the base model.')
+        return self.start(resume= True, threads= threads)
+
+    def cancel(self, force: bool = False) -> None:
+        self.cancel_path.touch()
+        pid: Optional[int] = self.progress['pid']
+        if force and pid is not None and self.is_running():
+            kill(pid, signal.SIGTERM) # type: ignore
+        my_logger.debug(f'Training job "{self.name}" cancel requested{" (forced)" if force else ""}.')
+
+    def wait(
+        self,
+        callback: Optional[Callable[[TrainingProgressDict], None]] = None,
+        poll_interval: float = MY_CFG.training_job.poll_interval
+    ) -> TrainingProgressDict:
+        last_update: str = ''
+        while True:
+            progress: TrainingProgressDict = self.progress
+            if callback is not None and progress['updated'] != last_update:
+                last_update = progress['updated']
+                callback(progress)
+            if progress['state'] not in (TrainingJobStates.PENDING.value, TrainingJobStates.RUNNING.value):
+                return progress
+            if progress['state'] == TrainingJobStates.PENDING.value and self._process is not None \
+                    and self._process.poll() is not None:
+                progress['state'] = TrainingJobStates.FAILED.value
+                progress['error'] = f'The training process exited before starting. See "{self.log_path}".'
+                if callback is not None:
+                    callback(progress)
+                return progress
+            sleep(poll_interval)
+
+
+def finish_training(job_path: Path, job: TrainingJobDict) -> None:
+    data: ModelMetadataDict = job['metadata']
+    with open((job_path / 'metadata.yaml'), 'w') as f:
+        yaml.dump(data, f, sort_keys= False)
+    copy2(
+        (job_path / 'train' / 'weights' / 'best.pt'),
+        (job_path / f'{job["name"]}.pt')
+    )
+
+def run_training_job(job_path: Path, resume: bool = False) -> TrainingJobStates:
+    from ultralytics import YOLO
+
+    with open(job_path / JOB_FILE_NAME, 'r') as f:
+        job: TrainingJobDict = yaml.safe_load(f)
+    progress_path: Path = job_path / PROGRESS_FILE_NAME
+    cancel_path: Path = job_path / CANCEL_FILE_NAME
+    last_path: Path = job_path / 'train' / 'weights' / 'last.pt'
+    progress: TrainingProgressDict = {
+        'state': TrainingJobStates.RUNNING.value,
+        'pid': getpid(),
+        'epoch': 0,
+        'epochs': job['epochs'],
+        'losses': {},
+        'metrics': {},
+        'elapsed': 0.0,
+        'eta': None,
+        'error': None,
+        'updated': ''
+    }
+    write_progress(progress_path, progress)
+    start: float = monotonic()
+    start_epoch: list[int] = []
+
+    def on_train_epoch_end(trainer: Any) -> None:
+        if not start_epoch:
+            start_epoch.append(trainer.epoch)
+        losses = trainer.label_loss_items(trainer.tloss, prefix= 'train')
+        progress['epoch'] = trainer.epoch + 1
+        progress['epochs'] = trainer.epochs
+        progress['losses'] = {key.split('/')[-1]: float(value) for key, value in losses.items()}
+        progress['elapsed'] = monotonic() - start
+        done: int = trainer.epoch + 1 - start_epoch[0]
+        progress['eta'] = progress['elapsed'] / done * (trainer.epochs - trainer.epoch - 1)
+        if cancel_path.exists():
+            trainer.stop = True
+        write_progress(progress_path, progress)
+
+    def on_fit_epoch_end(trainer: Any) -> None:
+        progress['metrics'] = {key: float(value) for key, value in (trainer.metrics or {}).items()}
+        write_progress(progress_path, progress)
+
+    def on_sigterm(signum: int, frame: Any) -> None:
+        progress['state'] = TrainingJobStates.CANCELLED.value
+        progress['error'] = 'Terminated.'
+        write_progress(progress_path, progress)
+        sys.exit(1)
+
+    signal.signal(signal.SIGTERM, on_sigterm)
+    logging.getLogger('ultralytics').setLevel(ULTRALYTICS_LOGGING_LVL)
+    try:
+        resume = resume and last_path.is_file()
+        model = YOLO(last_path if resume else job['base_model_path'])
+        model.add_callback('on_train_epoch_end', on_train_epoch_end)
+        model.add_callback('on_fit_epoch_end', on_fit_epoch_end)
+        if resume:
+            model.train(resume= True)
+        else:
+            model.train(
+                data= job['data_path'],
+                epochs= job['epochs'],
+                imgsz= job['imgsz'],
+                project= job_path,
+                name= 'train',
+                exist_ok= True,
+                batch= -1,
+                verbose= True
+            )
+        if cancel_path.exists():
+            progress['state'] = TrainingJobStates.CANCELLED.value
+        else:
+            finish_training(job_path, job)
+            progress['state'] = TrainingJobStates.FINISHED.value
+            progress['eta'] = 0.0
+    except Exception as e:
+        progress['state'] = TrainingJobStates.FAILED.value
+        progress['error'] = f'{e.__class__.__name__}: {e}'
+        write_progress(progress_path, progress)
+        raise
+    progress['elapsed'] = monotonic() - start
+    write_progress(progress_path, progress)
+    (job_path / 'yolo11n.pt').unlink(missing_ok= True)
+    return TrainingJobStates(progress['state'])
+
+
+if __name__ == '__main__':
+    run_training_job(Path(sys.argv[1]), '--resume' in sys.argv[2:])
@@ -4,11 +4,15 @@ from typing import Callable, Optional
 
 import click
 
-from ..cameras import CameraManager, camera_manager_factory
+from ..cameras import (CameraManager, FrameSource, camera_manager_factory,
+                       frame_source_factory)
+from ..cameras.recorder import RecordModes
+from ..filesystem import IMAGE_FORMATS, ImageWriter, WriterPolicies
 from ..image import ImageProcessing
-from ..utils.config import (LOGGING_LVL, my_logger, save_yolo_manager_logs,
+from ..utils.config import (LOGGING_LVL, MY_CFG, my_logger, save_yolo_manager_logs,
                             set_yolo_manager_logging_level,
                             set_yolo_manager_logs_path)
+from ..utils.metrics import start_metrics_server
 
 
 @click.command()
@@ -19,6 +23,27 @@ from ..utils.config import (LOGGING_LVL, my_logger, save_yolo_manager_logs,
     type= click.IntRange(0),
     help= 'Id of the camera for opencv. Defaults to None for select.'
 )
+@click.option(
+    '--source',
+    '-S',
+    'source',
+    type= click.STRING,
+    help= 'Frame source instead of a camera: a video file, an images directory or "synthetic[:<W>x<H>][@<FPS>]".'
+)
+@click.option(
+    '--realtime',
+    'realtime',
+    is_flag= True,
+    default= False,
+    help= 'Replay video files at their own frame rate instead of full speed.'
+)
+@click.option(
+    '--loop',
+    'loop',
+    is_flag= True,
+    default= False,
+    help= 'Replay the video file or images directory in loop.'
+)
 @click.option(
     '--show-filter',
     '-f',
@@ -52,27 +77,131 @@ from ..utils.config import (LOGGING_LVL, my_logger, save_yolo_manager_logs,
     ),
     help= 'Path to save the file. If None try to import from environment variable "IMAGES_SAVE_PATH". Else set to app/images.'
 )
+@click.option(
+    '--image-format',
+    'image_format',
+    type= click.Choice(
+        IMAGE_FORMATS.keys(),
+        case_sensitive= False
+    ),
+    help= f'Format of the saved images. Defaults to "writer.format" in config.toml. Valid options: {list(IMAGE_FORMATS.keys())}'
+)
+@click.option(
+    '--quality',
+    '-q',
+    'quality',
+    type= click.IntRange(0, 100),
+    help= 'PNG compression level (0-9) or JPEG/WEBP quality (0-100) of the saved images.'
+)
+@click.option(
+    '--record',
+    '-r',
+    'record',
+    is_flag= True,
+    default= False,
+    help= 'Start recording frames as soon as the stream starts. Press "r" to start/stop recording.'
+)
+@click.option(
+    '--record-mode',
+    'record_mode',
+    type= click.Choice(
+        [mode.value for mode in RecordModes],
+        case_sensitive= False
+    ),
+    default= MY_CFG.recorder.mode,
+    help= 'Recording mode: at a target rate, every Nth frame or on scene change.'
+)
+@click.option(
+    '--record-rate',
+    'record_rate',
+    type= click.FloatRange(min= 0),
+    default= MY_CFG.recorder.rate,
+    help= 'Target frames per second for the "rate" recording mode. 0 records every frame.'
+)
+@click.option(
+    '--record-every',
+    'record_every',
+    type= click.IntRange(min= 1),
+    default= MY_CFG.recorder.every,
+    help= 'Record one of every N frames for the "every" recording mode.'
+)
+@click.option(
+    '--scene-threshold',
+    'scene_threshold',
+    type= click.FloatRange(min= 0),
+    default= MY_CFG.recorder.scene_threshold,
+    help= 'Mean grey level difference (0-255) to detect a scene change for the "scene" recording mode.'
+)
+@click.option(
+    '--chunk-size',
+    'chunk_size',
+    type= click.IntRange(min= 1),
+    default= MY_CFG.recorder.chunk_size,
+    help= 'Number of recorded images per chunk directory.'
+)
+@click.option(
+    '--metrics-port',
+    'metrics_port',
+    type= click.IntRange(0, 65535),
+    default= MY_CFG.metrics.port if MY_CFG.metrics.enabled else None,
+    help= 'Serve Prometheus metrics on localhost at this port. Defaults to "metrics.port" in config.toml if "metrics.enabled".'
+)
 def image_adquisition(
     camera: int,
+    source: Optional[str] = None,
+    realtime: bool = False,
+    loop: bool = False,
     show_filters_in: list[str] = [],
     save_filters_in: Optional[str] = None,
-    save_path: Optional[Path] = None
+    save_path: Optional[Path] = None,
+    image_format: Optional[str] = None,
+    quality: Optional[int] = None,
+    record: bool = False,
+    record_mode: str = MY_CFG.recorder.mode,
+    record_rate: float = MY_CFG.recorder.rate,
+    record_every: int = MY_CFG.recorder.every,
+    scene_threshold: float = MY_CFG.recorder.scene_threshold,
+    chunk_size: int = MY_CFG.recorder.chunk_size,
+    metrics_port: Optional[int] = None
 ) -> None:
     set_yolo_manager_logging_level(logging.WARNING)
     set_yolo_manager_logs_path('yoloModelManager.log')
     set_yolo_manager_logging_level(LOGGING_LVL)
     save_yolo_manager_logs(True)
-    my_logger.debug(f'Executed: image-adquisition -c {camera} -f {show_filters_in} -s {save_filters_in} -p {save_path}')
+    my_logger.debug(f'Executed: image-adquisition -c {camera} -S {source} -f {show_filters_in} -s {save_filters_in} -p {save_path} -r {record} --record-mode {record_mode}')
+    if metrics_port is not None:
+        start_metrics_server(metrics_port)
     show_filters: list[Callable] = [ImageProcessing.FILTERS[filter] for filter in show_filters_in]
     if save_filters_in is None:
         save_filters: Optional[list[Callable]] = None
     else:
         save_filters: Optional[list[Callable]] = [ImageProcessing.FILTERS[filter] for filter in save_filters_in]
-    camera_manager: CameraManager = camera_manager_factory(camera)
+    frame_source: Optional[FrameSource] = None
+    if source is not None:
+        frame_source = frame_source_factory(source, realtime, loop)
+    camera_manager: CameraManager = camera_manager_factory(camera, frame_source)
     camera_manager.show_filters = show_filters
     camera_manager.save_filters = save_filters
     camera_manager.save_dir_path = save_path
+    if image_format is not None or quality is not None:
+        camera_manager.image_writer = ImageWriter(
+            image_format= image_format or MY_CFG.writer.format,
+            quality= quality
+        )
     camera_manager.keys_callbacks = {
         32: (camera_manager.save_last_frame, {})
     }
+    camera_manager.enable_recording(
+        start= record,
+        mode= record_mode,
+        rate= record_rate,
+        every= record_every,
+        scene_threshold= scene_threshold,
+        chunk_size= chunk_size,
+        image_writer= ImageWriter(
+            image_format= image_format or MY_CFG.writer.format,
+            quality= quality,
+            policy= WriterPolicies.DROP_NEW
+        )
+    )
     camera_manager.video_stream()
@@ -1,14 +1,24 @@
 import logging
 from pathlib import Path
+from time import monotonic
+from typing import Optional
 
 import click
+import yaml
 
-from ..filesystem import TrainingDatasetDirManager
-from ..utils.config import (LOGGING_LVL, my_logger, save_yolo_manager_logs,
+from ..filesystem import (IMAGE_FORMATS, CompressionSummaryDict,
+                          DatasetDirManager, LabelsStatsDict,
+                          TrainingDatasetDirManager, TransferModes,
+                          TransferSummaryDict, ValidationIssueDict)
+from ..utils.config import (LOGGING_LVL, MY_CFG, my_logger, save_yolo_manager_logs,
                             set_yolo_manager_logging_level,
                             set_yolo_manager_logs_path)
 
 
+def print_progress(name: str, done: int, total: int) -> None:
+    print(f'\r{name}: {done}/{total}', end= '\n' if done == total else '', flush= True)
+
+
 @click.command()
 @click.option(
     '--data-source',
@@ -58,24 +68,377 @@ from ..utils.config import (LOGGING_LVL, my_logger, save_yolo_manager_logs,
     default= 0.1,
     help= '% of the images for test. Default to 0.1.'
 )
+@click.option(
+    '--link-mode',
+    '-l',
+    'link_mode',
+    type= click.Choice(
+        [mode.value for mode in TransferModes],
+        case_sensitive= False
+    ),
+    default= MY_CFG.transfer.mode,
+    help= 'How files are placed in the split: copy, hardlink, reflink or symlink. Falls back to copy when the filesystem does not support it.'
+)
+@click.option(
+    '--workers',
+    '-w',
+    'workers',
+    type= click.IntRange(min= 1),
+    default= MY_CFG.transfer.workers,
+    help= 'Number of parallel file transfers.'
+)
+@click.option(
+    '--resume/--no-resume',
+    'resume',
+    default= True,
+    help= 'Only add the images not split yet, keeping the existing assignments. Use --no-resume to transfer everything again.'
+)
+@click.option(
+    '--lists',
+    'lists',
+    is_flag= True,
+    default= False,
+    help= 'Only write train.txt, val.txt and test.txt listing the source images in place instead of copying them.'
+)
+@click.option(
+    '--seed',
+    '-s',
+    'seed',
+    type= click.INT,
+    help= 'Salt of the hash that assigns each image to a split. The same seed and ratios always give the same split.'
+)
+@click.option(
+    '--hash-key',
+    'hash_key',
+    type= click.Choice(['stem', 'content']),
+    default= MY_CFG.split.hash_key,
+    help= 'Hash the image name or its content to assign its split.'
+)
+@click.option(
+    '--stratify',
+    'stratify',
+    is_flag= True,
+    default= False,
+    help= 'Balance the boxes of each class across train, validation and test.'
+)
+@click.option(
+    '--dedup',
+    'dedup',
+    is_flag= True,
+    default= False,
+    help= 'Group near-duplicate images by perceptual hash and keep each group in a single split.'
+)
+@click.option(
+    '--thin',
+    'thin',
+    type= click.IntRange(min= 0),
+    default= MY_CFG.dedup.thin,
+    help= 'Maximum images kept of each group of near-duplicates. 0 keeps all of them. Only with --dedup.'
+)
 def split_dataset(
     data_source: Path,
     images_source: Path,
     validation: float = 0.2,
-    test: float = 0.1
+    test: float = 0.1,
+    link_mode: str = MY_CFG.transfer.mode,
+    workers: int = MY_CFG.transfer.workers,
+    resume: bool = True,
+    lists: bool = False,
+    seed: Optional[int] = None,
+    hash_key: str = MY_CFG.split.hash_key,
+    stratify: bool = False,
+    dedup: bool = False,
+    thin: int = MY_CFG.dedup.thin
 ) -> None:
     set_yolo_manager_logging_level(logging.WARNING)
     set_yolo_manager_logs_path('yoloModelManager.log')
     set_yolo_manager_logging_level(LOGGING_LVL)
     save_yolo_manager_logs(True)
-    my_logger.debug(f'Executed: split-dataset -d {data_source} -i {images_source} -v {validation} -t {test}')
+    my_logger.debug(f'Executed: split-dataset -d {data_source} -i {images_source} -v {validation} -t {test} -l {link_mode} -w {workers} --lists {lists} -s {seed} --stratify {stratify} --dedup {dedup} --thin {thin}')
     if validation + test > 0.5:
         msg: str = 'Validation + test ratio should be lower than 50% of the dataset.'
         my_logger.error(f'AttributeError: {msg}')
         raise AttributeError(msg)
     dirManager: TrainingDatasetDirManager = TrainingDatasetDirManager(
-        source_dataset_dir= data_source
+        source_dataset_dir= data_source,
+        stream_zip= MY_CFG.split.stream_zip and images_source is None and not lists
     )
     if images_source is not None:
-        dirManager.source_dataset_dir.add_images(images_source)
-    dirManager.split(validation= validation, test= test)
+        dirManager.source_dataset_dir.add_images(images_source, link_mode, workers, print_progress)
+    summaries: list[TransferSummaryDict] = dirManager.split(
+        validation= validation,
+        test= test,
+        mode= link_mode,
+        workers= workers,
+        resume= resume,
+        lists= lists,
+        seed= seed,
+        hash_key= hash_key,
+        stratify= stratify,
+        dedup= dedup,
+        thin= thin,
+        progress= print_progress
+    )
+    if len(summaries) > 0:
+        elapsed: float = max(sum(summary['elapsed'] for summary in summaries), 1e-9)
+        n_bytes: int = sum(summary['bytes'] for summary in summaries)
+        print(
+            f'{sum(summary["transferred"] for summary in summaries)} files transferred, '
+            f'{sum(summary["skipped"] for summary in summaries)} already done and '
+            f'{sum(summary["failed"] for summary in summaries)} failed in {elapsed:.1f} s: '
+            f'{n_bytes / elapsed / 1e6:.2f} MB/s.'
+        )
+
+
+def print_labels_stats(name: str, stats: LabelsStatsDict) -> None:
+    print(f'\n{name}: {stats["images"]} images, {stats["labeled_images"]} labeled, '
+          f'{stats["unlabeled_images"]} without labels, {stats["boxes"]} boxes.')
+    if stats['boxes'] == 0:
+        return
+    print(f'  {"CLASS":<24}{"BOXES":>10}{"%":>8}')
+    for class_name, count in stats['class_counts'].items():
+        print(f'  {class_name:<24}{count:>10}{100 * count / stats["boxes"]:>8.1f}')
+    print('  Boxes per image: ' + ', '.join(f'{n}: {images}' for n, images in stats['boxes_per_image'].items()))
+    print('  Box area: ' + ', '.join(f'{bin}: {count}' for bin, count in stats['box_area'].items()))
+    print('  Box width: ' + ', '.join(f'{p}: {value:.3f}' for p, value in stats['box_width'].items()))
+    print('  Box height: ' + ', '.join(f'{p}: {value:.3f}' for p, value in stats['box_height'].items()))
+
+def print_paths(title: str, paths: list[Path], limit: int) -> None:
+    if len(paths) == 0:
+        return
+    print(f'\n{title}: {len(paths)}')
+    for path in paths[:limit]:
+        print(f'  {path}')
+    if len(paths) > limit:
+        print(f'  ... {len(paths) - limit} more.')
+
+
+@click.command()
+@click.option(
+    '--dataset',
+    '-d',
+    'dataset',
+    type= click.Path(
+        exists= True,
+        file_okay= False,
+        path_type= Path
+    ),
+    required= True,
+    help= 'Path to a dataset directory or to a split dataset (train/validation/test directories or list files).'
+)
+@click.option(
+    '--workers',
+    '-w',
+    'workers',
+    type= click.IntRange(min= 1),
+    default= MY_CFG.labels.workers,
+    help= 'Number of threads reading the labels when the cache is outdated.'
+)
+@click.option(
+    '--show',
+    '-n',
+    'show',
+    type= click.IntRange(min= 0),
+    default= 10,
+    help= 'Maximum number of images without labels and labels without image listed. Default to 10.'
+)
+def dataset_stats(
+    dataset: Path,
+    workers: int = MY_CFG.labels.workers,
+    show: int = 10
+) -> None:
+    set_yolo_manager_logging_level(logging.WARNING)
+    set_yolo_manager_logs_path('yoloModelManager.log')
+    set_yolo_manager_logging_level(LOGGING_LVL)
+    save_yolo_manager_logs(True)
+    my_logger.debug(f'Executed: dataset-stats -d {dataset} -w {workers} -n {show}')
+    start: float = monotonic()
+    if (dataset / 'images').is_dir():
+        dataset_dir: DatasetDirManager = DatasetDirManager(dataset, create= False)
+        print_labels_stats(dataset.name, dataset_dir.get_labels_stats(workers= workers))
+        print_paths('Images without labels', dataset_dir.get_unlabeled_images(), show)
+        print_paths('Labels without image', dataset_dir.get_orphan_labels(), show)
+    else:
+        dirManager: TrainingDatasetDirManager = TrainingDatasetDirManager(dataset_dir= dataset)
+        for name, stats in dirManager.get_splits_stats(workers).items():
+            print_labels_stats(name, stats)
+        if not dirManager.is_list_split:
+            for name, split_dir in (
+                ('train', dirManager.train_dir),
+                ('validation', dirManager.validation_dir),
+                ('test', dirManager.test_dir)
+            ):
+                print_paths(f'{name} images without labels', split_dir.get_unlabeled_images(), show)
+                print_paths(f'{name} labels without image', split_dir.get_orphan_labels(), show)
+    print(f'\nComputed in {1000 * (monotonic() - start):.1f} ms.')
+
+
+@click.command()
+@click.option(
+    '--dataset',
+    '-d',
+    'dataset',
+    type= click.Path(
+        exists= True,
+        file_okay= False,
+        path_type= Path
+    ),
+    required= True,
+    help= 'Path to a dataset directory or to a split dataset with train/validation/test directories.'
+)
+@click.option(
+    '--format',
+    '-f',
+    'image_format',
+    type= click.Choice(
+        list(IMAGE_FORMATS.keys()),
+        case_sensitive= False
+    ),
+    default= MY_CFG.compression.format,
+    help= 'Format of the re-encoded images.'
+)
+@click.option(
+    '--quality',
+    '-q',
+    'quality',
+    type= click.IntRange(min= 0, max= 100),
+    help= 'Quality (jpg, webp) or compression level (png) of the re-encoded images. Default to the writer settings of the format.'
+)
+@click.option(
+    '--workers',
+    '-w',
+    'workers',
+    type= click.IntRange(min= 1),
+    default= MY_CFG.compression.workers,
+    help= 'Number of processes re-encoding images.'
+)
+@click.option(
+    '--force',
+    'force',
+    is_flag= True,
+    default= False,
+    help= 'Re-encode also the images already in the target format.'
+)
+def compress_dataset(
+    dataset: Path,
+    image_format: str = MY_CFG.compression.format,
+    quality: Optional[int] = None,
+    workers: int = MY_CFG.compression.workers,
+    force: bool = False
+) -> None:
+    set_yolo_manager_logging_level(logging.WARNING)
+    set_yolo_manager_logs_path('yoloModelManager.log')
+    set_yolo_manager_logging_level(LOGGING_LVL)
+    save_yolo_manager_logs(True)
+    my_logger.debug(f'Executed: compress-dataset -d {dataset} -f {image_format} -q {quality} -w {workers} --force {force}')
+    dataset_dirs: list[DatasetDirManager]
+    if (dataset / 'images').is_dir():
+        dataset_dirs = [DatasetDirManager(dataset, create= False)]
+    else:
+        dirManager: TrainingDatasetDirManager = TrainingDatasetDirManager(dataset_dir= dataset)
+        if dirManager.is_list_split:
+            msg: str = f'"{dataset}" is a split of list files. Compress the source dataset and split it again.'
+            my_logger.error(f'ValueError: {msg}')
+            raise ValueError(msg)
+        dataset_dirs = [dirManager.train_dir, dirManager.validation_dir, dirManager.test_dir]
+    summaries: list[CompressionSummaryDict] = [
+        dataset_dir.compress_images(image_format, quality, workers, force, print_progress)
+        for dataset_dir in dataset_dirs
+    ]
+    before: int = sum(summary['bytes_before'] for summary in summaries)
+    after: int = sum(summary['bytes_after'] for summary in summaries)
+    print(
+        f'{sum(summary["compressed"] for summary in summaries)} images compressed, '
+        f'{sum(summary["skipped"] for summary in summaries)} already {image_format} and '
+        f'{sum(summary["failed"] for summary in summaries)} failed in '
+        f'{sum(summary["elapsed"] for summary in summaries):.1f} s.'
+    )
+    print(
+        f'{before / 1e6:.2f} MB -> {after / 1e6:.2f} MB: '
+        f'{(before - after) / 1e6:.2f} MB saved ({100 * (before - after) / max(before, 1):.1f} %).'
+    )
+
+
+@click.command()
+@click.option(
+    '--dataset',
+    '-d',
+    'dataset',
+    type= click.Path(
+        exists= True,
+        file_okay= False,
+        path_type= Path
+    ),
+    required= True,
+    help= 'Path to a split dataset or to a dataset directory.'
+)
+@click.option(
+    '--width',
+    'width',
+    type= click.IntRange(min= 1),
+    help= 'Expected width of the images. Default to "camera_width" in metadata.yaml.'
+)
+@click.option(
+    '--height',
+    'height',
+    type= click.IntRange(min= 1),
+    help= 'Expected height of the images. Default to "camera_height" in metadata.yaml.'
+)
+@click.option(
+    '--nc',
+    'nc',
+    type= click.IntRange(min= 1),
+    help= 'Number of classes. Default to "nc" in data.yaml or the lines of classes.txt.'
+)
+@click.option(
+    '--workers',
+    '-w',
+    'workers',
+    type= click.IntRange(min= 1),
+    default= MY_CFG.validation.workers,
+    help= 'Number of processes checking files.'
+)
+@click.option(
+    '--show',
+    '-n',
+    'show',
+    type= click.IntRange(min= 0),
+    default= 20,
+    help= 'Maximum number of issues listed of each split. Default to 20.'
+)
+def validate_dataset(
+    dataset: Path,
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    nc: Optional[int] = None,
+    workers: int = MY_CFG.validation.workers,
+    show: int = 20
+) -> None:
+    set_yolo_manager_logging_level(logging.WARNING)
+    set_yolo_manager_logs_path('yoloModelManager.log')
+    set_yolo_manager_logging_level(LOGGING_LVL)
+    save_yolo_manager_logs(True)
+    my_logger.debug(f'Executed: validate-dataset -d {dataset} --width {width} --height {height} --nc {nc} -w {workers} -n {show}')
+    start: float = monotonic()
+    issues: dict[str, list[ValidationIssueDict]]
+    if (dataset / 'images').is_dir():
+        dataset_dir: DatasetDirManager = DatasetDirManager(dataset, create= False)
+        if dataset_dir.metadata_path.is_file() and (width is None or height is None):
+            with open(dataset_dir.metadata_path, 'r') as f:
+                metadata: dict = yaml.safe_load(f) or {}
+            width = width or metadata.get('camera_width')
+            height = height or metadata.get('camera_height')
+        if nc is None and (dataset / 'classes.txt').is_file():
+            nc = len(dataset_dir.get_classes())
+        issues = {dataset.name: dataset_dir.validate(width, height, nc, workers)}
+    else:
+        issues = TrainingDatasetDirManager(dataset_dir= dataset).validate(width, height, nc, workers)
+    for name, split_issues in issues.items():
+        print(f'{name}: {len(split_issues)} issues.')
+        for issue in split_issues[:show]:
+            print(f'  [{issue["issue"]}] {issue["path"]}: {issue["detail"]}')
+        if len(split_issues) > show:
+            print(f'  ... {len(split_issues) - show} more.')
+    print(f'Validated in {monotonic() - start:.2f} s.')
+    if any(len(split_issues) > 0 for split_issues in issues.values()):
+        raise SystemExit(1)
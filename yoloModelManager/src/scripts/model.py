@@ -4,12 +4,36 @@ from typing import Optional
 
 import click
 
-from ..cameras import CameraManager, camera_manager_factory
-from ..filesystem import TrainingDatasetDirManager
-from ..model import ModelManager
-from ..utils.config import (LOGGING_LVL, my_logger, save_yolo_manager_logs,
+from ..cameras import (CameraManager, FrameSource, MultiCameraManager,
+                       TriggerRule, camera_manager_factory,
+                       frame_source_factory)
+from ..filesystem import IMAGE_FORMATS, ImageWriter, TrainingDatasetDirManager
+from ..model import (AutoLabelSummaryDict, ModelManager, SweepConfigDict,
+                     SweepResultDict, TrainingJob, TrainingJobStates,
+                     TrainingProgressDict, auto_label_images, format_progress,
+                     get_sweep_configs, save_sweep_results, sweep_models)
+from ..utils.config import (DATASETS_PATH, IMAGES_PATH, LOGGING_LVL,
+                            MODELS_PATH, MY_CFG, my_logger,
+                            save_yolo_manager_logs,
                             set_yolo_manager_logging_level,
                             set_yolo_manager_logs_path)
+from ..utils.metrics import start_metrics_server
+
+
+def print_training_progress(progress: TrainingProgressDict) -> None:
+    done: bool = progress['state'] not in (TrainingJobStates.PENDING.value, TrainingJobStates.RUNNING.value)
+    print(f'\r{format_progress(progress)}', end= '\n' if done else '', flush= True)
+
+def print_auto_label_progress(summary: AutoLabelSummaryDict) -> None:
+    print(f'\r{summary["images"]} images: {summary["labeled"]} labeled, {summary["empty"]} empty, '
+          f'{summary["review"]} to review', end= '', flush= True)
+
+def print_sweep_progress(trained: int, running: int, pending: int) -> None:
+    print(
+        f'\r{trained}/{trained + running + pending} trained, {running} running, {pending} pending',
+        end= '\n' if running + pending == 0 else '',
+        flush= True
+    )
 
 
 @click.command()
@@ -24,9 +48,38 @@ from ..utils.config import (LOGGING_LVL, my_logger, save_yolo_manager_logs,
 @click.option(
     '--camera',
     '-c',
-    'camera',
+    'cameras',
+    multiple= True,
     type= click.IntRange(0),
-    help= 'Id of the camera for opencv. Defaults to None for select.'
+    help= 'Id of the camera for opencv. Defaults to None for select. Repeat it to run several cameras with one shared model.'
+)
+@click.option(
+    '--source',
+    '-S',
+    'source',
+    type= click.STRING,
+    help= 'Frame source instead of a camera: a video file, an images directory or "synthetic[:<W>x<H>][@<FPS>]".'
+)
+@click.option(
+    '--realtime',
+    'realtime',
+    is_flag= True,
+    default= False,
+    help= 'Replay video files at their own frame rate instead of full speed.'
+)
+@click.option(
+    '--loop',
+    'loop',
+    is_flag= True,
+    default= False,
+    help= 'Replay the video file or images directory in loop.'
+)
+@click.option(
+    '--max-batch',
+    '-b',
+    'max_batch',
+    type= click.IntRange(min= 1),
+    help= 'Max number of camera frames per inference call with several cameras. Defaults to the number of cameras.'
 )
 @click.option(
     '--save-path',
@@ -40,20 +93,130 @@ from ..utils.config import (LOGGING_LVL, my_logger, save_yolo_manager_logs,
     ),
     help= 'Path to save the file. If None try to import from environment variable "IMAGES_SAVE_PATH". Else set to app/images.'
 )
+@click.option(
+    '--image-format',
+    'image_format',
+    type= click.Choice(
+        IMAGE_FORMATS.keys(),
+        case_sensitive= False
+    ),
+    help= f'Format of the saved images. Defaults to "writer.format" in config.toml. Valid options: {list(IMAGE_FORMATS.keys())}'
+)
+@click.option(
+    '--quality',
+    '-q',
+    'quality',
+    type= click.IntRange(0, 100),
+    help= 'PNG compression level (0-9) or JPEG/WEBP quality (0-100) of the saved images.'
+)
+@click.option(
+    '--trigger',
+    '-t',
+    'triggers',
+    multiple= True,
+    type= click.STRING,
+    help= 'Save the frames before and after a detection of "<class name|class id>:<min conf>". Can be repeated.'
+)
+@click.option(
+    '--pre-seconds',
+    'pre_seconds',
+    type= click.FloatRange(min= 0),
+    default= MY_CFG.events.pre_seconds,
+    help= 'Seconds of frames kept in memory before a trigger.'
+)
+@click.option(
+    '--post-seconds',
+    'post_seconds',
+    type= click.FloatRange(min= 0),
+    default= MY_CFG.events.post_seconds,
+    help= 'Seconds of frames saved after a trigger.'
+)
+@click.option(
+    '--buffer-mb',
+    'buffer_mb',
+    type= click.FloatRange(min= 0, min_open= True),
+    default= MY_CFG.events.buffer_mb,
+    help= 'Max memory of the pre-trigger buffer in MB.'
+)
+@click.option(
+    '--buffer-jpeg/--buffer-raw',
+    'buffer_jpeg',
+    default= MY_CFG.events.buffer_jpeg,
+    help= 'Keep the pre-trigger frames JPEG-compressed in memory or raw.'
+)
+@click.option(
+    '--metrics-port',
+    'metrics_port',
+    type= click.IntRange(0, 65535),
+    default= MY_CFG.metrics.port if MY_CFG.metrics.enabled else None,
+    help= 'Serve Prometheus metrics on localhost at this port. Defaults to "metrics.port" in config.toml if "metrics.enabled".'
+)
 def test_model(
     model_name: str,
-    camera: int,
-    save_path: Optional[Path] = None
+    cameras: tuple[int, ...] = (),
+    source: Optional[str] = None,
+    realtime: bool = False,
+    loop: bool = False,
+    max_batch: Optional[int] = None,
+    save_path: Optional[Path] = None,
+    image_format: Optional[str] = None,
+    quality: Optional[int] = None,
+    triggers: tuple[str, ...] = (),
+    pre_seconds: float = MY_CFG.events.pre_seconds,
+    post_seconds: float = MY_CFG.events.post_seconds,
+    buffer_mb: float = MY_CFG.events.buffer_mb,
+    buffer_jpeg: bool = MY_CFG.events.buffer_jpeg,
+    metrics_port: Optional[int] = None
 ) -> None:
     set_yolo_manager_logging_level(logging.WARNING)
     set_yolo_manager_logs_path('yoloModelManager.log')
     set_yolo_manager_logging_level(LOGGING_LVL)
     save_yolo_manager_logs(True)
-    my_logger.debug(f'Executed: test-model -m {model_name} -c {camera} -p {save_path}')
+    my_logger.debug(f'Executed: test-model -m {model_name} -c {cameras} -S {source} -b {max_batch} -p {save_path} -t {triggers}')
+    if metrics_port is not None:
+        start_metrics_server(metrics_port)
     model: ModelManager = ModelManager(model_name)
-    camera_manager: CameraManager = camera_manager_factory(camera)
+    rules: list[TriggerRule] = [TriggerRule.parse(trigger) for trigger in triggers]
+    events_kwargs: dict = {
+        'pre_seconds': pre_seconds,
+        'post_seconds': post_seconds,
+        'buffer_mb': buffer_mb,
+        'buffer_jpeg': buffer_jpeg
+    }
+    if len(cameras) > 1:
+        multi_camera_manager: MultiCameraManager = MultiCameraManager.from_camera_ids(
+            list(cameras),
+            model,
+            max_batch
+        )
+        for camera_manager in multi_camera_manager.cameras:
+            camera_manager.save_dir_path = save_path
+            if image_format is not None or quality is not None:
+                camera_manager.image_writer = ImageWriter(
+                    image_format= image_format or MY_CFG.writer.format,
+                    quality= quality
+                )
+            if len(rules) > 0:
+                camera_manager.enable_event_recording(rules, **events_kwargs)
+        multi_camera_manager.keys_callbacks = {
+            32: (multi_camera_manager.save_last_frames, {})
+        }
+        multi_camera_manager.video_stream()
+        return
+    camera: Optional[int] = cameras[0] if len(cameras) > 0 else None
+    frame_source: Optional[FrameSource] = None
+    if source is not None:
+        frame_source = frame_source_factory(source, realtime, loop)
+    camera_manager: CameraManager = camera_manager_factory(camera, frame_source)
     camera_manager.save_dir_path = save_path
+    if image_format is not None or quality is not None:
+        camera_manager.image_writer = ImageWriter(
+            image_format= image_format or MY_CFG.writer.format,
+            quality= quality
+        )
     camera_manager.load_params_from_model(model)
+    if len(rules) > 0:
+        camera_manager.enable_event_recording(rules, **events_kwargs)
     camera_manager.keys_callbacks = {
         32: (camera_manager.save_last_frame, {})
     }
@@ -100,23 +263,378 @@ def test_model(
     default= 60,
     help= 'Epoch of the training process.'
 )
+@click.option(
+    '--cache/--no-cache',
+    'cache',
+    default= MY_CFG.training_cache.enabled,
+    help= 'Train on a cached copy of the dataset with the model filters applied and resized to the training size.'
+)
+@click.option(
+    '--background',
+    '-b',
+    'background',
+    is_flag= True,
+    default= False,
+    help= 'Start the training job and exit. Follow it with training-job.'
+)
 def train_model(
     name: str,
     base_model: str,
     dataset: Path,
     epochs: int,
+    cache: bool = MY_CFG.training_cache.enabled,
+    background: bool = False
 ) -> None:
     set_yolo_manager_logging_level(logging.WARNING)
     set_yolo_manager_logs_path('yoloModelManager.log')
     set_yolo_manager_logging_level(LOGGING_LVL)
     save_yolo_manager_logs(True)
-    my_logger.debug(f'Executed: train-model -n {name} -m {base_model} -d {dataset} -e {epochs}')
+    my_logger.debug(f'Executed: train-model -n {name} -m {base_model} -d {dataset} -e {epochs} --cache {cache} --background {background}')
     dataset_dir: TrainingDatasetDirManager = TrainingDatasetDirManager(
         dataset_dir= dataset
     )
     base_model_manager: ModelManager = ModelManager(base_model)
-    base_model_manager.train(
+    job: TrainingJob = base_model_manager.train(
         dataset= dataset_dir,
         new_name= name,
-        epochs= epochs
+        epochs= epochs,
+        cache= cache,
+        background= background,
+        callback= print_training_progress
+    )
+    if background:
+        print(f'Training job "{name}" started. Progress: "{job.progress_path}". Log: "{job.log_path}".')
+
+
+@click.command()
+@click.option(
+    '--name',
+    '-n',
+    'name',
+    type= click.STRING,
+    required= True,
+    help= 'Name of the model being trained.'
+)
+@click.option(
+    '--follow',
+    '-f',
+    'follow',
+    is_flag= True,
+    default= False,
+    help= 'Print the progress until the job ends.'
+)
+@click.option(
+    '--cancel',
+    'cancel',
+    is_flag= True,
+    default= False,
+    help= 'Stop the job at the end of the current epoch. It can be resumed later.'
+)
+@click.option(
+    '--force',
+    'force',
+    is_flag= True,
+    default= False,
+    help= 'With --cancel, terminate the process without waiting for the epoch to end.'
+)
+@click.option(
+    '--resume',
+    '-r',
+    'resume',
+    is_flag= True,
+    default= False,
+    help= 'Start again a cancelled or failed job from its last.pt.'
+)
+def training_job(
+    name: str,
+    follow: bool = False,
+    cancel: bool = False,
+    force: bool = False,
+    resume: bool = False
+) -> None:
+    set_yolo_manager_logging_level(logging.WARNING)
+    set_yolo_manager_logs_path('yoloModelManager.log')
+    set_yolo_manager_logging_level(LOGGING_LVL)
+    save_yolo_manager_logs(True)
+    my_logger.debug(f'Executed: training-job -n {name} -f {follow} --cancel {cancel} --force {force} -r {resume}')
+    job: TrainingJob = TrainingJob(name)
+    if cancel:
+        job.cancel(force)
+    elif resume:
+        job.resume()
+    progress: TrainingProgressDict = job.progress
+    if follow:
+        progress = job.wait(print_training_progress)
+    else:
+        print(format_progress(progress))
+    if progress['error'] is not None:
+        print(f'Error: {progress["error"]}. See "{job.log_path}".')
+
+
+@click.command()
+@click.option(
+    '--model',
+    '-m',
+    'model_name',
+    type= click.STRING,
+    required= True,
+    help= 'Name of the model to be used.'
+)
+@click.option(
+    '--images',
+    '-i',
+    'images_path',
+    type= click.Path(
+        readable= True,
+        path_type= Path
+    ),
+    required= True,
+    help= 'Directory with the images to label. If path is relative, relative to IMAGES_SAVE_PATH.'
+)
+@click.option(
+    '--output',
+    '-o',
+    'output_path',
+    type= click.Path(
+        writable= True,
+        path_type= Path
+    ),
+    help= 'Dataset directory for the labels. Default to <images>_auto in DATASETS_PATH.'
+)
+@click.option(
+    '--batch',
+    '-b',
+    'batch',
+    type= click.IntRange(min= 1),
+    default= MY_CFG.auto_label.batch,
+    help= 'Images read and predicted at once.'
+)
+@click.option(
+    '--workers',
+    '-w',
+    'workers',
+    type= click.IntRange(min= 0),
+    default= MY_CFG.auto_label.workers,
+    help= 'Processes running the model. 0 runs it in this process.'
+)
+@click.option(
+    '--conf',
+    'conf',
+    type= click.FloatRange(min= 0, max= 1),
+    default= MY_CFG.auto_label.conf,
+    help= 'Minimum confidence of the boxes written.'
+)
+@click.option(
+    '--review-conf',
+    'review_conf',
+    type= click.FloatRange(min= 0, max= 1),
+    default= MY_CFG.auto_label.review_conf,
+    help= 'Images with any box below this confidence are added to review.txt.'
+)
+@click.option(
+    '--overwrite',
+    'overwrite',
+    is_flag= True,
+    default= False,
+    help= 'Label again the images that already have a label.'
+)
+def auto_label(
+    model_name: str,
+    images_path: Path,
+    output_path: Optional[Path] = None,
+    batch: int = MY_CFG.auto_label.batch,
+    workers: int = MY_CFG.auto_label.workers,
+    conf: float = MY_CFG.auto_label.conf,
+    review_conf: float = MY_CFG.auto_label.review_conf,
+    overwrite: bool = False
+) -> None:
+    set_yolo_manager_logging_level(logging.WARNING)
+    set_yolo_manager_logs_path('yoloModelManager.log')
+    set_yolo_manager_logging_level(LOGGING_LVL)
+    save_yolo_manager_logs(True)
+    my_logger.debug(f'Executed: auto-label -m {model_name} -i {images_path} -o {output_path} -b {batch} -w {workers} --conf {conf} --review-conf {review_conf} --overwrite {overwrite}')
+    if not images_path.is_absolute():
+        images_path = IMAGES_PATH / images_path
+    if output_path is None:
+        output_path = DATASETS_PATH / f'{images_path.name}_auto'
+    elif not output_path.is_absolute():
+        output_path = DATASETS_PATH / output_path
+    summary: AutoLabelSummaryDict = auto_label_images(
+        model_name,
+        images_path,
+        output_path,
+        batch,
+        workers,
+        conf,
+        review_conf,
+        overwrite,
+        print_auto_label_progress
+    )
+    print()
+    print(
+        f'{summary["labeled"]} images labeled, {summary["empty"]} without detections, '
+        f'{summary["skipped"]} already labeled and {summary["failed"]} failed in {summary["elapsed"]:.1f} s. '
+        f'{summary["review"]} images to review in "{output_path / "review.txt"}".'
+    )
+
+
+def print_sweep_results(results: list[SweepResultDict]) -> None:
+    print(f'{"":2}{"MODEL":<40}{"BASE":<20}{"IMGSZ":>7}{"EPOCHS":>8}{"mAP50-95":>10}{"mAP50":>8}{"P50 ms":>9}{"P95 ms":>9}')
+    for result in sorted(results, key= lambda result: (result['latency_p50_ms'] is None, result['latency_p50_ms'] or 0)):
+        if result['latency_p50_ms'] is None:
+            print(f'{"":2}{result["name"]:<40}{result["base_model"]:<20}{result["imgsz"]:>7}{result["epochs"]:>8}  {result["state"]}')
+            continue
+        print(
+            f'{"*" if result["pareto"] else "":2}{result["name"]:<40}{result["base_model"]:<20}{result["imgsz"]:>7}'
+            f'{result["epochs"]:>8}{result["map50_95"] or 0:>10.3f}{result["map50"] or 0:>8.3f}'
+            f'{result["latency_p50_ms"]:>9.1f}{result["latency_p95_ms"]:>9.1f}'
+        )
+    print('* Pareto-optimal: no other model is faster and at least as accurate.')
+
+
+@click.command()
+@click.option(
+    '--name',
+    '-n',
+    'name',
+    type= click.STRING,
+    required= True,
+    help= 'Prefix of the names of the models to create.'
+)
+@click.option(
+    '--base-model',
+    '-m',
+    'base_models',
+    type= click.STRING,
+    multiple= True,
+    required= True,
+    help= 'Name of a model to be used as base. Can be repeated.'
+)
+@click.option(
+    '--dataset',
+    '-d',
+    'dataset',
+    type= click.Path(
+        readable= True,
+        writable= True,
+        path_type= Path
+    ),
+    required= True,
+    help= f'Path to the split dataset.'
+)
+@click.option(
+    '--imgsz',
+    '-s',
+    'imgszs',
+    type= click.IntRange(min= 32),
+    multiple= True,
+    help= 'Training and inference image size. Can be repeated. Default to the dataset width.'
+)
+@click.option(
+    '--epochs',
+    '-e',
+    'epochs',
+    type= click.IntRange(
+        min= 0,
+        min_open= True,
+    ),
+    multiple= True,
+    default= (60,),
+    help= 'Epochs of the training process. Can be repeated.'
+)
+@click.option(
+    '--samples',
+    'samples',
+    type= click.IntRange(min= 0),
+    default= MY_CFG.sweep.samples,
+    help= 'Random configurations of the grid to train. 0 trains the whole grid.'
+)
+@click.option(
+    '--seed',
+    'seed',
+    type= click.INT,
+    default= MY_CFG.sweep.seed,
+    help= 'Seed of the random sample.'
+)
+@click.option(
+    '--cores',
+    'cores',
+    type= click.IntRange(min= 1),
+    default= None,
+    help= 'Cores for the whole sweep. Default to all the cores.'
+)
+@click.option(
+    '--cores-per-job',
+    'cores_per_job',
+    type= click.IntRange(min= 1),
+    default= MY_CFG.sweep.cores_per_job,
+    help= 'Threads of each training job.'
+)
+@click.option(
+    '--memory-per-job',
+    'memory_per_job',
+    type= click.FloatRange(min= 0, min_open= True),
+    default= MY_CFG.sweep.memory_per_job,
+    help= 'GB of memory reserved for each training job.'
+)
+@click.option(
+    '--latency-runs',
+    'latency_runs',
+    type= click.IntRange(min= 1),
+    default= MY_CFG.sweep.latency_runs,
+    help= 'Inferences timed for each exported model.'
+)
+@click.option(
+    '--cache/--no-cache',
+    'cache',
+    default= MY_CFG.training_cache.enabled,
+    help= 'Train on a cached copy of the dataset with the model filters applied and resized to the training size.'
+)
+def sweep_model(
+    name: str,
+    base_models: tuple[str, ...],
+    dataset: Path,
+    imgszs: tuple[int, ...] = (),
+    epochs: tuple[int, ...] = (60,),
+    samples: int = MY_CFG.sweep.samples,
+    seed: int = MY_CFG.sweep.seed,
+    cores: Optional[int] = None,
+    cores_per_job: int = MY_CFG.sweep.cores_per_job,
+    memory_per_job: float = MY_CFG.sweep.memory_per_job,
+    latency_runs: int = MY_CFG.sweep.latency_runs,
+    cache: bool = MY_CFG.training_cache.enabled
+) -> None:
+    set_yolo_manager_logging_level(logging.WARNING)
+    set_yolo_manager_logs_path('yoloModelManager.log')
+    set_yolo_manager_logging_level(LOGGING_LVL)
+    save_yolo_manager_logs(True)
+    my_logger.debug(
+        f'Executed: sweep-model -n {name} -m {" -m ".join(base_models)} -d {dataset} -s {imgszs} -e {epochs} '
+        f'--samples {samples} --seed {seed} --cores {cores} --cores-per-job {cores_per_job} '
+        f'--memory-per-job {memory_per_job} --latency-runs {latency_runs} --cache {cache}'
+    )
+    dataset_dir: TrainingDatasetDirManager = TrainingDatasetDirManager(
+        dataset_dir= dataset
+    )
+    configs: list[SweepConfigDict] = get_sweep_configs(
+        name,
+        list(base_models),
+        list(imgszs) or [dataset_dir.metadata['camera_width']],
+        list(epochs),
+        samples,
+        seed
+    )
+    results: list[SweepResultDict] = sweep_models(
+        dataset_dir,
+        configs,
+        cores_per_job,
+        memory_per_job,
+        cores,
+        cache,
+        latency_runs,
+        progress= print_sweep_progress
     )
+    results_path: Path = MODELS_PATH / f'{name}_sweep.csv'
+    save_sweep_results(results, results_path)
+    print_sweep_results(results)
+    print(f'Results saved in "{results_path}".')
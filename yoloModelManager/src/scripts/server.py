@@ -0,0 +1,96 @@
+import logging
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from ..model import ModelManager
+from ..model.inference_server import InferenceServer
+from ..utils.config import (LOGGING_LVL, MY_CFG, my_logger, save_yolo_manager_logs,
+                            set_yolo_manager_logging_level,
+                            set_yolo_manager_logs_path)
+
+
+@click.command()
+@click.option(
+    '--model',
+    '-m',
+    'model_names',
+    multiple= True,
+    required= True,
+    type= click.STRING,
+    help= 'Name of the model to be served. Can be repeated to keep several models loaded.'
+)
+@click.option(
+    '--host',
+    '-H',
+    'host',
+    type= click.STRING,
+    default= MY_CFG.server.host,
+    help= 'Host of the HTTP server. Default to "server.host" in config.toml.'
+)
+@click.option(
+    '--port',
+    '-P',
+    'port',
+    type= click.IntRange(0, 65535),
+    default= MY_CFG.server.port,
+    help= 'Port of the HTTP server. Default to "server.port" in config.toml.'
+)
+@click.option(
+    '--socket',
+    '-u',
+    'socket_path',
+    type= click.Path(
+        dir_okay= False,
+        path_type= Path
+    ),
+    help= 'Serve on this Unix socket instead of TCP.'
+)
+@click.option(
+    '--max-batch',
+    '-b',
+    'max_batch',
+    type= click.IntRange(min= 1),
+    default= MY_CFG.server.max_batch,
+    help= 'Max number of requests grouped in one inference call.'
+)
+@click.option(
+    '--max-wait',
+    '-w',
+    'max_wait_ms',
+    type= click.FloatRange(min= 0),
+    default= MY_CFG.server.max_wait_ms,
+    help= 'Max milliseconds the first request of a batch waits for more requests.'
+)
+@click.option(
+    '--queue-size',
+    'queue_size',
+    type= click.IntRange(min= 1),
+    default= MY_CFG.server.queue_size,
+    help= 'Max number of requests waiting per model. New requests are rejected when full.'
+)
+def serve_model(
+    model_names: tuple[str, ...],
+    host: str = MY_CFG.server.host,
+    port: int = MY_CFG.server.port,
+    socket_path: Optional[Path] = None,
+    max_batch: int = MY_CFG.server.max_batch,
+    max_wait_ms: float = MY_CFG.server.max_wait_ms,
+    queue_size: int = MY_CFG.server.queue_size
+) -> None:
+    set_yolo_manager_logging_level(logging.WARNING)
+    set_yolo_manager_logs_path('yoloModelManager.log')
+    set_yolo_manager_logging_level(LOGGING_LVL)
+    save_yolo_manager_logs(True)
+    my_logger.debug(f'Executed: serve-model -m {model_names} -H {host} -P {port} -u {socket_path} -b {max_batch} -w {max_wait_ms}')
+    server: InferenceServer = InferenceServer(
+        models= [ModelManager(name) for name in model_names],
+        host= host,
+        port= port,
+        socket_path= socket_path,
+        max_batch= max_batch,
+        max_wait= max_wait_ms / 1000,
+        queue_size= queue_size
+    )
+    server.serve_forever()
@@ -15,6 +15,7 @@ class EnvVars(Enum):
     IMAGES_PATH = 'IMAGES_PATH'
     MODELS_PATH = 'MODELS_PATH'
     DATASETS_PATH = 'DATASETS_PATH'
+    CACHE_PATH = 'CACHE_PATH'
     LOGGING_LVL = 'LOGGING_LVL'
     ULTRALYTICS_LOGGING_LVL = 'ULTRALYTICS_LOGGING_LVL'
 
@@ -42,6 +43,10 @@ DATASETS_PATH: Path = Path(getenv(
     EnvVars.DATASETS_PATH.value,
     _MY_PACKAGE[ProjectPathsDict.DIST_PATH] / 'datasets'
 ))
+CACHE_PATH: Path = Path(getenv(
+    EnvVars.CACHE_PATH.value,
+    _MY_PACKAGE[ProjectPathsDict.DIST_PATH] / 'cache'
+))
 
 # CONSTANTS FROM config.toml (Only readed on start for speed)
 YOLO_IMAGE_WIDTH: int = MY_CFG.model.yolo_image_input_width
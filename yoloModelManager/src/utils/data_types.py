@@ -1,6 +1,8 @@
 from datetime import datetime
 from enum import Enum
-from typing import TypedDict
+from typing import Callable, TypedDict
+
+ProgressCallback = Callable[[str, int, int], None]
 
 
 class ModelTasks(Enum):
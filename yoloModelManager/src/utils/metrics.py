@@ -0,0 +1,230 @@
+from enum import Enum
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Callable, Optional
+
+from .config import MY_CFG, my_logger
+from .profiling import PROFILER
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class MetricTypes(Enum):
+    COUNTER = 'counter'
+    GAUGE = 'gauge'
+    SUMMARY = 'summary'
+
+
+METRICS_DESCRIPTIONS: dict[str, tuple[MetricTypes, str]] = {
+    'frames_total': (MetricTypes.COUNTER, 'Frames shown by the video stream.'),
+    'frames_captured_total': (MetricTypes.COUNTER, 'Frames read by the capture thread.'),
+    'frames_dropped_total': (MetricTypes.COUNTER, 'Captured frames replaced before being processed.'),
+    'frames_processed_total': (MetricTypes.COUNTER, 'Frames processed by the model.'),
+    'detections_total': (MetricTypes.COUNTER, 'Valid detections per class.'),
+    'fps': (MetricTypes.GAUGE, 'Frames per second of the stream.'),
+    'stage_latency_seconds': (MetricTypes.SUMMARY, 'Latency of each stage of the frame pipeline.'),
+    'queue_depth': (MetricTypes.GAUGE, 'Items waiting in a queue or buffer.'),
+    'writer_backlog': (MetricTypes.GAUGE, 'Images waiting to be written to disk.'),
+    'writer_images_total': (MetricTypes.COUNTER, 'Images handled by an image writer per result.'),
+}
+
+
+class MetricsRegistry:
+    def __init__(
+        self,
+        prefix: str = 'yolo',
+        enabled: bool = MY_CFG.metrics.enabled
+    ) -> None:
+        self.prefix: str = prefix
+        self.enabled: bool = enabled
+        self._values: dict[str, dict[Labels, float]] = {}
+        self._lock = Lock()
+        self.collectors: list[Callable[['MetricsRegistry'], None]] = []
+
+    @staticmethod
+    def _labels(labels: dict[str, object]) -> Labels:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def inc(
+        self,
+        name: str,
+        value: float = 1,
+        **labels: object
+    ) -> None:
+        if not self.enabled:
+            return
+        key: Labels = self._labels(labels)
+        with self._lock:
+            values: dict[Labels, float] = self._values.setdefault(name, {})
+            values[key] = values.get(key, 0) + value
+
+    def set(
+        self,
+        name: str,
+        value: float,
+        **labels: object
+    ) -> None:
+        if not self.enabled:
+            return
+        key: Labels = self._labels(labels)
+        with self._lock:
+            self._values.setdefault(name, {})[key] = value
+
+    def add_collector(self, collector: Callable[['MetricsRegistry'], None]) -> None:
+        if collector not in self.collectors:
+            self.collectors.append(collector)
+
+    def remove_collector(self, collector: Callable[['MetricsRegistry'], None]) -> None:
+        if collector in self.collectors:
+            self.collectors.remove(collector)
+
+    def collect(self) -> None:
+        for collector in list(self.collectors):
+            try:
+                collector(self)
+            except Exception as e:
+                my_logger.error(f'Metrics collector failed: {e}')
+
+    def render(self) -> str:
+        self.collect()
+        with self._lock:
+            values: dict[str, dict[Labels, float]] = {
+                name: dict(samples)
+                for name, samples in self._values.items()
+            }
+        summaries: set[str] = {
+            name
+            for name, (metric_type, _) in METRICS_DESCRIPTIONS.items()
+            if metric_type == MetricTypes.SUMMARY
+        }
+        lines: list[str] = []
+        for name, samples in sorted(values.items()):
+            base_name, _, suffix = name.rpartition('_')
+            if suffix in ('sum', 'count') and base_name in summaries:
+                continue
+            full_name: str = f'{self.prefix}_{name}'
+            metric_type, description = METRICS_DESCRIPTIONS.get(
+                name,
+                (MetricTypes.GAUGE, name)
+            )
+            lines.append(f'# HELP {full_name} {description}')
+            lines.append(f'# TYPE {full_name} {metric_type.value}')
+            for labels, value in sorted(samples.items()):
+                lines.append(f'{full_name}{self.format_labels(labels)} {self.format_value(value)}')
+            if metric_type == MetricTypes.SUMMARY:
+                for suffix in ('sum', 'count'):
+                    for labels, value in sorted(values.get(f'{name}_{suffix}', {}).items()):
+                        lines.append(f'{full_name}_{suffix}{self.format_labels(labels)} {self.format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def format_value(value: float) -> str:
+        if float(value).is_integer():
+            return str(int(value))
+        return repr(float(value))
+
+    @staticmethod
+    def format_labels(labels: Labels) -> str:
+        if len(labels) == 0:
+            return ''
+        items: list[str] = []
+        for key, value in labels:
+            value = value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            items.append(f'{key}="{value}"')
+        return '{' + ','.join(items) + '}'
+
+
+def collect_profiler_metrics(registry: MetricsRegistry) -> None:
+    for stage, stats in PROFILER.stats().items():
+        for quantile, key in (('0.5', 'p50_ms'), ('0.95', 'p95_ms'), ('0.99', 'p99_ms')):
+            registry.set(
+                'stage_latency_seconds',
+                stats[key] / 1000, # type: ignore
+                stage= stage,
+                quantile= quantile
+            )
+        registry.set('stage_latency_seconds_sum', stats['total_ms'] / 1000, stage= stage)
+        registry.set('stage_latency_seconds_count', stats['total_count'], stage= stage)
+        if stage == 'frame':
+            registry.set('fps', stats['rate'])
+
+
+METRICS: MetricsRegistry = MetricsRegistry()
+METRICS.add_collector(collect_profiler_metrics)
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = METRICS
+
+    def do_GET(self) -> None:
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body: bytes = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        my_logger.debug(f'Metrics request: {format % args}')
+
+
+class MetricsServer:
+    def __init__(
+        self,
+        registry: MetricsRegistry = METRICS,
+        host: str = MY_CFG.metrics.host,
+        port: int = MY_CFG.metrics.port
+    ) -> None:
+        self.registry: MetricsRegistry = registry
+        self.host: str = host
+        self.port: int = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def url(self) -> str:
+        return f'http://{self.host}:{self.port}/metrics'
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+        handler = type(
+            '_RegistryMetricsRequestHandler',
+            (_MetricsRequestHandler,),
+            {'registry': self.registry}
+        )
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = Thread(
+            target= self._server.serve_forever,
+            name= 'MetricsServer',
+            daemon= True
+        )
+        self._thread.start()
+        self.registry.enabled = True
+        my_logger.info(f'Metrics served at {self.url}.')
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        self._thread = None
+
+
+def start_metrics_server(
+    port: int = MY_CFG.metrics.port,
+    host: str = MY_CFG.metrics.host
+) -> MetricsServer:
+    server = MetricsServer(METRICS, host, port)
+    server.start()
+    return server
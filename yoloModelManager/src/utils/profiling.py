@@ -0,0 +1,258 @@
+from threading import local
+from time import monotonic, perf_counter_ns
+from typing import Optional, TypedDict
+
+from .config import MY_CFG, my_logger
+
+SUB_BUCKET_BITS: int = 5
+SUB_BUCKETS: int = 1 << SUB_BUCKET_BITS
+HALF_SUB_BUCKETS: int = SUB_BUCKETS >> 1
+N_BUCKETS: int = SUB_BUCKETS + 40 * HALF_SUB_BUCKETS
+
+
+class StageStatsDict(TypedDict):
+    count: int
+    rate: float
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    total_count: int
+    total_ms: float
+
+
+class LatencyHistogram:
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self) -> None:
+        self.counts: list[int] = [0] * N_BUCKETS
+        self.count: int = 0
+        self.total: int = 0
+        self.max: int = 0
+
+    @staticmethod
+    def bucket_index(value_us: int) -> int:
+        if value_us < SUB_BUCKETS:
+            return max(value_us, 0)
+        shift: int = value_us.bit_length() - SUB_BUCKET_BITS
+        return min(
+            (shift << (SUB_BUCKET_BITS - 1)) + (value_us >> shift),
+            N_BUCKETS - 1
+        )
+
+    @staticmethod
+    def bucket_value(index: int) -> int:
+        if index < SUB_BUCKETS:
+            return index
+        shift: int = (index >> (SUB_BUCKET_BITS - 1)) - 1
+        mantissa: int = index - (shift << (SUB_BUCKET_BITS - 1))
+        return ((mantissa << shift) + ((mantissa + 1) << shift)) >> 1
+
+    def record(self, value_ns: int) -> None:
+        value_us: int = value_ns // 1000
+        self.counts[self.bucket_index(value_us)] += 1
+        self.count += 1
+        self.total += value_us
+        if value_us > self.max:
+            self.max = value_us
+
+    def add(self, other: 'LatencyHistogram') -> None:
+        for i, n in enumerate(other.counts):
+            if n:
+                self.counts[i] += n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p: float) -> float:
+        if self.count == 0:
+            return 0.0
+        target: float = self.count * p / 100
+        seen: int = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= target:
+                return min(self.bucket_value(i), self.max) / 1000
+        return self.max / 1000
+
+
+class _Stage:
+    __slots__ = ('current', 'previous', 'count', 'total')
+
+    def __init__(self) -> None:
+        self.current = LatencyHistogram()
+        self.previous = LatencyHistogram()
+        self.count: int = 0
+        self.total: int = 0
+
+
+class _StageTimer:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler: 'FrameProfiler', name: str) -> None:
+        self.profiler: FrameProfiler = profiler
+        self.name: str = name
+        self.start: int = 0
+
+    def __enter__(self) -> '_StageTimer':
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.profiler.record(self.name, perf_counter_ns() - self.start)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> '_NullTimer':
+        return self
+
+    def __exit__(self, *args) -> None:
+        return None
+
+
+class FrameContext:
+    __slots__ = ('profiler', 'seq', 'start', 'capture_timestamp', 'marks')
+
+    def __init__(
+        self,
+        profiler: 'FrameProfiler',
+        seq: int,
+        capture_timestamp: Optional[float] = None
+    ) -> None:
+        self.profiler: FrameProfiler = profiler
+        self.seq: int = seq
+        self.capture_timestamp: Optional[float] = capture_timestamp
+        self.start: int = 0
+        self.marks: dict[str, int] = {}
+
+    def __enter__(self) -> 'FrameContext':
+        self.start = perf_counter_ns()
+        self.profiler._local.frame = self
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.profiler._local.frame = None
+        self.profiler.end_frame(self, perf_counter_ns() - self.start)
+
+
+class FrameProfiler:
+    NULL_TIMER = _NullTimer()
+
+    def __init__(
+        self,
+        enabled: bool = MY_CFG.profiling.enabled,
+        log_interval: float = MY_CFG.profiling.log_interval,
+        window: float = MY_CFG.profiling.window,
+        slow_frame_ms: float = MY_CFG.profiling.slow_frame_ms
+    ) -> None:
+        self.enabled: bool = enabled
+        self.log_interval: float = log_interval
+        self.window: float = window
+        self.slow_frame_ms: float = slow_frame_ms
+        self._stages: dict[str, _Stage] = {}
+        self._local = local()
+        self._frames: int = 0
+        self._window_start: float = monotonic()
+        self._last_log: float = self._window_start
+
+    def stage(self, name: str) -> _StageTimer | _NullTimer:
+        if not self.enabled:
+            return self.NULL_TIMER
+        return _StageTimer(self, name)
+
+    def frame(
+        self,
+        seq: int = 0,
+        capture_timestamp: Optional[float] = None
+    ) -> FrameContext | _NullTimer:
+        if not self.enabled:
+            return self.NULL_TIMER
+        return FrameContext(self, seq, capture_timestamp)
+
+    def record(self, name: str, value_ns: int) -> None:
+        stage: Optional[_Stage] = self._stages.get(name)
+        if stage is None:
+            stage = self._stages.setdefault(name, _Stage())
+        stage.current.record(value_ns)
+        stage.count += 1
+        stage.total += value_ns // 1000
+        frame: Optional[FrameContext] = getattr(self._local, 'frame', None)
+        if frame is not None:
+            frame.marks[name] = frame.marks.get(name, 0) + value_ns
+
+    def end_frame(self, frame: FrameContext, value_ns: int) -> None:
+        self.record('frame', value_ns)
+        if frame.capture_timestamp is not None:
+            self.record('latency', int((monotonic() - frame.capture_timestamp) * 1e9))
+        self._frames += 1
+        if self.slow_frame_ms > 0 and value_ns > self.slow_frame_ms * 1e6:
+            self.log_slow_frame(frame, value_ns)
+        now: float = monotonic()
+        if now - self._window_start >= self.window:
+            self._rotate(now)
+        if self.log_interval > 0 and now - self._last_log >= self.log_interval:
+            self._last_log = now
+            self.log_stats()
+
+    def log_slow_frame(self, frame: FrameContext, value_ns: int) -> None:
+        stages: str = ' | '.join(
+            f'{name} {mark / 1e6:.1f}'
+            for name, mark in frame.marks.items()
+            if name != 'frame'
+        )
+        my_logger.warning(f'Slow frame {frame.seq}: {value_ns / 1e6:.1f} ms | {stages}')
+
+    def _rotate(self, now: float) -> None:
+        for stage in self._stages.values():
+            stage.previous = stage.current
+            stage.current = LatencyHistogram()
+        self._window_start = now
+
+    def reset(self) -> None:
+        self._stages = {}
+        self._frames = 0
+        self._window_start = monotonic()
+        self._last_log = self._window_start
+
+    def stats(self) -> dict[str, StageStatsDict]:
+        elapsed: float = max(monotonic() - self._window_start + self.window, 1e-9)
+        stats: dict[str, StageStatsDict] = {}
+        for name, stage in list(self._stages.items()):
+            histogram = LatencyHistogram()
+            histogram.add(stage.previous)
+            histogram.add(stage.current)
+            if histogram.count == 0:
+                continue
+            if stage.previous.count == 0:
+                elapsed_stage: float = max(monotonic() - self._window_start, 1e-9)
+            else:
+                elapsed_stage = elapsed
+            stats[name] = {
+                'count': histogram.count,
+                'rate': histogram.count / elapsed_stage,
+                'mean_ms': histogram.total / histogram.count / 1000,
+                'p50_ms': histogram.percentile(50),
+                'p95_ms': histogram.percentile(95),
+                'p99_ms': histogram.percentile(99),
+                'max_ms': histogram.max / 1000,
+                'total_count': stage.count,
+                'total_ms': stage.total / 1000
+            }
+        return stats
+
+    def log_stats(self) -> None:
+        stats: dict[str, StageStatsDict] = self.stats()
+        if len(stats) == 0:
+            return
+        fps: float = stats['frame']['rate'] if 'frame' in stats else 0.0
+        stages: str = ' | '.join(
+            f'{name} {s["p50_ms"]:.1f}/{s["p95_ms"]:.1f}/{s["p99_ms"]:.1f}'
+            for name, s in stats.items()
+        )
+        my_logger.info(f'FPS {fps:.1f} | p50/p95/p99 ms: {stages}')
+
+
+PROFILER: FrameProfiler = FrameProfiler()